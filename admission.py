@@ -0,0 +1,233 @@
+"""
+Admission control for suggestion requests, shared by the FastAPI service and the Lambda handler
+Per-client and per-game token buckets shed request floods; a bounded priority queue in front of the
+agent admits interactive requests before batch ones and answers a request that waited past its
+budget from the fallback provider instead of letting it queue further
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from request_metrics import current_timer, metrics
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Lower sorts first in the queue
+PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+
+class RateLimitedError(Exception):
+    """Raised when a client or game is over its token bucket; the request is shed"""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Too many requests for this {scope}")
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(math.ceil(self.retry_after), 1))
+
+
+class TokenBuckets:
+    """
+    One token bucket per key (client id or game id): `rate` tokens per second up to `burst`.
+
+    Buckets refill lazily when touched, so an idle key costs nothing; the least recently used
+    keys are dropped past max_keys (a dropped key starts again with a full bucket).
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # key -> [tokens, refilled_at]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Spend one token for key; returns 0 when admitted, else seconds until a token is available"""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class PriorityGate:
+    """
+    At most `slots` holders at once (asyncio, one event loop). Waiters are served by priority,
+    then arrival; a released slot passes straight to the next waiter. At most max_queue waiters.
+    """
+
+    def __init__(self, slots: int, max_queue: int):
+        self.slots = slots
+        self.max_queue = max_queue
+        self._holders = 0
+        self._waiting = 0
+        # [priority, arrival, future]; entries of waiters that gave up stay until popped
+        self._heap: List[list] = []
+        self._arrivals = itertools.count()
+
+    @property
+    def holders(self) -> int:
+        return self._holders
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    async def acquire(self, priority: int, wait_seconds: float) -> Optional[str]:
+        """None once a slot is held; otherwise why not ("queue_full" or "wait")"""
+        if self._holders < self.slots and not self._waiting:
+            self._holders += 1
+            return None
+        if self._waiting >= self.max_queue:
+            return "queue_full"
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, [priority, next(self._arrivals), future])
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), wait_seconds)
+            return None
+        except asyncio.TimeoutError:
+            if future.done():
+                # The slot was handed over just as the wait ran out; keep it
+                return None
+            future.cancel()
+            self._waiting -= 1
+            return "wait"
+        except BaseException:
+            # Caller cancelled (client went away): give back a slot handed over meanwhile
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+                self._waiting -= 1
+            raise
+
+    def release(self):
+        while self._heap:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                self._waiting -= 1
+                future.set_result(True)
+                return
+        self._holders -= 1
+
+
+class AdmissionController:
+    """Token buckets per client and per game, and the priority gate in front of agent calls"""
+
+    def __init__(self, client_rate: float = 5.0, client_burst: float = 20.0, game_rate: float = 2.0,
+                 game_burst: float = 5.0, max_keys: int = 10000, slots: int = 64, max_queue: int = 256,
+                 wait_seconds: Optional[Dict[str, float]] = None):
+        self.clients = TokenBuckets(client_rate, client_burst, max_keys)
+        self.games = TokenBuckets(game_rate, game_burst, max_keys)
+        self.gate = PriorityGate(slots, max_queue)
+        self.wait_seconds = wait_seconds or {INTERACTIVE: 1.0, BATCH: 10.0}
+        self._counts = {"admitted": 0, "shed_client": 0, "shed_game": 0, "degraded_wait": 0, "degraded_queue_full": 0}
+        self._waited = {priority: 0.0 for priority in PRIORITIES}
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            client_rate=float(os.getenv('ADMISSION_CLIENT_RATE', '5')),
+            client_burst=float(os.getenv('ADMISSION_CLIENT_BURST', '20')),
+            game_rate=float(os.getenv('ADMISSION_GAME_RATE', '2')),
+            game_burst=float(os.getenv('ADMISSION_GAME_BURST', '5')),
+            max_keys=int(os.getenv('ADMISSION_MAX_KEYS', '10000')),
+            # Agent calls beyond the invocation pool would only wait for a thread
+            slots=int(os.getenv('ADMISSION_SLOTS', os.getenv('BEDROCK_MAX_CONCURRENCY', '64'))),
+            max_queue=int(os.getenv('ADMISSION_MAX_QUEUE', '256')),
+            wait_seconds={
+                INTERACTIVE: float(os.getenv('ADMISSION_INTERACTIVE_WAIT_MS', '1000')) / 1000,
+                BATCH: float(os.getenv('ADMISSION_BATCH_WAIT_MS', '10000')) / 1000
+            }
+        )
+
+    def _count(self, outcome: str, priority: str):
+        self._counts[outcome] += 1
+        metrics.inc("botorial_admission_total", priority=priority, outcome=outcome)
+
+    def check_rate(self, client_id: Optional[str], game_id: Optional[str] = None, priority: str = INTERACTIVE):
+        """Spend the request's client and game tokens; raises RateLimitedError when either is empty"""
+        if client_id:
+            retry_after = self.clients.take(client_id)
+            if retry_after:
+                self._count("shed_client", priority)
+                raise RateLimitedError("client", retry_after)
+        if game_id:
+            retry_after = self.games.take(game_id)
+            if retry_after:
+                self._count("shed_game", priority)
+                raise RateLimitedError("game", retry_after)
+
+    async def acquire(self, priority: str = INTERACTIVE) -> bool:
+        """
+        Wait for an agent slot for at most this priority's wait budget. True means the caller holds
+        a slot and must release() it; False means answer from the fallback provider now.
+        """
+        started = time.perf_counter()
+        refused = await self.gate.acquire(PRIORITIES[priority], self.wait_seconds[priority])
+        waited = time.perf_counter() - started
+        self._waited[priority] += waited
+        current_timer().record("admission_wait", waited)
+        metrics.set("botorial_admission_queue_depth", self.gate.waiting)
+        if refused is None:
+            self._count("admitted", priority)
+            return True
+        self._count(f"degraded_{refused}", priority)
+        current_timer().label(fallback=f"admission_{refused}")
+        return False
+
+    def release(self):
+        self.gate.release()
+        metrics.set("botorial_admission_queue_depth", self.gate.waiting)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot for /health"""
+        return {
+            "client_rate": self.clients.rate,
+            "client_burst": self.clients.burst,
+            "game_rate": self.games.rate,
+            "game_burst": self.games.burst,
+            "tracked_clients": len(self.clients),
+            "tracked_games": len(self.games),
+            "slots": self.gate.slots,
+            "in_use": self.gate.holders,
+            "queue_depth": self.gate.waiting,
+            "max_queue": self.gate.max_queue,
+            "wait_ms": {priority: round(seconds * 1000, 1) for priority, seconds in self.wait_seconds.items()},
+            "waited_ms_total": {priority: round(seconds * 1000, 1) for priority, seconds in self._waited.items()},
+            **self._counts,
+            "shed": self._counts["shed_client"] + self._counts["shed_game"],
+            "degraded": self._counts["degraded_wait"] + self._counts["degraded_queue_full"]
+        }
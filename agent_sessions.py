@@ -0,0 +1,157 @@
+"""
+Per-game Bedrock Agent session affinity
+Each game keeps one agent session so later turns can be sent as deltas against what the agent has seen
+"""
+
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from prompt_builder import PositionSnapshot
+
+# Bedrock sessionId allows [0-9a-zA-Z._:-], up to 100 characters
+_SESSION_ID_UNSAFE = re.compile(r"[^0-9a-zA-Z._:-]")
+
+
+def changed_cards(previous: PositionSnapshot, current: PositionSnapshot) -> int:
+    before, after = Counter(previous.hand), Counter(current.hand)
+    return sum((after - before).values()) + sum((before - after).values())
+
+
+class SessionPlan(NamedTuple):
+    """What one suggestion call should send: the session to use and the position the agent last saw"""
+    game_id: Optional[str]
+    session_id: str
+    previous: Optional[PositionSnapshot]
+    leased: bool
+
+
+class _AgentSession:
+    __slots__ = ('session_id', 'snapshot', 'expires_at', 'turns', 'busy')
+
+    def __init__(self, session_id: str, expires_at: float):
+        self.session_id = session_id
+        self.snapshot: Optional[PositionSnapshot] = None
+        self.expires_at = expires_at
+        self.turns = 0
+        self.busy = False
+
+
+class AgentSessionRegistry:
+    """
+    LRU of game id -> agent session.
+
+    A session only advances after the agent answered; any failure or fallback drops it so the
+    next suggestion resyncs with the full state in a new session. ttl_seconds should stay below
+    the agent's idle session TTL (600s by default) so the agent never loses a session we still use.
+    """
+
+    def __init__(self, ttl_seconds: float = 540.0, max_sessions: int = 10000, max_delta_cards: int = 6):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_delta_cards = max_delta_cards
+        self._sessions: "OrderedDict[str, _AgentSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.resyncs = 0
+        self.full_prompts = 0
+        self.delta_prompts = 0
+        self.busy_bypass = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "AgentSessionRegistry":
+        return cls(
+            ttl_seconds=float(os.environ.get('AGENT_SESSION_TTL_SECONDS', '540')),
+            max_sessions=int(os.environ.get('AGENT_SESSION_MAX_GAMES', '10000')),
+            max_delta_cards=int(os.environ.get('AGENT_SESSION_MAX_DELTA_CARDS', '6'))
+        )
+
+    def new_session_id(self, game_id: Optional[str] = None) -> str:
+        prefix = _SESSION_ID_UNSAFE.sub('-', game_id)[:60] if game_id else "session"
+        return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+    def plan(self, game_id: Optional[str], current: PositionSnapshot) -> SessionPlan:
+        """Lease the game's session; previous is None when the full state must be sent"""
+        if not game_id or self.max_sessions <= 0:
+            self.full_prompts += 1
+            return SessionPlan(None, self.new_session_id(), None, False)
+
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(game_id)
+            if session is not None and session.busy:
+                # Another suggestion for this game is in flight; answer this one statelessly
+                self.busy_bypass += 1
+                self.full_prompts += 1
+                return SessionPlan(None, self.new_session_id(game_id), None, False)
+            if session is not None and session.expires_at <= now:
+                del self._sessions[game_id]
+                self.resyncs += 1
+                session = None
+            if session is None:
+                session = _AgentSession(self.new_session_id(game_id), now + self.ttl_seconds)
+                self._sessions[game_id] = session
+                self.created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+            self._sessions.move_to_end(game_id)
+            session.busy = True
+
+            previous = session.snapshot
+            if previous is not None and (
+                previous.joker != current.joker or changed_cards(previous, current) > self.max_delta_cards
+            ):
+                # New deal or too much changed: a delta would be no shorter than the full state
+                previous = None
+            if previous is None:
+                self.full_prompts += 1
+            else:
+                self.delta_prompts += 1
+            return SessionPlan(game_id, session.session_id, previous, True)
+
+    def commit(self, plan: SessionPlan, current: PositionSnapshot):
+        """The agent answered: it has now seen `current`"""
+        if not plan.leased:
+            return
+        with self._lock:
+            session = self._sessions.get(plan.game_id)
+            if session is None or session.session_id != plan.session_id:
+                return
+            session.snapshot = current
+            session.expires_at = time.monotonic() + self.ttl_seconds
+            session.turns += 1
+            session.busy = False
+
+    def release(self, plan: SessionPlan, lost: bool = False):
+        """Return a lease without an answer; `lost` drops the session so the next call resyncs"""
+        if not plan.leased:
+            return
+        with self._lock:
+            session = self._sessions.get(plan.game_id)
+            if session is None or session.session_id != plan.session_id:
+                return
+            if lost:
+                del self._sessions[plan.game_id]
+                self.resyncs += 1
+            else:
+                session.busy = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active = len(self._sessions)
+        return {
+            "active": active,
+            "ttl_seconds": self.ttl_seconds,
+            "created": self.created,
+            "resyncs": self.resyncs,
+            "full_prompts": self.full_prompts,
+            "delta_prompts": self.delta_prompts,
+            "busy_bypass": self.busy_bypass,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,267 @@
+"""
+Process pool for CPU-bound hand analysis (rule engine, draw simulation)
+Keeps meld search and Monte Carlo sampling off the asyncio event loop; jobs receive game states
+as plain tuples and run with a per-job timeout behind a bounded queue
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from card_tracker import CardTracker
+from draw_simulator import format_draw_odds, simulate_draw
+from request_metrics import current_timer, metrics
+from rummy_engine import card_field, format_suggestion, suggest_move
+
+logger = logging.getLogger(__name__)
+
+# (id, rank, suit, value); pickles far smaller than Pydantic models or dicts
+PackedCard = Tuple[str, str, str, int]
+# (hand, open deck, joker card, melds, closed deck count)
+PackedState = Tuple[Tuple[PackedCard, ...], Tuple[PackedCard, ...], Optional[PackedCard], Tuple[Tuple[PackedCard, ...], ...], Optional[int]]
+
+
+class AnalysisQueueFullError(Exception):
+    """Raised when the pool already holds max_queue jobs waiting for a worker"""
+
+
+class AnalysisTimeoutError(Exception):
+    """Raised when a job does not finish within its timeout"""
+
+
+def pack_card(card: Any) -> PackedCard:
+    return (card_field(card, 'id'), card_field(card, 'rank'), card_field(card, 'suit'), card_field(card, 'value'))
+
+
+def unpack_card(packed: PackedCard) -> Dict[str, Any]:
+    return {"id": packed[0], "rank": packed[1], "suit": packed[2], "value": packed[3]}
+
+
+def pack_state(player_hand: List[Any], open_deck: Optional[List[Any]], joker_card: Any = None,
+               player_melds: Optional[list] = None, closed_deck_count: Optional[int] = None) -> PackedState:
+    """The parts of a game state analysis jobs read, as tuples of primitives"""
+    return (
+        tuple(pack_card(card) for card in player_hand or []),
+        tuple(pack_card(card) for card in open_deck or []),
+        pack_card(joker_card) if joker_card is not None else None,
+        tuple(tuple(pack_card(card) for card in meld) for meld in player_melds or []),
+        closed_deck_count
+    )
+
+
+def unpack_state(state: PackedState):
+    hand, open_deck, joker_card, melds, closed_deck_count = state
+    return (
+        [unpack_card(card) for card in hand],
+        [unpack_card(card) for card in open_deck],
+        unpack_card(joker_card) if joker_card is not None else None,
+        [[unpack_card(card) for card in meld] for meld in melds],
+        closed_deck_count
+    )
+
+
+def engine_suggestion(player_hand: List[Any], open_deck: Optional[List[Any]], joker_card: Any = None,
+                      player_melds: Optional[list] = None, closed_deck_count: Optional[int] = None,
+                      analysis: Any = None, draw_simulation: bool = False,
+                      tracker: Optional[CardTracker] = None) -> Dict[str, Any]:
+    """Rule engine answer in the service's response shape, optionally with Monte Carlo draw odds
+    and discards judged against the game's opponent tracking"""
+    result = suggest_move(
+        player_hand, open_deck, joker_card, player_melds, analysis=analysis,
+        discard_risk=tracker.discard_risk if tracker is not None else None
+    )
+    message = format_suggestion(result)
+    if draw_simulation and result["draw"]:
+        odds = simulate_draw(player_hand, open_deck, joker_card, closed_deck_count, player_melds)
+        if odds:
+            result["draw_odds"] = odds
+            message += f"\n5. {format_draw_odds(odds)}"
+    return {
+        "success": True,
+        "message": message,
+        "analysis": result,
+        "source": "rule-engine"
+    }
+
+
+def engine_job(state: PackedState, draw_simulation: bool = False, tracker: Optional[CardTracker] = None) -> Dict[str, Any]:
+    hand, open_deck, joker_card, melds, closed_deck_count = unpack_state(state)
+    return engine_suggestion(
+        hand, open_deck, joker_card, melds, closed_deck_count, draw_simulation=draw_simulation, tracker=tracker
+    )
+
+
+def draw_odds_job(state: PackedState, **options: Any) -> Optional[Dict[str, Any]]:
+    hand, open_deck, joker_card, melds, closed_deck_count = unpack_state(state)
+    return simulate_draw(hand, open_deck, joker_card, closed_deck_count, melds, **options)
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+JOBS: Dict[str, Callable[..., Any]] = {
+    "engine": engine_job,
+    "draw_odds": draw_odds_job,
+    "warm_up": _warm_up
+}
+
+
+def _run_job(name: str, args: tuple, kwargs: Dict[str, Any]):
+    """Worker side: run one job and report how long the worker was busy with it"""
+    started = time.perf_counter()
+    result = JOBS[name](*args, **kwargs)
+    return result, time.perf_counter() - started, os.getpid()
+
+
+class AnalysisPool:
+    """
+    Bounded process pool with per-job timeouts and utilization accounting.
+
+    At most workers + max_queue jobs are accepted at once; further jobs raise
+    AnalysisQueueFullError right away. A job that times out keeps its worker until it finishes
+    (a process cannot be interrupted mid-job) and still counts against the bound meanwhile.
+    """
+
+    def __init__(self, workers: int = 0, max_queue: int = 64, timeout_seconds: float = 2.0,
+                 start_method: Optional[str] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._busy_seconds = 0.0
+        self._busy_by_worker: Dict[int, float] = {}
+        self._counts = {"completed": 0, "failed": 0, "timed_out": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls) -> "AnalysisPool":
+        default_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        return cls(
+            workers=int(os.getenv('ANALYSIS_POOL_WORKERS', str(os.cpu_count() or 1))),
+            max_queue=int(os.getenv('ANALYSIS_POOL_MAX_QUEUE', '64')),
+            timeout_seconds=float(os.getenv('ANALYSIS_JOB_TIMEOUT_SECONDS', '2')),
+            start_method=os.getenv('ANALYSIS_POOL_START_METHOD', default_method)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def start(self):
+        """Create the worker processes; call from app startup, before request threads exist"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            context = multiprocessing.get_context(self.start_method) if self.start_method else None
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            self._started_at = time.perf_counter()
+            # Spawn every worker now so the first requests do not pay process start-up
+            warm_up = [self._executor.submit(_run_job, "warm_up", (), {}) for _ in range(self.workers)]
+        for future in warm_up:
+            future.result()
+        metrics.set("botorial_analysis_pool_workers", self.workers)
+        logger.info(f"🧵 Analysis pool started: {self.workers} worker process(es), {self.start_method}")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, job: str, future):
+        """Done callback (pool thread): release the slot and account the worker's busy time"""
+        with self._lock:
+            self._in_flight -= 1
+            in_flight = self._in_flight
+            if not future.cancelled() and future.exception() is None:
+                _, busy, pid = future.result()
+                self._busy_seconds += busy
+                self._busy_by_worker[pid] = self._busy_by_worker.get(pid, 0.0) + busy
+                metrics.inc("botorial_analysis_busy_seconds_total", busy)
+                metrics.observe("botorial_analysis_job_seconds", busy, job=job)
+        metrics.set("botorial_analysis_pool_in_flight", in_flight)
+
+    async def run(self, job: str, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run a registered job on a worker process and return its result"""
+        if self._executor is None:
+            # Started lazily (no lifespan startup): spawning and warming workers blocks, so not on the loop
+            await asyncio.get_running_loop().run_in_executor(None, self.start)
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                self._counts["rejected"] += 1
+                metrics.inc("botorial_analysis_jobs_total", job=job, status="rejected")
+                raise AnalysisQueueFullError("Analysis pool is shut down")
+            if self._in_flight >= self.workers + self.max_queue:
+                self._counts["rejected"] += 1
+                metrics.inc("botorial_analysis_jobs_total", job=job, status="rejected")
+                raise AnalysisQueueFullError(f"Analysis queue full ({self._in_flight} jobs in flight)")
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            in_flight = self._in_flight
+        metrics.set("botorial_analysis_pool_in_flight", in_flight)
+
+        submitted = time.perf_counter()
+        future = executor.submit(_run_job, job, args, kwargs)
+        future.add_done_callback(lambda done: self._finished(job, done))
+        try:
+            result, busy, _ = await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout if timeout is not None else self.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._counts["timed_out"] += 1
+            metrics.inc("botorial_analysis_jobs_total", job=job, status="timeout")
+            raise AnalysisTimeoutError(f"Analysis job {job} timed out")
+        except Exception:
+            with self._lock:
+                self._counts["failed"] += 1
+            metrics.inc("botorial_analysis_jobs_total", job=job, status="error")
+            raise
+
+        waited = time.perf_counter() - submitted - busy
+        with self._lock:
+            self._counts["completed"] += 1
+        metrics.inc("botorial_analysis_jobs_total", job=job, status="ok")
+        metrics.observe("botorial_analysis_wait_seconds", waited, job=job)
+        current_timer().record("analysis_wait", waited)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot for /health; utilization is worker busy time over worker wall time since start"""
+        with self._lock:
+            uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+            capacity = uptime * self.workers
+            return {
+                "workers": self.workers,
+                "running": self._executor is not None,
+                "start_method": self.start_method,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout_seconds,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                **self._counts,
+                "busy_seconds": round(self._busy_seconds, 3),
+                "utilization": round(self._busy_seconds / capacity, 4) if capacity else 0.0,
+                "worker_utilization": {
+                    str(pid): round(busy / uptime, 4) if uptime else 0.0
+                    for pid, busy in self._busy_by_worker.items()
+                }
+            }
+
+
+analysis_pool = AnalysisPool.from_env()
@@ -0,0 +1,83 @@
+"""
+Microbenchmark for GameState ingestion
+Compares parse+validate time and per-game memory of the Pydantic API models and the fast path
+"""
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from fast_ingest import CompactGameState
+from suggest_api_python import GameState
+
+SUITS = ['hearts', 'diamonds', 'clubs', 'spades']
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+
+
+def make_game_payload(index: int, rng: random.Random) -> bytes:
+    """A mid-game state shaped like the Node.js backend's cards (ids repeat across games)"""
+    deck = [
+        {"id": f"{rank}_{suit}", "rank": rank, "suit": suit, "value": value + 1}
+        for suit in SUITS for value, rank in enumerate(RANKS)
+    ] * 2
+    rng.shuffle(deck)
+    return json.dumps({
+        "gameId": f"game_{index}_bench",
+        "playerHand": deck[:13],
+        "openDeck": deck[13:33],
+        "closedDeckCount": len(deck) - 40,
+        "jokerCard": deck[33],
+        "currentPlayer": "player",
+        "gameStatus": "in_progress",
+        "playerMelds": [deck[34:37], deck[37:40]]
+    }).encode('utf-8')
+
+
+def time_parse(label: str, parse, payloads) -> float:
+    started = time.perf_counter()
+    for raw in payloads:
+        parse(raw)
+    elapsed = time.perf_counter() - started
+    per_game_us = elapsed / len(payloads) * 1e6
+    print(f"{label:<28} {per_game_us:8.1f} µs/game  {len(payloads) / elapsed:10.0f} games/s")
+    return per_game_us
+
+
+def measure_memory(label: str, parse, payloads) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    games = [parse(raw) for raw in payloads]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    per_game = allocated / len(games)
+    print(f"{label:<28} {per_game / 1024:8.1f} KiB/game")
+    return per_game
+
+
+def run_benchmark(game_count: int = 5000):
+    rng = random.Random(42)
+    payloads = [make_game_payload(i, rng) for i in range(game_count)]
+    print(f"🧪 GameState ingestion benchmark ({game_count} games, {len(payloads[0])} bytes each)")
+    print("=" * 50)
+
+    # Warm both validators once so schema build time is not counted
+    GameState.model_validate_json(payloads[0])
+    CompactGameState.model_validate_json(payloads[0])
+
+    print("\nParse + validate:")
+    model_us = time_parse("Pydantic GameState", GameState.model_validate_json, payloads)
+    fast_us = time_parse("CompactGameState fast path", CompactGameState.model_validate_json, payloads)
+
+    print("\nResident memory:")
+    model_bytes = measure_memory("Pydantic GameState", GameState.model_validate_json, payloads)
+    fast_bytes = measure_memory("CompactGameState fast path", CompactGameState.model_validate_json, payloads)
+
+    print("\n" + "=" * 50)
+    print(f"✅ Fast path: {model_us / fast_us:.1f}x faster, {model_bytes / fast_bytes:.1f}x less memory per game")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,55 @@
+"""
+Prompt size comparison
+Estimated tokens and characters of the original prose prompts vs the compact prompt builder
+"""
+
+import json
+import random
+import sys
+from typing import Optional
+
+import lambda_suggest
+from bench_ingest import make_game_payload
+from fast_ingest import CompactGameState
+from prompt_builder import PromptBuilder, estimate_tokens
+from suggest_api_python import bedrock_service, get_state_context
+
+
+def summarize(label: str, prompts) -> float:
+    tokens = [estimate_tokens(prompt) for prompt in prompts]
+    chars = [len(prompt) for prompt in prompts]
+    mean_tokens = sum(tokens) / len(tokens)
+    print(f"{label:<34} {mean_tokens:7.1f} tokens  {sum(chars) / len(chars):7.1f} chars  (max {max(tokens)} tokens)")
+    return mean_tokens
+
+
+def run_benchmark(game_count: int = 1000, token_budget: Optional[int] = None):
+    rng = random.Random(42)
+    games = [CompactGameState.model_validate_json(make_game_payload(i, rng)) for i in range(game_count)]
+    lambda_states = [json.loads(game.model_dump_json()) for game in games]
+    builder = PromptBuilder.from_env() if token_budget is None else PromptBuilder(token_budget=token_budget)
+
+    print(f"✂️ Prompt size benchmark ({game_count} games, token budget {builder.token_budget or 'none'})")
+    print("=" * 50)
+    api_verbose = summarize("API prose prompt (hand + discard)", [
+        bedrock_service.create_game_prompt(game.playerHand, game.openDeck, get_state_context(game)) for game in games
+    ])
+    lambda_verbose = summarize("Lambda prose prompt", [
+        lambda_suggest.create_rummy_suggestion_prompt(state["playerHand"], state["openDeck"], state)
+        for state in lambda_states
+    ])
+    compact = summarize("Compact prompt (+ joker, melds)", [
+        builder.build(game.playerHand, game.openDeck, game.jokerCard, game.playerMelds).text for game in games
+    ])
+
+    print("\n" + "=" * 50)
+    print(f"✅ Compact prompt: {1 - compact / lambda_verbose:.0%} fewer tokens than the Lambda prompt, "
+          f"{1 - compact / api_verbose:.0%} fewer than the API prompt")
+    print(f"   Sections dropped for budget: {builder.stats()['dropped']}")
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else None
+    )
@@ -0,0 +1,207 @@
+"""
+Load and latency benchmark for the Suggest API and the Lambda handler
+Drives the FastAPI app in-process over an ASGI transport and calls lambda_handler directly
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+# All load comes from one client replaying a few games; measure throughput, not the rate limits
+os.environ.setdefault('ADMISSION_CLIENT_RATE', '0')
+os.environ.setdefault('ADMISSION_GAME_RATE', '0')
+
+import lambda_suggest
+from bench_ingest import make_game_payload
+from suggest_api_python import app
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(name: str, latencies: List[float], errors: int, elapsed: float, concurrency: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "name": name,
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50), 3),
+            "p95": round(percentile(ordered, 95), 3),
+            "p99": round(percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3) if ordered else 0.0
+        }
+    }
+
+
+def print_result(result: Dict[str, Any]):
+    latency = result["latency_ms"]
+    print(f"{result['name']:<22} {result['throughput_rps']:>10.1f} req/s  "
+          f"p50 {latency['p50']:>8.2f}  p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms  "
+          f"errors {result['errors']}")
+
+
+async def run_async_load(name: str, call: Callable[[int], Awaitable[bool]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Run `requests` calls with at most `concurrency` in flight; call returns False on error"""
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            ok = await call(i)
+            if ok:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(name, latencies, errors, time.perf_counter() - started, concurrency)
+
+
+async def bench_api(game_payloads: List[bytes], requests: int, concurrency: int) -> List[Dict[str, Any]]:
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport does not send lifespan events; boot the app as a server would before timing it
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+        game_ids = [json.loads(raw)["gameId"] for raw in game_payloads]
+
+        async def add_game(i: int) -> bool:
+            response = await client.post(
+                "/test/add-game",
+                content=game_payloads[i % len(game_payloads)],
+                headers={"Content-Type": "application/json"}
+            )
+            return response.status_code == 200
+
+        async def suggest(i: int) -> bool:
+            response = await client.get(f"/suggest/{game_ids[i % len(game_ids)]}")
+            return response.status_code == 200
+
+        async def suggest_stream(i: int) -> bool:
+            response = await client.get(f"/suggest/{game_ids[i % len(game_ids)]}/stream")
+            return response.status_code == 200 and "event: done" in response.text
+
+        results = [await run_async_load("api.add_game", add_game, max(requests, len(game_payloads)), concurrency)]
+        results.append(await run_async_load("api.suggest", suggest, requests, concurrency))
+        results.append(await run_async_load("api.suggest_stream", suggest_stream, requests, concurrency))
+        return results
+
+
+def make_lambda_event(raw: bytes) -> Dict[str, Any]:
+    """Reshape a game payload into the Lambda event shape used by test_lambda_local.py"""
+    game = json.loads(raw)
+    return {
+        "body": json.dumps({
+            "gameId": game["gameId"],
+            "playerHand": game["playerHand"],
+            "openDeck": game["openDeck"],
+            "gameState": {
+                "jokerCard": game["jokerCard"],
+                "playerMelds": game["playerMelds"],
+                "gameStatus": game["gameStatus"]
+            }
+        })
+    }
+
+
+def bench_lambda(game_payloads: List[bytes], requests: int, concurrency: int) -> Dict[str, Any]:
+    events = [make_lambda_event(raw) for raw in game_payloads]
+    latencies: List[float] = []
+    errors = 0
+
+    def one(i: int):
+        started = time.perf_counter()
+        response = lambda_suggest.lambda_handler(events[i % len(events)], None)
+        return response["statusCode"] == 200, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for ok, latency in pool.map(one, range(requests)):
+            if ok:
+                latencies.append(latency)
+            else:
+                errors += 1
+    return summarize("lambda.handler", latencies, errors, time.perf_counter() - started, concurrency)
+
+
+def compare_with_baseline(results: List[Dict[str, Any]], baseline_path: str, max_regression: float) -> bool:
+    """Print p95 deltas against an earlier results file; False if any run regressed past the limit"""
+    with open(baseline_path) as handle:
+        baseline = {run["name"]: run for run in json.load(handle)["results"]}
+    passed = True
+    print(f"\nCompared with {baseline_path} (max p95 regression {max_regression:.0%}):")
+    for result in results:
+        previous = baseline.get(result["name"])
+        if previous is None:
+            continue
+        before, after = previous["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (after - before) / before if before else 0.0
+        regressed = change > max_regression
+        passed = passed and not regressed
+        print(f"{'❌' if regressed else '✅'} {result['name']:<22} p95 {before:.2f} -> {after:.2f} ms ({change:+.1%})")
+    return passed
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", choices=["api", "lambda", "all"], default="all")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight")
+    parser.add_argument("--games", type=int, default=50, help="Distinct generated game states")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json", help="Where to write JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare p95 latency against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 increase vs baseline")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    game_payloads = [make_game_payload(i, rng) for i in range(args.games)]
+
+    print(f"🚀 Suggest benchmark: {args.requests} requests/scenario, concurrency {args.concurrency}, {args.games} games")
+    print("=" * 50)
+    results: List[Dict[str, Any]] = []
+    if args.target in ("api", "all"):
+        results.extend(asyncio.run(bench_api(game_payloads, args.requests, args.concurrency)))
+    if args.target in ("lambda", "all"):
+        results.append(bench_lambda(game_payloads, args.requests, args.concurrency))
+    for result in results:
+        print_result(result)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "config": vars(args),
+        "results": results
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\n📄 Results written to {args.output}")
+
+    if args.baseline and not compare_with_baseline(results, args.baseline, args.max_regression):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Compact integer encoding of two-deck Rummy hands and vectorized discard scoring
+Hands become one Python int (bitmask) or a 4x13 suit x rank count matrix for NumPy
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from rummy_engine import card_field, parse_rank, parse_suit
+
+# Card code = suit * 13 + (rank - 1); suits follow rummy_engine.SUIT_INDEX
+SUIT_NAMES = ('Hearts', 'Diamonds', 'Clubs', 'Spades')
+RANK_NAMES = ('Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King')
+PRINTED_JOKER = 52
+NO_CARD = -1
+
+# Mask layout: bits 0-51 first copy of each card, bits 52-103 second copy, bits 104-106 printed jokers
+COPY_BITS = 52
+JOKER_SHIFT = 104
+MASK_BYTES = 14
+
+# Points per rank column (Ace, 2..10, J, Q, K)
+RANK_POINTS = np.array([10, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10], dtype=np.int16)
+
+
+class EncodedState(NamedTuple):
+    """The parts of a GameState that suggestions depend on, as plain ints"""
+    hand: int
+    top_discard: int
+    joker: int
+    melds: Tuple[int, ...]
+    closed_deck_count: int
+
+    @property
+    def joker_rank(self) -> int:
+        """Wild rank (1-13), 0 when the joker card is a printed joker or missing"""
+        return self.joker % 13 + 1 if 0 <= self.joker < PRINTED_JOKER else 0
+
+    @property
+    def meld_count(self) -> int:
+        return len(self.melds)
+
+
+class DiscardScores(NamedTuple):
+    """Per-candidate scores from score_discards, aligned by index"""
+    codes: np.ndarray
+    deadwood: np.ndarray
+    adjacency: np.ndarray
+    best: int
+
+
+def card_code(card: Any) -> int:
+    """Encode a Card model or card dict; printed jokers and unknown cards map to PRINTED_JOKER"""
+    rank = parse_rank(card_field(card, 'rank'))
+    suit = parse_suit(card_field(card, 'suit'))
+    if rank is None or suit is None:
+        return PRINTED_JOKER
+    return suit * 13 + rank - 1
+
+
+def code_to_card(code: int, copy: int = 0) -> Dict[str, Any]:
+    """Decode a card code into a dict accepted by the Card model"""
+    if code == PRINTED_JOKER:
+        return {"id": f"joker_{copy}", "rank": "Joker", "suit": "Joker", "value": 0}
+    suit, rank_index = divmod(code, 13)
+    return {
+        "id": f"{RANK_NAMES[rank_index]}_{SUIT_NAMES[suit]}_{copy}",
+        "rank": RANK_NAMES[rank_index],
+        "suit": SUIT_NAMES[suit],
+        "value": rank_index + 1
+    }
+
+
+def encode_hand(cards: Iterable[Any]) -> int:
+    """Encode up to two copies of each card plus printed jokers into one int"""
+    mask = 0
+    printed_jokers = 0
+    for card in cards:
+        code = card_code(card)
+        if code == PRINTED_JOKER:
+            printed_jokers += 1
+        elif mask >> code & 1:
+            mask |= 1 << (code + COPY_BITS)
+        else:
+            mask |= 1 << code
+    return mask | (min(printed_jokers, 7) << JOKER_SHIFT)
+
+
+def decode_hand(mask: int) -> List[Dict[str, Any]]:
+    """Inverse of encode_hand; card order is by suit, then rank"""
+    cards = []
+    for code in range(COPY_BITS):
+        for copy in range(2):
+            if mask >> (code + copy * COPY_BITS) & 1:
+                cards.append(code_to_card(code, copy))
+    for copy in range(mask >> JOKER_SHIFT & 7):
+        cards.append(code_to_card(PRINTED_JOKER, copy))
+    return cards
+
+
+def printed_jokers(mask: int) -> int:
+    return mask >> JOKER_SHIFT & 7
+
+
+def mask_to_counts(mask: int) -> np.ndarray:
+    """4x13 suit x rank count matrix (values 0-2) for an encoded hand"""
+    bits = np.unpackbits(
+        np.frombuffer(mask.to_bytes(MASK_BYTES, 'little'), dtype=np.uint8),
+        bitorder='little'
+    )[:2 * COPY_BITS]
+    return bits.reshape(2, 4, 13).sum(axis=0, dtype=np.int8)
+
+
+def counts_to_mask(counts: np.ndarray, jokers: int = 0) -> int:
+    """Inverse of mask_to_counts"""
+    flat = np.asarray(counts).reshape(COPY_BITS)
+    bits = np.concatenate([flat >= 1, flat >= 2]).astype(np.uint8)
+    mask = int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+    return mask | (min(jokers, 7) << JOKER_SHIFT)
+
+
+def encode_game_state(game_state: Any) -> EncodedState:
+    """Encode a GameState model (or the equivalent dict) for analytical work"""
+    open_deck = card_field(game_state, 'openDeck') or []
+    joker_card = card_field(game_state, 'jokerCard')
+    return EncodedState(
+        hand=encode_hand(card_field(game_state, 'playerHand') or []),
+        top_discard=card_code(open_deck[-1]) if open_deck else NO_CARD,
+        joker=card_code(joker_card) if joker_card is not None else NO_CARD,
+        melds=tuple(encode_hand(meld) for meld in card_field(game_state, 'playerMelds') or []),
+        closed_deck_count=card_field(game_state, 'closedDeckCount') or 0
+    )
+
+
+def decode_game_state(encoded: EncodedState, game_id: str, current_player: str = "player",
+                      game_status: str = "in_progress") -> Dict[str, Any]:
+    """
+    GameState payload (dict accepted by the GameState model) for an encoded state. Card ids are
+    regenerated and the open deck is only its top card, which is all a suggestion looks at.
+    """
+    return {
+        "gameId": game_id,
+        "playerHand": decode_hand(encoded.hand),
+        "openDeck": [code_to_card(encoded.top_discard, copy=9)] if encoded.top_discard != NO_CARD else [],
+        "closedDeckCount": encoded.closed_deck_count,
+        "jokerCard": code_to_card(PRINTED_JOKER if encoded.joker == NO_CARD else encoded.joker, copy=8),
+        "currentPlayer": current_player,
+        "gameStatus": game_status,
+        "playerMelds": [decode_hand(meld) for meld in encoded.melds]
+    }
+
+
+def _split_wild(counts: np.ndarray, jokers: np.ndarray, joker_rank: int):
+    """Move the joker-rank column out of the natural counts and into the joker count"""
+    if not joker_rank:
+        return counts, jokers
+    column = joker_rank - 1
+    jokers = jokers + counts[..., column].sum(axis=-1)
+    counts = counts.copy()
+    counts[..., column] = 0
+    return counts, jokers
+
+
+def melded_counts(counts: np.ndarray) -> np.ndarray:
+    """Cards of (..., 4, 13) natural counts that sit in a run of 3+ or a set of 3+ suits"""
+    present = counts > 0
+    # Ace sits both below the two and above the king
+    wrapped = np.concatenate([present, present[..., :1]], axis=-1)
+
+    window = wrapped[..., :-2] & wrapped[..., 1:-1] & wrapped[..., 2:]
+    in_run = np.zeros_like(wrapped)
+    in_run[..., :-2] |= window
+    in_run[..., 1:-1] |= window
+    in_run[..., 2:] |= window
+    in_run = in_run[..., :13] | np.concatenate(
+        [in_run[..., 13:], np.zeros_like(in_run[..., 1:13])], axis=-1
+    )
+
+    in_set = (present.sum(axis=-2, keepdims=True) >= 3) & present
+    return np.minimum(counts, in_run.astype(np.int16) + in_set.astype(np.int16))
+
+
+def deadwood_points(counts: np.ndarray, jokers: Any = 0) -> np.ndarray:
+    """
+    Approximate deadwood for any number of hands at once.
+
+    counts has shape (..., 4, 13) and holds natural cards only. Cards in a run of 3+ or a set of
+    3+ suits are treated as melded; each joker then absorbs one near-meld pair (adjacent or
+    one-gap in suit, or same rank), most valuable pairs first. rummy_engine gives exact answers.
+    """
+    counts = np.asarray(counts, dtype=np.int16)
+    loose = counts - melded_counts(counts)
+    loose_points = loose * RANK_POINTS
+    total = loose_points.sum(axis=(-2, -1))
+
+    jokers = np.asarray(jokers, dtype=np.int16)
+    if not np.any(jokers):
+        return total
+
+    # Near-meld partners among the loose cards, per card slot
+    loose_present = loose > 0
+    wrapped_loose = np.concatenate([loose_present, loose_present[..., :1]], axis=-1)
+    near = np.zeros_like(wrapped_loose)
+    for gap in (1, 2):
+        pair = wrapped_loose[..., :-gap] & wrapped_loose[..., gap:]
+        near[..., :-gap] |= pair
+        near[..., gap:] |= pair
+    near = near[..., :13] | np.concatenate([near[..., 13:], np.zeros_like(near[..., 1:13])], axis=-1)
+    near |= (loose_present.sum(axis=-2, keepdims=True) >= 2) & loose_present
+
+    # Each joker completes one pair: take back the 2*jokers most valuable near-meld card points
+    near_points = np.where(near, RANK_POINTS, 0).reshape(*near.shape[:-2], COPY_BITS)
+    ranked = -np.sort(-near_points, axis=-1)
+    take = np.minimum(2 * jokers, COPY_BITS)[..., None]
+    absorbed = np.where(np.arange(COPY_BITS) < take, ranked, 0).sum(axis=-1)
+    return total - absorbed
+
+
+def score_discards(counts: np.ndarray, jokers: int = 0, joker_rank: int = 0, keep: Optional[int] = None) -> DiscardScores:
+    """
+    Score every distinct natural card in one hand as a discard candidate at once.
+
+    Returns the deadwood left after each discard and the discarded card's adjacency (suit
+    neighbours within two ranks plus same-rank cards). best is the candidate with the lowest
+    deadwood, then the fewest connections, then the highest points. `keep` (a card just taken
+    from the open deck) is not a candidate; best is NO_CARD when only wild cards are left.
+    """
+    counts, jokers = _split_wild(np.asarray(counts, dtype=np.int16), np.int16(jokers), joker_rank)
+    codes = np.flatnonzero(counts.reshape(COPY_BITS))
+    if keep is not None:
+        codes = codes[codes != keep]
+    if codes.size == 0:
+        empty = np.zeros(0, dtype=np.int16)
+        return DiscardScores(codes, empty, empty, NO_CARD)
+
+    variants = np.broadcast_to(counts.reshape(COPY_BITS), (codes.size, COPY_BITS)).copy()
+    variants[np.arange(codes.size), codes] -= 1
+    deadwood = deadwood_points(variants.reshape(codes.size, 4, 13), jokers)
+
+    present = (counts > 0).astype(np.int16)
+    wrapped = np.concatenate([present, present[:, :1]], axis=-1)
+    padded = np.pad(wrapped, ((0, 0), (2, 2)))
+    neighbours = padded[:, :-4] + padded[:, 1:-3] + padded[:, 3:-1] + padded[:, 4:]
+    neighbours = neighbours[:, :13] + np.concatenate(
+        [neighbours[:, 13:], np.zeros((4, 12), dtype=np.int16)], axis=-1
+    )
+    same_rank = present.sum(axis=0, keepdims=True) - present
+    adjacency = (neighbours + same_rank).reshape(COPY_BITS)[codes]
+
+    points = RANK_POINTS[codes % 13]
+    best = int(np.lexsort((-points, adjacency, deadwood))[0])
+    return DiscardScores(codes, deadwood, adjacency, best)
+
+
+def score_hand(cards: Iterable[Any], joker_card: Optional[Any] = None, keep: Optional[Any] = None) -> DiscardScores:
+    """score_discards for a list of Card models or card dicts"""
+    mask = encode_hand(cards)
+    joker_rank = (parse_rank(card_field(joker_card, 'rank')) or 0) if joker_card is not None else 0
+    return score_discards(mask_to_counts(mask), printed_jokers(mask), joker_rank,
+                          keep=card_code(keep) if keep is not None else None)
@@ -0,0 +1,251 @@
+"""
+Per-game card tracking from the player's point of view
+Seen, discarded and opponent-picked counts per suit x rank, updated in O(1) per move, so dead-card
+and safe-discard checks never rescan the discard history
+"""
+
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from card_encoding import PRINTED_JOKER, RANK_NAMES, SUIT_NAMES, card_code
+from prompt_builder import RANK_CODES, SUIT_CODES
+from rummy_engine import card_field, parse_rank
+
+DECKS = 2
+PRINTED_JOKERS = int(os.getenv('CARD_TRACKER_PRINTED_JOKERS', '2'))
+
+# Interest weights: taking a card from the open deck is a strong signal, letting one go a weak one
+PICK_WEIGHT = 2
+DISCARD_WEIGHT = 1
+RECENT_PICKS = 4
+
+
+class CardTracker:
+    """
+    Card counts of one game, indexed by card_encoding.card_code (suit * 13 + rank - 1, 52 = printed joker).
+
+    `seen` covers every copy the player has seen (own hand, discards, the joker card, melds);
+    `live` copies are the ones still unseen. Opponent picks from the open deck and opponent
+    discards feed per-suit and per-rank interest scores used to judge discards.
+    """
+
+    def __init__(self, joker_card: Any = None):
+        self.joker_rank = parse_rank(card_field(joker_card, 'rank')) if joker_card is not None else None
+        self.seen = [0] * (PRINTED_JOKER + 1)
+        self.discarded = [0] * (PRINTED_JOKER + 1)
+        self.opponent_discarded = [0] * (PRINTED_JOKER + 1)
+        self.opponent_picked = [0] * (PRINTED_JOKER + 1)
+        self.suit_interest = [0] * 4
+        self.rank_interest = [0] * 13
+        self.recent_picks: Deque[int] = deque(maxlen=RECENT_PICKS)
+        self.opponent_closed_draws = 0
+        self.moves = 0
+        if joker_card is not None:
+            self.seen[card_code(joker_card)] += 1
+
+    @classmethod
+    def from_state(cls, player_hand: List[Any], open_deck: Optional[List[Any]], joker_card: Any = None,
+                   player_melds: Optional[list] = None) -> "CardTracker":
+        """Tracker for a position joined mid-game; who discarded which card is unknown"""
+        tracker = cls(joker_card)
+        for card in player_hand or []:
+            tracker.seen[card_code(card)] += 1
+        for card in open_deck or []:
+            code = card_code(card)
+            tracker.seen[code] += 1
+            tracker.discarded[code] += 1
+        for meld in player_melds or []:
+            for card in meld:
+                tracker.seen[card_code(card)] += 1
+        return tracker
+
+    def is_wild(self, code: int) -> bool:
+        return code == PRINTED_JOKER or (self.joker_rank is not None and code % 13 == self.joker_rank - 1)
+
+    def _interest(self, code: int, weight: int):
+        if not self.is_wild(code):
+            suit, rank_index = divmod(code, 13)
+            self.suit_interest[suit] += weight
+            self.rank_interest[rank_index] += weight
+
+    # Updates, one per move
+
+    def player_drew(self, card: Any):
+        """Closed-deck draw by the player; open-deck draws were already seen"""
+        self.seen[card_code(card)] += 1
+        self.moves += 1
+
+    def player_discarded(self, card: Any):
+        self.discarded[card_code(card)] += 1
+        self.moves += 1
+
+    def opponent_picked_open(self, card: Any):
+        code = card_code(card)
+        self.opponent_picked[code] += 1
+        self.recent_picks.append(code)
+        self._interest(code, PICK_WEIGHT)
+        self.moves += 1
+
+    def opponent_drew_closed(self):
+        self.opponent_closed_draws += 1
+        self.moves += 1
+
+    def opponent_discarded_card(self, card: Any):
+        code = card_code(card)
+        self.seen[code] += 1
+        self.discarded[code] += 1
+        self.opponent_discarded[code] += 1
+        self._interest(code, -DISCARD_WEIGHT)
+        self.moves += 1
+
+    # Constant-time lookups
+
+    def live(self, code: int) -> int:
+        """Copies of a card code the player has not seen (closed deck or opponent hands)"""
+        copies = PRINTED_JOKERS if code == PRINTED_JOKER else DECKS
+        return max(copies - self.seen[code], 0)
+
+    def is_dead(self, card: Any) -> bool:
+        return self.live(card_code(card)) == 0
+
+    def wild_outs(self) -> int:
+        """Unseen printed jokers and joker-rank cards"""
+        outs = self.live(PRINTED_JOKER)
+        if self.joker_rank is not None:
+            outs += sum(self.live(suit * 13 + self.joker_rank - 1) for suit in range(4))
+        return outs
+
+    def discard_risk(self, card: Any) -> int:
+        """
+        How likely the opponent wants this card: suit and rank interest plus opponent picks next to
+        it (same rank, or same suit within two ranks), minus copies of its rank the opponent threw.
+        Zero or below is a safe discard. Wild cards are always risky.
+        """
+        code = card_code(card)
+        if self.is_wild(code):
+            return 100
+        suit, rank_index = divmod(code, 13)
+        risk = self.suit_interest[suit] + self.rank_interest[rank_index]
+        picked = self.opponent_picked
+        for other_suit in range(4):
+            if other_suit != suit:
+                risk += 3 * picked[other_suit * 13 + rank_index]
+                risk -= 3 * self.opponent_discarded[other_suit * 13 + rank_index]
+        for offset in (-2, -1, 1, 2):
+            target = rank_index + offset
+            if rank_index == 0 and target < 0:
+                # The ace also sits above the king
+                target += 13
+            if 0 <= target <= 13:
+                risk += 3 * picked[suit * 13 + target % 13]
+        risk -= 3 * self.opponent_discarded[code]
+        return risk
+
+    def is_safe_discard(self, card: Any) -> bool:
+        return self.discard_risk(card) <= 0
+
+    def outs(self, first: Any, second: Any) -> int:
+        """
+        Unseen natural cards that turn two cards into a three-card meld: the other suits of a pair's
+        rank, both ends of two adjacent suit cards, or the middle of a one-gap pair. Wild cards
+        complete any of these as well; see wild_outs.
+        """
+        a, b = card_code(first), card_code(second)
+        if self.is_wild(a) or self.is_wild(b):
+            return 0
+        (suit_a, index_a), (suit_b, index_b) = divmod(a, 13), divmod(b, 13)
+        if index_a == index_b and suit_a != suit_b:
+            return sum(self.live(suit * 13 + index_a) for suit in range(4) if suit not in (suit_a, suit_b))
+        if suit_a != suit_b:
+            return 0
+        # Ranks 1-14: the ace counts as 14 when that brings it closer to the other card
+        low, high = sorted((index_a + 1, index_b + 1))
+        if low == 1 and 14 - high < high - 1:
+            low, high = high, 14
+        needed = {1: (low - 1, high + 1), 2: (low + 1,)}.get(high - low, ())
+        codes = [suit_a * 13 + (rank - 1) % 13 for rank in needed if 1 <= rank <= 14]
+        return sum(self.live(code) for code in codes if not self.is_wild(code))
+
+    def collecting(self) -> Dict[str, List[str]]:
+        """Suits and ranks with positive interest, strongest first"""
+        suits = sorted((i for i in range(4) if self.suit_interest[i] > 0), key=lambda i: -self.suit_interest[i])
+        ranks = sorted((i for i in range(13) if self.rank_interest[i] > 0), key=lambda i: -self.rank_interest[i])
+        return {
+            "suits": [SUIT_NAMES[i] for i in suits],
+            "ranks": [RANK_NAMES[i] for i in ranks]
+        }
+
+    def hint(self) -> Optional[str]:
+        """One prompt line about the opponent, or None before any opponent pick"""
+        if not self.recent_picks:
+            return None
+        picks = " ".join(
+            RANK_CODES[code % 13 + 1] + SUIT_CODES[code // 13] if code != PRINTED_JOKER else "JK"
+            for code in self.recent_picks
+        )
+        collecting = self.collecting()
+        wants = [suit[0] for suit in collecting["suits"][:2]] + collecting["ranks"][:2]
+        line = f"Opponent picked: {picks}"
+        return line + (f"; likely collecting {' '.join(wants)}" if wants else "")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "moves": self.moves,
+            "opponent_picks": sum(self.opponent_picked),
+            "opponent_discards": sum(self.opponent_discarded),
+            "opponent_closed_draws": self.opponent_closed_draws,
+            "collecting": self.collecting()
+        }
+
+
+class CardTrackerRegistry:
+    """LRU of game id -> CardTracker; a game without a tracker gets one built from its state"""
+
+    def __init__(self, max_games: int = 10000):
+        self.max_games = max_games
+        self._trackers: "OrderedDict[str, CardTracker]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.built = 0
+
+    @classmethod
+    def from_env(cls) -> "CardTrackerRegistry":
+        return cls(max_games=int(os.environ.get('CARD_TRACKER_MAX_GAMES', '10000')))
+
+    def peek(self, game_id: Optional[str]) -> Optional[CardTracker]:
+        if not game_id:
+            return None
+        with self._lock:
+            tracker = self._trackers.get(game_id)
+            if tracker is not None:
+                self._trackers.move_to_end(game_id)
+            return tracker
+
+    def get(self, game_id: str, game_state: Any) -> CardTracker:
+        """Tracker of a stored game (CompactGameState or GameState), built from it when missing"""
+        tracker = self.peek(game_id)
+        if tracker is not None:
+            return tracker
+        tracker = CardTracker.from_state(
+            card_field(game_state, 'playerHand'),
+            card_field(game_state, 'openDeck'),
+            card_field(game_state, 'jokerCard'),
+            card_field(game_state, 'playerMelds')
+        )
+        self.built += 1
+        if self.max_games > 0:
+            with self._lock:
+                self._trackers[game_id] = tracker
+                while len(self._trackers) > self.max_games:
+                    self._trackers.popitem(last=False)
+        return tracker
+
+    def discard(self, game_id: str):
+        with self._lock:
+            self._trackers.pop(game_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            games = len(self._trackers)
+        return {"games": games, "max_games": self.max_games, "built_from_state": self.built}
@@ -0,0 +1,91 @@
+"""
+Local stand-in for the bedrock-agent-runtime client
+Emits invoke_agent completion events with configurable latency, chunking, throttling and errors
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from botocore.exceptions import ClientError
+
+SUGGESTION_TEXT = (
+    "🎯 Fake Agent: Draw from the closed deck unless the top discard completes a sequence. "
+    "Keep connected middle cards, build the pure sequence first, and discard the highest "
+    "unconnected face card. Save jokers for impure sequences or sets. "
+)
+
+
+class FakeAgentRuntime:
+    """
+    Drop-in for boto3.client('bedrock-agent-runtime') with production-like timing.
+
+    Time to first chunk is log-normal around first_chunk_ms (first_chunk_sigma widens the tail);
+    later chunks arrive every chunk_interval_ms. throttle_rate and error_rate raise the same
+    ClientError codes the real service returns, before any chunk is sent.
+    """
+
+    def __init__(self, first_chunk_ms: float = 800.0, first_chunk_sigma: float = 0.5,
+                 chunk_interval_ms: float = 40.0, response_chars: int = 600, chunk_chars: int = 60,
+                 throttle_rate: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.first_chunk_ms = first_chunk_ms
+        self.first_chunk_sigma = first_chunk_sigma
+        self.chunk_interval_ms = chunk_interval_ms
+        self.response_chars = response_chars
+        self.chunk_chars = max(chunk_chars, 1)
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.invocations = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeAgentRuntime":
+        seed = os.environ.get('FAKE_BEDROCK_SEED')
+        return cls(
+            first_chunk_ms=float(os.environ.get('FAKE_BEDROCK_FIRST_CHUNK_MS', '800')),
+            first_chunk_sigma=float(os.environ.get('FAKE_BEDROCK_FIRST_CHUNK_SIGMA', '0.5')),
+            chunk_interval_ms=float(os.environ.get('FAKE_BEDROCK_CHUNK_INTERVAL_MS', '40')),
+            response_chars=int(os.environ.get('FAKE_BEDROCK_RESPONSE_CHARS', '600')),
+            chunk_chars=int(os.environ.get('FAKE_BEDROCK_CHUNK_CHARS', '60')),
+            throttle_rate=float(os.environ.get('FAKE_BEDROCK_THROTTLE_RATE', '0')),
+            error_rate=float(os.environ.get('FAKE_BEDROCK_ERROR_RATE', '0')),
+            seed=int(seed) if seed else None
+        )
+
+    def _draw(self):
+        with self._rng_lock:
+            roll = self._rng.random()
+            delay = self.first_chunk_ms * math.exp(self._rng.gauss(0.0, self.first_chunk_sigma))
+        return roll, delay / 1000
+
+    def _error(self, code: str, message: str) -> ClientError:
+        return ClientError({"Error": {"Code": code, "Message": message}}, "InvokeAgent")
+
+    def invoke_agent(self, agentId: str, agentAliasId: str, sessionId: str, inputText: str, **kwargs) -> Dict[str, Any]:
+        """Same call shape and response shape as the real invoke_agent"""
+        self.invocations += 1
+        roll, first_chunk_delay = self._draw()
+        if roll < self.throttle_rate:
+            time.sleep(min(first_chunk_delay, 0.05))
+            raise self._error("ThrottlingException", "Rate exceeded (fake)")
+        if roll < self.throttle_rate + self.error_rate:
+            time.sleep(first_chunk_delay)
+            raise self._error("InternalServerException", "Internal server error (fake)")
+
+        return {
+            "completion": self._completion(first_chunk_delay),
+            "contentType": "text/plain",
+            "sessionId": sessionId
+        }
+
+    def _completion(self, first_chunk_delay: float) -> Iterator[Dict[str, Any]]:
+        text = (SUGGESTION_TEXT * (self.response_chars // len(SUGGESTION_TEXT) + 1))[:self.response_chars]
+        time.sleep(first_chunk_delay)
+        for offset in range(0, len(text), self.chunk_chars):
+            if offset:
+                time.sleep(self.chunk_interval_ms / 1000)
+            yield {"chunk": {"bytes": text[offset:offset + self.chunk_chars].encode('utf-8')}}
@@ -0,0 +1,199 @@
+"""
+Fast-path GameState ingestion
+Parses raw JSON bytes, type-checks the exact shapes clients send and builds slot-based internal cards;
+anything else goes through a precompiled Pydantic validator, which coerces it or reports the errors
+"""
+
+import json
+import sys
+from typing import Any, Dict, List, Tuple, Union
+
+from pydantic import TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+class _CardPayload(TypedDict):
+    id: str
+    rank: str
+    suit: str
+    value: int
+
+
+class _GameStatePayload(TypedDict):
+    gameId: str
+    playerHand: List[_CardPayload]
+    openDeck: List[_CardPayload]
+    closedDeckCount: int
+    jokerCard: _CardPayload
+    currentPlayer: str
+    gameStatus: str
+    playerMelds: NotRequired[List[List[_CardPayload]]]
+    version: NotRequired[int]
+
+
+# Built once at import; validate_json parses and validates bytes in one pass without model instances
+game_state_validator = TypeAdapter(_GameStatePayload)
+
+
+class _NotExact(Exception):
+    """A payload the exact-type check cannot take; the validator decides instead"""
+
+
+class CompactCard:
+    """Immutable internal card; same attribute names as the API Card model"""
+
+    __slots__ = ('id', 'rank', 'suit', 'value')
+
+    def __init__(self, id: str, rank: str, suit: str, value: int):
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'rank', rank)
+        object.__setattr__(self, 'suit', suit)
+        object.__setattr__(self, 'value', value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactCard is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, CompactCard) and self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return f"CompactCard({self.rank} of {self.suit})"
+
+    def as_tuple(self) -> Tuple[str, str, str, int]:
+        return (self.id, self.rank, self.suit, self.value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "rank": self.rank, "suit": self.suit, "value": self.value}
+
+
+# Cards are shared between games (ids repeat across decks), so each distinct card is built once
+_CARD_POOL: Dict[Tuple[str, str, str, int], CompactCard] = {}
+_CARD_POOL_LIMIT = 65536
+
+
+def compact_card(payload: Dict[str, Any]) -> CompactCard:
+    key = (payload['id'], payload['rank'], payload['suit'], payload['value'])
+    card = _CARD_POOL.get(key)
+    if card is None:
+        card = CompactCard(sys.intern(key[0]), sys.intern(key[1]), sys.intern(key[2]), key[3])
+        if len(_CARD_POOL) < _CARD_POOL_LIMIT:
+            _CARD_POOL[key] = card
+    return card
+
+
+def _exact_card(payload: Any) -> CompactCard:
+    """compact_card for parsed, unvalidated JSON: pooled cards cost one lookup, new ones are type-checked"""
+    if type(payload) is not dict:
+        raise _NotExact
+    key = (payload.get('id'), payload.get('rank'), payload.get('suit'), payload.get('value'))
+    # 7.0 or True would find the pooled card for 7 or 1; the validator coerces those itself
+    if type(key[3]) is not int:
+        raise _NotExact
+    card = _CARD_POOL.get(key)
+    if card is None:
+        if type(key[0]) is not str or type(key[1]) is not str or type(key[2]) is not str:
+            raise _NotExact
+        card = CompactCard(sys.intern(key[0]), sys.intern(key[1]), sys.intern(key[2]), key[3])
+        if len(_CARD_POOL) < _CARD_POOL_LIMIT:
+            _CARD_POOL[key] = card
+    return card
+
+
+def _exact_cards(payload: Any) -> List[CompactCard]:
+    if type(payload) is not list:
+        raise _NotExact
+    return [_exact_card(card) for card in payload]
+
+
+class CompactGameState:
+    """
+    Internal game state built from validated payloads.
+
+    Exposes the same fields as the API GameState model, plus model_validate_json /
+    model_dump_json so it can be used as the game store's model.
+    """
+
+    __slots__ = ('gameId', 'playerHand', 'openDeck', 'closedDeckCount', 'jokerCard',
+                 'currentPlayer', 'gameStatus', 'playerMelds', 'version')
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.gameId = payload['gameId']
+        self.playerHand = [compact_card(card) for card in payload['playerHand']]
+        self.openDeck = [compact_card(card) for card in payload['openDeck']]
+        self.closedDeckCount = payload['closedDeckCount']
+        self.jokerCard = compact_card(payload['jokerCard'])
+        self.currentPlayer = sys.intern(payload['currentPlayer'])
+        self.gameStatus = sys.intern(payload['gameStatus'])
+        self.playerMelds = [[compact_card(card) for card in meld] for meld in payload.get('playerMelds', [])]
+        self.version = payload.get('version', 0)
+
+    @classmethod
+    def model_validate_json(cls, raw: Union[str, bytes]) -> "CompactGameState":
+        """Validate raw JSON and build the compact state; raises pydantic.ValidationError"""
+        try:
+            return cls._from_exact(_loads(raw))
+        except (ValueError, _NotExact):
+            # Malformed JSON, a missing field or a value needing coercion: same result and errors as the models
+            return cls(game_state_validator.validate_json(raw))
+
+    @classmethod
+    def _from_exact(cls, payload: Any) -> "CompactGameState":
+        """Build from parsed JSON whose fields already have their exact types; raises _NotExact otherwise"""
+        if type(payload) is not dict:
+            raise _NotExact
+        game_id, closed_deck_count = payload.get('gameId'), payload.get('closedDeckCount')
+        current_player, game_status = payload.get('currentPlayer'), payload.get('gameStatus')
+        melds, version = payload.get('playerMelds', []), payload.get('version', 0)
+        if type(game_id) is not str or type(closed_deck_count) is not int or type(current_player) is not str \
+                or type(game_status) is not str or type(melds) is not list or type(version) is not int:
+            raise _NotExact
+        state = cls.__new__(cls)
+        state.gameId = game_id
+        state.playerHand = _exact_cards(payload.get('playerHand'))
+        state.openDeck = _exact_cards(payload.get('openDeck'))
+        state.closedDeckCount = closed_deck_count
+        state.jokerCard = _exact_card(payload.get('jokerCard'))
+        state.currentPlayer = sys.intern(current_player)
+        state.gameStatus = sys.intern(game_status)
+        state.playerMelds = [_exact_cards(meld) for meld in melds]
+        state.version = version
+        return state
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "gameId": self.gameId,
+            "playerHand": [card.to_dict() for card in self.playerHand],
+            "openDeck": [card.to_dict() for card in self.openDeck],
+            "closedDeckCount": self.closedDeckCount,
+            "jokerCard": self.jokerCard.to_dict(),
+            "currentPlayer": self.currentPlayer,
+            "gameStatus": self.gameStatus,
+            "playerMelds": [[card.to_dict() for card in meld] for meld in self.playerMelds],
+            "version": self.version
+        }
+
+    def model_dump_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    def copy(self) -> "CompactGameState":
+        """Copy whose card lists can change without touching this state; cards are immutable and shared"""
+        state = CompactGameState.__new__(CompactGameState)
+        state.gameId = self.gameId
+        state.playerHand = list(self.playerHand)
+        state.openDeck = list(self.openDeck)
+        state.closedDeckCount = self.closedDeckCount
+        state.jokerCard = self.jokerCard
+        state.currentPlayer = self.currentPlayer
+        state.gameStatus = self.gameStatus
+        state.playerMelds = [list(meld) for meld in self.playerMelds]
+        state.version = self.version
+        return state
@@ -0,0 +1,107 @@
+"""
+Per-game hand analysis kept warm across moves
+Draws and discards update the previous analysis for the changed card instead of searching again
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from rummy_engine import HandAnalysis
+from suggestion_cache import card_key
+
+
+def hand_key(cards: List[Any], joker_card: Any) -> Tuple[str, ...]:
+    """Cards in hand order plus the joker; an analysis is only reused for exactly this hand"""
+    return tuple(card_key(card) for card in cards) + (card_key(joker_card),)
+
+
+class GameAnalysisCache:
+    """LRU of game id -> (hand key, HandAnalysis)"""
+
+    def __init__(self, max_games: int = 10000):
+        self.max_games = max_games
+        self._entries: "OrderedDict[str, Tuple[Tuple[str, ...], HandAnalysis]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.incremental = 0
+        self.recomputed = 0
+
+    @classmethod
+    def from_env(cls) -> "GameAnalysisCache":
+        return cls(max_games=int(os.environ.get('GAME_ANALYSIS_MAX_GAMES', '10000')))
+
+    def _store(self, game_id: str, key: Tuple[str, ...], analysis: HandAnalysis):
+        if self.max_games <= 0:
+            return
+        with self._lock:
+            self._entries[game_id] = (key, analysis)
+            self._entries.move_to_end(game_id)
+            while len(self._entries) > self.max_games:
+                self._entries.popitem(last=False)
+
+    def get(self, game_id: str, hand: List[Any], joker_card: Any) -> HandAnalysis:
+        """Warm analysis of this game's hand, computed from scratch only when the hand is unknown"""
+        key = hand_key(hand, joker_card)
+        with self._lock:
+            entry = self._entries.get(game_id)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        analysis = HandAnalysis(list(hand), joker_card)
+        self.recomputed += 1
+        self._store(game_id, key, analysis)
+        return analysis
+
+    def peek(self, game_id: str, hand: List[Any], joker_card: Any) -> Optional[HandAnalysis]:
+        """Warm analysis of exactly this hand, or None; never searches"""
+        with self._lock:
+            entry = self._entries.get(game_id)
+        if entry is not None and entry[0] == hand_key(hand, joker_card):
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def apply(self, game_id: str, hand: List[Any], joker_card: Any, added: Optional[Any] = None,
+              removed_positions: Optional[List[int]] = None) -> Tuple[HandAnalysis, bool]:
+        """
+        Analysis of `hand` after a move, and whether it was derived incrementally.
+
+        `added` was appended to the previous hand, `removed_positions` index the previous hand.
+        Falls back to a full search when the cached hand does not match or the change touches a meld.
+        """
+        with self._lock:
+            entry = self._entries.get(game_id)
+        same_deal = entry is not None and entry[0][-1] == card_key(joker_card)
+        derived: Optional[HandAnalysis] = entry[1] if same_deal else None
+        for position in sorted(removed_positions or [], reverse=True):
+            derived = derived.without(position) if derived is not None else None
+        if added is not None and derived is not None:
+            derived = derived.with_card(added)
+
+        key = hand_key(hand, joker_card)
+        if derived is not None and hand_key(derived.cards, joker_card) == key:
+            self.incremental += 1
+            self._store(game_id, key, derived)
+            return derived, True
+
+        analysis = HandAnalysis(list(hand), joker_card)
+        self.recomputed += 1
+        self._store(game_id, key, analysis)
+        return analysis, False
+
+    def discard(self, game_id: str):
+        with self._lock:
+            self._entries.pop(game_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            games = len(self._entries)
+        return {
+            "games": games,
+            "max_games": self.max_games,
+            "hits": self.hits,
+            "incremental_updates": self.incremental,
+            "full_recomputes": self.recomputed
+        }
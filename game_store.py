@@ -0,0 +1,247 @@
+"""
+Game state storage for the Suggest API
+A memory LRU store for single-worker use and a SQLite (WAL) store shared by workers on one host
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+# gameStatus values after which a game only needs to live for the short finished TTL
+FINISHED_STATUSES = {"completed", "finished", "ended", "declared", "abandoned"}
+
+
+class GameStore(ABC):
+    """Storage interface for GameState models keyed by gameId"""
+
+    # Stores whose calls block on I/O set a thread of their own; async handlers call through it
+    executor: Optional[ThreadPoolExecutor] = None
+
+    def __init__(self, model: Type, finished_ttl_seconds: float = 600.0, idle_ttl_seconds: float = 86400.0):
+        self.model = model
+        self.finished_ttl_seconds = finished_ttl_seconds
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.evictions = 0
+
+    def is_expired(self, status: str, updated_at: float, now: float) -> bool:
+        ttl = self.finished_ttl_seconds if status.lower() in FINISHED_STATUSES else self.idle_ttl_seconds
+        return updated_at + ttl < now
+
+    @abstractmethod
+    def get(self, game_id: str) -> Optional[Any]:
+        """Return the stored GameState, or None if it is missing or expired"""
+
+    @abstractmethod
+    def put(self, game_state: Any):
+        """Insert or replace a game"""
+
+    @abstractmethod
+    def delete(self, game_id: str):
+        """Remove a game if present"""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Drop finished and idle games past their TTL; returns how many were removed"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the health endpoint"""
+
+    async def get_async(self, game_id: str) -> Optional[Any]:
+        """get() for async handlers: inline for the memory store, on the store's thread otherwise"""
+        if self.executor is None:
+            return self.get(game_id)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.get, game_id)
+
+    async def put_async(self, game_state: Any):
+        if self.executor is None:
+            self.put(game_state)
+            return
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.put, game_state)
+
+    async def stats_async(self) -> Dict[str, Any]:
+        if self.executor is None:
+            return self.stats()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.stats)
+
+    def close(self):
+        pass
+
+    def __contains__(self, game_id: str) -> bool:
+        return self.get(game_id) is not None
+
+
+class MemoryGameStore(GameStore):
+    """Per-process LRU store with a bounded number of games"""
+
+    def __init__(self, model: Type, max_games: int = 10000, **ttls):
+        super().__init__(model, **ttls)
+        self.max_games = max_games
+        self._games: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, game_id: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._games.get(game_id)
+            if entry is None:
+                return None
+            game_state, updated_at = entry
+            if self.is_expired(game_state.gameStatus, updated_at, time.time()):
+                del self._games[game_id]
+                self.evictions += 1
+                return None
+            self._games.move_to_end(game_id)
+            return game_state
+
+    def put(self, game_state: Any):
+        with self._lock:
+            self._games[game_state.gameId] = (game_state, time.time())
+            self._games.move_to_end(game_state.gameId)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, game_id: str):
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def evict_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [
+                game_id for game_id, (game_state, updated_at) in self._games.items()
+                if self.is_expired(game_state.gameStatus, updated_at, now)
+            ]
+            for game_id in expired:
+                del self._games[game_id]
+            self.evictions += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "games": len(self._games),
+            "max_games": self.max_games,
+            "evictions": self.evictions
+        }
+
+
+class SQLiteGameStore(GameStore):
+    """
+    SQLite store in WAL mode so several uvicorn workers on one host can share games.
+
+    States are stored as zlib-compressed compact JSON in a WITHOUT ROWID table clustered on
+    game_id, so a lookup is a single primary-key probe. Expired games are removed lazily on
+    read and in bulk every `evict_every` writes. Async handlers reach the database through one
+    dedicated thread, so a slow disk or a writer holding the lock never stalls the event loop.
+    """
+
+    def __init__(self, model: Type, path: str = "games.db", evict_every: int = 256, **ttls):
+        super().__init__(model, **ttls)
+        self.path = path
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        # One thread: the connection is serialized by the lock anyway
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='game-store')
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS games (
+                game_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                state BLOB NOT NULL
+            ) WITHOUT ROWID"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_games_updated_at ON games (updated_at)")
+        logger.info(f"🗄️ SQLite game store ready at {path}")
+
+    def _encode(self, game_state: Any) -> bytes:
+        return zlib.compress(game_state.model_dump_json().encode('utf-8'), 1)
+
+    def _decode(self, blob: bytes) -> Any:
+        return self.model.model_validate_json(zlib.decompress(blob))
+
+    def get(self, game_id: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, updated_at, state FROM games WHERE game_id = ?", (game_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, updated_at, blob = row
+            if self.is_expired(status, updated_at, time.time()):
+                self._conn.execute("DELETE FROM games WHERE game_id = ?", (game_id,))
+                self.evictions += 1
+                return None
+        return self._decode(blob)
+
+    def put(self, game_state: Any):
+        blob = self._encode(game_state)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO games (game_id, status, updated_at, state) VALUES (?, ?, ?, ?)",
+                (game_state.gameId, game_state.gameStatus, time.time(), blob)
+            )
+            self._writes += 1
+            run_eviction = self._writes % self.evict_every == 0
+        if run_eviction:
+            self.evict_expired()
+
+    def delete(self, game_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM games WHERE game_id = ?", (game_id,))
+
+    def evict_expired(self) -> int:
+        now = time.time()
+        statuses = tuple(FINISHED_STATUSES)
+        placeholders = ",".join("?" * len(statuses))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"""DELETE FROM games WHERE
+                    (LOWER(status) IN ({placeholders}) AND updated_at < ?)
+                    OR updated_at < ?""",
+                (*statuses, now - self.finished_ttl_seconds, now - self.idle_ttl_seconds)
+            )
+            self.evictions += cursor.rowcount
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            games = self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "games": games,
+            "evictions": self.evictions
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+def create_game_store(model: Type) -> GameStore:
+    """Build the store selected by GAME_STORE ("memory" or "sqlite")"""
+    ttls = {
+        "finished_ttl_seconds": float(os.getenv('GAME_STORE_FINISHED_TTL_SECONDS', '600')),
+        "idle_ttl_seconds": float(os.getenv('GAME_STORE_IDLE_TTL_SECONDS', '86400'))
+    }
+    backend = os.getenv('GAME_STORE', 'memory').lower()
+    if backend == 'sqlite':
+        return SQLiteGameStore(model, path=os.getenv('GAME_STORE_PATH', 'games.db'), **ttls)
+    return MemoryGameStore(model, max_games=int(os.getenv('GAME_STORE_MAX_GAMES', '10000')), **ttls)
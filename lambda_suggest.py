@@ -1,68 +1,226 @@
+import asyncio
 import json
-import boto3
 import os
 import logging
-from typing import Dict, Any, Optional
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
+# Started before the local imports so the cold start they cost is part of module init
+_module_init_started = time.perf_counter()
+
+from admission import INTERACTIVE, PRIORITIES, AdmissionController, RateLimitedError
+from agent_sessions import AgentSessionRegistry
+from prompt_builder import estimate_tokens, position_snapshot, prompt_builder
+from request_metrics import RequestTimer, record_request
+from resilience import CircuitOpenError, DeadlineExceededError, ResilientInvoker, failure_reason
+from rummy_engine import format_suggestion, suggest_move
+from suggestion_cache import state_fingerprint, suggestion_cache
+from suggestion_index import SuggestionIndex
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# "bedrock" asks the agent; "engine" answers from the in-process rule engine
+SUGGESTION_PROVIDER = os.environ.get('SUGGESTION_PROVIDER', 'bedrock').lower()
+# Answer used when the agent fails, times out or its circuit is open: "demo" text or the rule "engine"
+BEDROCK_FALLBACK_PROVIDER = os.environ.get('BEDROCK_FALLBACK_PROVIDER', 'demo').lower()
+# "compact" uses the token-budgeted prompt builder; "verbose" keeps the original prose prompt
+PROMPT_STYLE = os.environ.get('PROMPT_STYLE', 'compact').lower()
+
+# The agent gets at most BEDROCK_DEADLINE_SECONDS, capped by the Lambda time left minus a margin to respond
+BEDROCK_DEADLINE_SECONDS = float(os.environ.get('BEDROCK_DEADLINE_SECONDS', '25'))
+LAMBDA_RESPONSE_MARGIN_SECONDS = float(os.environ.get('LAMBDA_RESPONSE_MARGIN_SECONDS', '1.5'))
+
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Client-Id, X-Request-Priority',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS'
+}
+
+# Response streaming (function URL, InvokeMode RESPONSE_STREAM): a JSON prelude with the status
+# and headers, eight NUL bytes, then the body as it is produced
+STREAM_PRELUDE_DELIMITER = b'\x00' * 8
+STREAM_HEADERS = {
+    **CORS_HEADERS,
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache'
+}
+
 class BedrockAgentService:
     """Service class for interacting with AWS Bedrock Agent Runtime"""
     
     def __init__(self):
-        self.client = boto3.client(
-            'bedrock-agent-runtime',
-            region_name=os.environ.get('AWS_REGION', 'us-east-1')
-        )
+        if os.environ.get('BEDROCK_RUNTIME', 'aws').lower() == 'fake':
+            # Local performance testing: simulated agent with injected latency and errors
+            from fake_bedrock import FakeAgentRuntime
+            self.client = FakeAgentRuntime.from_env()
+        else:
+            # boto3 is the heaviest import here, so it is only paid for when a client is first needed
+            import boto3
+            from botocore.config import Config
+            
+            self.client = boto3.client(
+                'bedrock-agent-runtime',
+                region_name=os.environ.get('AWS_REGION', 'us-east-1'),
+                config=Config(
+                    tcp_keepalive=True,
+                    read_timeout=BEDROCK_DEADLINE_SECONDS,
+                    # Retries are handled by the invoker so they respect the deadline and retry budget
+                    retries={'max_attempts': 1, 'mode': 'standard'}
+                )
+            )
         self.agent_id = os.environ.get('BEDROCK_AGENT_ID', 'AJBHXXILZN')
         self.agent_alias_id = os.environ.get('BEDROCK_AGENT_ALIAS_ID', 'AVKP1ITZAA')
+        # Breaker, retry budget and latency history survive across warm invocations of this container
+        self.invoker = ResilientInvoker.from_env(ThreadPoolExecutor(max_workers=4, thread_name_prefix='bedrock-agent'))
     
     def generate_session_id(self) -> str:
         """Generate a unique session ID"""
         timestamp = int(datetime.now().timestamp() * 1000)
         return f"session-{timestamp}"
     
-    async def invoke_agent(self, prompt: str, session_id: Optional[str] = None) -> Dict[str, Any]:
-        """Invoke the Bedrock Agent with a prompt"""
+    def complete(self, prompt: str, session_id: str, cancel, timings: Optional[Dict[str, float]] = None,
+                 on_chunk: Optional[Callable[[str], Any]] = None) -> str:
+        """One blocking invoke_agent call, drained until done or until `cancel` is set
+        
+        When timings is given it receives first_chunk / stream seconds and chunk / byte counts;
+        on_chunk is called with each decoded chunk as it arrives.
+        """
+        if cancel.is_set():
+            raise DeadlineExceededError("Bedrock Agent deadline exceeded before the call started")
+        call_started = time.perf_counter()
+        response = self.client.invoke_agent(
+            agentId=self.agent_id,
+            agentAliasId=self.agent_alias_id,
+            sessionId=session_id,
+            inputText=prompt
+        )
+        
+        completion = ""
+        first_chunk_at = None
+        chunk_count = 0
+        byte_count = 0
+        for event in response.get('completion', []):
+            if cancel.is_set():
+                break
+            chunk = event.get('chunk', {})
+            if 'bytes' in chunk:
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                chunk_count += 1
+                byte_count += len(chunk['bytes'])
+                chunk_text = chunk['bytes'].decode('utf-8')
+                completion += chunk_text
+                if on_chunk:
+                    on_chunk(chunk_text)
+        if timings is not None:
+            finished = time.perf_counter()
+            timings['first_chunk'] = (first_chunk_at or finished) - call_started
+            timings['stream'] = finished - first_chunk_at if first_chunk_at else 0.0
+            timings['chunks'] = chunk_count
+            timings['bytes'] = byte_count
+        return completion
+    
+    def invoke_with_deadline(self, prompt: str, deadline_seconds: float, session_id: Optional[str] = None,
+                             hedge: bool = True, timer: Optional[RequestTimer] = None) -> str:
+        """Invoke the agent with retries, hedging and the circuit breaker; raises once it gives up"""
+        session_id = session_id or self.generate_session_id()
+        
+        def attempt(cancel):
+            timings: Dict[str, float] = {}
+            return self.complete(prompt, session_id, cancel, timings), timings
+        
+        invoke_started = time.perf_counter()
         try:
-            if not session_id:
-                session_id = self.generate_session_id()
-            
-            response = self.client.invoke_agent(
-                agentId=self.agent_id,
-                agentAliasId=self.agent_alias_id,
-                sessionId=session_id,
-                inputText=prompt
-            )
-            
-            # Process streaming response
-            completion = ""
-            if 'completion' in response:
-                for event in response['completion']:
-                    if 'chunk' in event:
-                        chunk = event['chunk']
-                        if 'bytes' in chunk:
-                            chunk_text = chunk['bytes'].decode('utf-8')
-                            completion += chunk_text
-            
-            return {
-                'success': True,
-                'message': completion,
-                'session_id': session_id,
-                'source': 'bedrock-agent'
-            }
-            
-        except Exception as e:
-            logger.error(f"Bedrock Agent error: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'message': 'Sorry, I encountered an error processing your request. Please try again.',
-                'source': 'bedrock-error'
-            }
+            completion, timings = asyncio.run(self.invoker.invoke(attempt, deadline_seconds, hedge=hedge))
+        except Exception:
+            if timer is not None:
+                timer.record('agent_failed', time.perf_counter() - invoke_started)
+            raise
+        if timer is not None:
+            # Stage timings of the attempt that answered
+            timer.add_agent_call(timings)
+        return completion
+    
+    def stream_completion(self, prompt: str, deadline_seconds: float, session_id: Optional[str] = None,
+                          timer: Optional[RequestTimer] = None) -> Iterator[str]:
+        """Yield completion chunks as they arrive; the first one must arrive within deadline_seconds
+        
+        Streams are not retried or hedged because chunks may already have reached the client.
+        Raises before the first chunk when the agent fails, times out or its circuit is open.
+        """
+        breaker = self.invoker.breaker
+        if not breaker.allow_request():
+            raise CircuitOpenError("Bedrock Agent circuit is open")
+        session_id = session_id or self.generate_session_id()
+        chunks: queue.Queue = queue.Queue()
+        cancel = threading.Event()
+        timings: Dict[str, float] = {}
+        end_of_stream = object()
+        
+        def produce():
+            try:
+                self.complete(prompt, session_id, cancel, timings, on_chunk=chunks.put)
+                chunks.put(end_of_stream)
+            except Exception as error:
+                chunks.put(error)
+        
+        started = time.perf_counter()
+        self.invoker.executor.submit(produce)
+        received_any = False
+        try:
+            while True:
+                try:
+                    if received_any:
+                        item = chunks.get()
+                    else:
+                        item = chunks.get(timeout=max(deadline_seconds - (time.perf_counter() - started), 0))
+                except queue.Empty:
+                    self.invoker.deadline_exceeded += 1
+                    raise DeadlineExceededError("Bedrock Agent deadline exceeded before the first chunk")
+                if item is end_of_stream:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                received_any = True
+                yield item
+            breaker.record_success()
+            if timer is not None:
+                timer.add_agent_call(timings)
+        except Exception:
+            breaker.record_failure()
+            if timer is not None:
+                timer.record('agent_failed', time.perf_counter() - started)
+            raise
+        finally:
+            # Stop draining on the worker thread if the client went away
+            cancel.set()
+            breaker.release_probe()
+
+# Container-level state: reused by every warm invocation of this execution environment
+_bedrock_service: Optional[BedrockAgentService] = None
+# Agent session per game; a game whose calls land on another container starts a new session there
+_agent_sessions = AgentSessionRegistry.from_env()
+_is_cold_start = True
+# Precomputed suggestions (SUGGESTION_INDEX_PATH), mapped once per container; nothing is parsed at init
+_suggestion_index = SuggestionIndex.from_env()
+# Per-client / per-game token buckets of this container. A container serves one invocation at a
+# time, so there is no agent queue to prioritize here; reserved concurrency bounds the agent calls
+_admission = AdmissionController.from_env()
+
+def get_bedrock_service() -> BedrockAgentService:
+    """Return the container's Bedrock service, creating it on first use"""
+    global _bedrock_service
+    if _bedrock_service is None:
+        _bedrock_service = BedrockAgentService()
+    return _bedrock_service
 
 def format_hand_for_ai(hand: list) -> str:
     """Format hand cards for AI analysis"""
@@ -80,6 +238,22 @@ def format_hand_for_ai(hand: list) -> str:
     
     return ', '.join(formatted_cards)
 
+PROMPT_HEADER = "You are an expert Rummy game strategist. Analyze this 13-card Indian Rummy hand and provide tactical advice."
+
+PROMPT_INSTRUCTIONS = """Provide a strategic suggestion covering:
+1. Whether to draw from closed deck or pick from discard pile (and why)
+2. Which card to discard and the reasoning
+3. Any possible sequences or sets you can form
+4. Overall strategy assessment for this hand
+
+Focus on:
+- Pure sequence formation (mandatory for declaration)
+- Efficient use of jokers
+- Card retention strategy
+- Minimizing points in unmatched cards
+
+Be specific about card choices and explain your reasoning clearly."""
+
 def create_rummy_suggestion_prompt(player_hand: list, discard_pile: list, game_state: dict) -> str:
     """Create a detailed prompt for Rummy game suggestion"""
     
@@ -104,28 +278,164 @@ def create_rummy_suggestion_prompt(player_hand: list, discard_pile: list, game_s
         melds_count = len(game_state['playerMelds'])
         melds_info = f"Current melds formed: {melds_count}"
     
-    prompt = f"""You are an expert Rummy game strategist. Analyze this 13-card Indian Rummy hand and provide tactical advice.
+    prompt = f"""{PROMPT_HEADER}
 
 Current Hand: {hand_description}
 {discard_description}
 {joker_info}
 {melds_info}
 
-Provide a strategic suggestion covering:
-1. Whether to draw from closed deck or pick from discard pile (and why)
-2. Which card to discard and the reasoning
-3. Any possible sequences or sets you can form
-4. Overall strategy assessment for this hand
+{PROMPT_INSTRUCTIONS}"""
 
-Focus on:
-- Pure sequence formation (mandatory for declaration)
-- Efficient use of jokers
-- Card retention strategy
-- Minimizing points in unmatched cards
+    return prompt
 
-Be specific about card choices and explain your reasoning clearly."""
+def build_prompt(game_id: str, player_hand: list, open_deck: list, game_state: dict):
+    """Agent prompt, its estimated token count, and the game's session plan and snapshot
+    
+    With the compact style, later turns of a game this container has seen are sent as a delta.
+    """
+    if PROMPT_STYLE == 'verbose':
+        prompt = create_rummy_suggestion_prompt(player_hand, open_deck, game_state)
+        return prompt, estimate_tokens(prompt), None, None
+    game_state = game_state or {}
+    snapshot = position_snapshot(player_hand, open_deck, game_state.get('jokerCard'), game_state.get('playerMelds'))
+    plan = _agent_sessions.plan(game_id, snapshot)
+    built = prompt_builder.build_delta(plan.previous, snapshot) if plan.previous else None
+    if built is None:
+        built = prompt_builder.build(player_hand, open_deck, game_state.get('jokerCard'), game_state.get('playerMelds'))
+    return built.text, built.tokens, plan, snapshot
 
-    return prompt
+def get_engine_suggestion(player_hand: list, open_deck: list, game_state: dict) -> Dict[str, Any]:
+    """Answer from the in-process rule engine instead of the Bedrock Agent"""
+    game_state = game_state or {}
+    analysis = suggest_move(player_hand, open_deck, game_state.get('jokerCard'), game_state.get('playerMelds'))
+    return {
+        'success': True,
+        'message': format_suggestion(analysis),
+        'source': 'rule-engine'
+    }
+
+def get_index_suggestion(player_hand: list, open_deck: list, game_state: dict, timer: RequestTimer) -> Optional[Dict[str, Any]]:
+    """Precomputed suggestion for this position from the memory-mapped index, or None"""
+    if _suggestion_index is None:
+        return None
+    game_state = game_state or {}
+    with timer.stage('index'):
+        analysis = _suggestion_index.lookup(player_hand, open_deck, game_state.get('jokerCard'), game_state.get('playerMelds'))
+    if analysis is None:
+        return None
+    timer.label(cache='index')
+    return {
+        'success': True,
+        'message': format_suggestion(analysis),
+        'source': 'suggestion-index'
+    }
+
+def get_demo_suggestion(game_id: str, player_hand: list) -> Dict[str, Any]:
+    """Canned strategy text used when the agent is unavailable"""
+    return {
+        'success': True,
+        'message': f"""🎯 Rummy Strategy Analysis for Game {game_id}:
+
+Based on your hand: {format_hand_for_ai(player_hand)}
+
+**Recommendation:**
+1. **Draw Strategy**: Draw from closed deck to avoid revealing your strategy
+2. **Discard Strategy**: Consider discarding high-value cards that don't fit into sequences
+3. **Sequence Priority**: Focus on forming pure sequences first (mandatory for declaration)
+4. **Joker Usage**: Save jokers for completing sets or impure sequences
+
+**Key Insight**: Middle cards (5-9) offer more flexibility for sequence formation than edge cards (A, K, Q, J).
+
+*Note: This is a demo response. Configure AWS Bedrock Agent for real AI analysis.*""",
+        'source': 'lambda-demo'
+    }
+
+def request_deadline_seconds(context) -> float:
+    """Time the agent may use for this invocation, leaving room to respond before the Lambda timeout"""
+    deadline = BEDROCK_DEADLINE_SECONDS
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        deadline = min(deadline, context.get_remaining_time_in_millis() / 1000 - LAMBDA_RESPONSE_MARGIN_SECONDS)
+    return max(deadline, 0.0)
+
+def claim_cold_start() -> Tuple[bool, float]:
+    """Whether this is the container's first invocation, and the module init time it paid for"""
+    global _is_cold_start
+    cold_start = _is_cold_start
+    _is_cold_start = False
+    return cold_start, _module_init_ms if cold_start else 0.0
+
+def bedrock_service_with_init_ms() -> Tuple[BedrockAgentService, float]:
+    """The container's Bedrock service and the client creation time this call paid (0 once created)"""
+    if _bedrock_service is not None:
+        return _bedrock_service, 0.0
+    client_init_started = time.perf_counter()
+    bedrock_service = get_bedrock_service()
+    return bedrock_service, (time.perf_counter() - client_init_started) * 1000
+
+def read_request(event, timer: RequestTimer) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Parse and validate the request body; returns (fields, error). Raises json.JSONDecodeError"""
+    # Parse the request body
+    with timer.stage('parse'):
+        if isinstance(event.get('body'), str):
+            body = json.loads(event['body'])
+        else:
+            body = event.get('body', {})
+    
+    with timer.stage('validate'):
+        # Extract required parameters
+        fields = {
+            'game_id': body.get('gameId'),
+            'player_hand': body.get('playerHand', []),
+            'open_deck': body.get('openDeck', []),
+            'game_state': body.get('gameState', {})
+        }
+        
+        # Validate required parameters
+        if not fields['game_id']:
+            return fields, 'gameId is required'
+        if not fields['player_hand']:
+            return fields, 'playerHand is required'
+    return fields, None
+
+def check_admission(event, game_id: str):
+    """Spend the caller's and the game's tokens; raises RateLimitedError when either bucket is empty"""
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+    request_context = event.get('requestContext') or {}
+    # REST APIs report the caller under identity, HTTP APIs and function URLs under http
+    client_id = (
+        headers.get('x-client-id')
+        or (request_context.get('identity') or {}).get('sourceIp')
+        or (request_context.get('http') or {}).get('sourceIp')
+    )
+    priority = headers.get('x-request-priority', INTERACTIVE).lower()
+    _admission.check_rate(client_id, game_id, priority if priority in PRIORITIES else INTERACTIVE)
+
+def request_fingerprint(player_hand: list, open_deck: list, game_state: dict) -> str:
+    return state_fingerprint(
+        player_hand,
+        open_deck,
+        (game_state or {}).get('jokerCard'),
+        (game_state or {}).get('playerMelds'),
+        (game_state or {}).get('closedDeckCount'),
+        (game_state or {}).get('version') or 0
+    )
+
+def get_fallback_suggestion(game_id: str, player_hand: list, open_deck: list, game_state: dict) -> Dict[str, Any]:
+    """Answer used when the agent gave no answer (BEDROCK_FALLBACK_PROVIDER)"""
+    if BEDROCK_FALLBACK_PROVIDER == 'engine':
+        return get_engine_suggestion(player_hand, open_deck, game_state)
+    return get_demo_suggestion(game_id, player_hand)
+
+def timed_response(timer: RequestTimer, status_code: int, body: Dict[str, Any],
+                   headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """API Gateway response carrying the stage timings in a Server-Timing header; records the request metrics"""
+    record_request(timer, 'lambda_handler', status_code)
+    return {
+        'statusCode': status_code,
+        'headers': {**CORS_HEADERS, **(headers or {}), 'Server-Timing': timer.server_timing()},
+        'body': json.dumps(body)
+    }
 
 def lambda_handler(event, context):
     """
@@ -143,159 +453,279 @@ def lambda_handler(event, context):
         }
     }
     """
+    cold_start, init_duration_ms = claim_cold_start()
+    timer = RequestTimer()
     
     try:
-        # Parse the request body
-        if isinstance(event.get('body'), str):
-            body = json.loads(event['body'])
-        else:
-            body = event.get('body', {})
-        
-        # Extract required parameters
-        game_id = body.get('gameId')
-        player_hand = body.get('playerHand', [])
-        open_deck = body.get('openDeck', [])
-        game_state = body.get('gameState', {})
-        
-        # Validate required parameters
-        if not game_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Headers': 'Content-Type',
-                    'Access-Control-Allow-Methods': 'POST, OPTIONS'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': 'gameId is required'
-                })
-            }
+        fields, error = read_request(event, timer)
+        if error:
+            return timed_response(timer, 400, {
+                'success': False,
+                'error': error
+            })
+        game_id = fields['game_id']
+        player_hand = fields['player_hand']
+        open_deck = fields['open_deck']
+        game_state = fields['game_state']
         
-        if not player_hand:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Headers': 'Content-Type',
-                    'Access-Control-Allow-Methods': 'POST, OPTIONS'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': 'playerHand is required'
-                })
-            }
+        try:
+            check_admission(event, game_id)
+        except RateLimitedError as error:
+            logger.warning(f"Shedding request for game {game_id}: {error}")
+            return timed_response(timer, 429, {
+                'success': False,
+                'error': str(error)
+            }, headers={'Retry-After': error.retry_after_header})
         
         logger.info(f"Processing suggestion request for game {game_id}")
         
-        # Initialize Bedrock Agent service
-        bedrock_service = BedrockAgentService()
+        # Repeated asks on the same position are answered from the shared cache
+        fingerprint = request_fingerprint(player_hand, open_deck, game_state)
+        suggestion_result = get_index_suggestion(player_hand, open_deck, game_state, timer)
+        if suggestion_result is not None:
+            cached = False
+        elif SUGGESTION_PROVIDER == 'engine':
+            with timer.stage('engine'):
+                suggestion_result = get_engine_suggestion(player_hand, open_deck, game_state)
+            cached = False
+            timer.label(cache='bypass')
+        else:
+            suggestion_result = suggestion_cache.get(fingerprint)
+            cached = suggestion_result is not None
+            timer.label(cache='hit' if cached else 'miss')
         
-        # Create the prompt for AI analysis
-        prompt = create_rummy_suggestion_prompt(player_hand, open_deck, game_state)
+        if suggestion_result is None:
+            # Reuse the container's Bedrock client (created on the first invocation only)
+            bedrock_service, client_init_ms = bedrock_service_with_init_ms()
+            init_duration_ms += client_init_ms
         
-        # Get suggestion from Bedrock Agent
-        # Note: Using synchronous call since Lambda doesn't support async/await by default
-        # For async support, you'd need to use asyncio.run() or configure async Lambda
-        try:
-            response = bedrock_service.client.invoke_agent(
-                agentId=bedrock_service.agent_id,
-                agentAliasId=bedrock_service.agent_alias_id,
-                sessionId=bedrock_service.generate_session_id(),
-                inputText=prompt
-            )
-            
-            # Process streaming response
-            completion = ""
-            if 'completion' in response:
-                for event in response['completion']:
-                    if 'chunk' in event:
-                        chunk = event['chunk']
-                        if 'bytes' in chunk:
-                            chunk_text = chunk['bytes'].decode('utf-8')
-                            completion += chunk_text
+            # Create the prompt for AI analysis
+            with timer.stage('prompt'):
+                prompt, prompt_tokens, plan, snapshot = build_prompt(game_id, player_hand, open_deck, game_state)
+        
+            # Get suggestion from Bedrock Agent within the time this invocation has left
+            try:
+                completion = bedrock_service.invoke_with_deadline(
+                    prompt,
+                    request_deadline_seconds(context),
+                    session_id=plan.session_id if plan else None,
+                    # A stateful session must not receive the same turn twice
+                    hedge=not (plan and plan.leased),
+                    timer=timer
+                )
+                suggestion_result = {
+                    'success': True,
+                    'message': completion,
+                    'source': 'bedrock-agent',
+                    'promptTokens': prompt_tokens
+                }
+                if plan:
+                    _agent_sessions.commit(plan, snapshot)
             
-            suggestion_result = {
-                'success': True,
-                'message': completion,
-                'source': 'bedrock-agent'
-            }
+            except Exception as bedrock_error:
+                # The agent may not have seen this turn; the game's next call resyncs with the full state
+                if plan:
+                    _agent_sessions.release(plan, lost=True)
+                logger.error(f"Bedrock Agent error: {str(bedrock_error) or type(bedrock_error).__name__}")
+                timer.label(fallback=failure_reason(bedrock_error))
+                with timer.stage('fallback'):
+                    # The prompt was still built and sent; report its size as the streaming handler does
+                    suggestion_result = {
+                        **get_fallback_suggestion(game_id, player_hand, open_deck, game_state),
+                        'promptTokens': prompt_tokens
+                    }
             
-        except Exception as bedrock_error:
-            logger.error(f"Bedrock Agent error: {str(bedrock_error)}")
-            # Fallback to mock response for demo purposes
-            suggestion_result = {
-                'success': True,
-                'message': f"""🎯 Rummy Strategy Analysis for Game {game_id}:
-
-Based on your hand: {format_hand_for_ai(player_hand)}
-
-**Recommendation:**
-1. **Draw Strategy**: Draw from closed deck to avoid revealing your strategy
-2. **Discard Strategy**: Consider discarding high-value cards that don't fit into sequences
-3. **Sequence Priority**: Focus on forming pure sequences first (mandatory for declaration)
-4. **Joker Usage**: Save jokers for completing sets or impure sequences
-
-**Key Insight**: Middle cards (5-9) offer more flexibility for sequence formation than edge cards (A, K, Q, J).
-
-*Note: This is a demo response. Configure AWS Bedrock Agent for real AI analysis.*""",
-                'source': 'lambda-demo'
-            }
+            # Only real agent answers are cached; demo fallbacks should be retried next time
+            if suggestion_result['source'] == 'bedrock-agent':
+                suggestion_cache.put(fingerprint, suggestion_result)
         
+        timer.label(provider=suggestion_result.get('source', 'bedrock-agent'))
         # Prepare successful response
         response_body = {
             'success': True,
             'gameId': game_id,
             'suggestion': suggestion_result['message'],
             'timestamp': datetime.now().isoformat(),
-            'source': suggestion_result.get('source', 'bedrock-agent')
+            'source': suggestion_result.get('source', 'bedrock-agent'),
+            'cached': cached,
+            'promptTokens': suggestion_result.get('promptTokens'),
+            'coldStart': cold_start,
+            'initDurationMs': round(init_duration_ms, 2),
+            'timings': timer.as_dict()
         }
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS'
-            },
-            'body': json.dumps(response_body)
-        }
+        return timed_response(timer, 200, response_body)
         
     except json.JSONDecodeError as e:
         logger.error(f"JSON decode error: {str(e)}")
-        return {
-            'statusCode': 400,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS'
-            },
-            'body': json.dumps({
-                'success': False,
-                'error': 'Invalid JSON in request body'
-            })
-        }
+        return timed_response(timer, 400, {
+            'success': False,
+            'error': 'Invalid JSON in request body'
+        })
         
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS'
-            },
-            'body': json.dumps({
+        return timed_response(timer, 500, {
+            'success': False,
+            'error': 'Internal server error',
+            'message': 'Failed to process suggestion request'
+        })
+
+def stream_prelude(status_code: int, headers: Dict[str, str]) -> bytes:
+    """Status and headers of a streamed response, sent before any body bytes"""
+    return json.dumps({'statusCode': status_code, 'headers': headers}).encode('utf-8') + STREAM_PRELUDE_DELIMITER
+
+def stream_event(event: str, data: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+
+def lambda_stream_handler(event, context) -> Iterator[bytes]:
+    """
+    Response-streaming entry point for a Lambda function URL (InvokeMode RESPONSE_STREAM)
+    
+    Takes the same events as lambda_handler. Yields the prelude (status and headers) as soon as the
+    request is validated, then Server-Sent Events: one `chunk` event per completion chunk as the
+    agent produces it, and a final `done` event with the source, promptTokens and timings (or an
+    `error` event if the agent fails mid-stream). Invalid requests get a 400 prelude and a JSON body.
+    """
+    cold_start, init_duration_ms = claim_cold_start()
+    timer = RequestTimer()
+    status_code = 200
+    prelude_sent = False
+    
+    try:
+        try:
+            fields, error = read_request(event, timer)
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON decode error: {str(e)}")
+            fields, error = {}, 'Invalid JSON in request body'
+        if error:
+            status_code = 400
+            prelude_sent = True
+            yield stream_prelude(400, {**CORS_HEADERS, 'Server-Timing': timer.server_timing()})
+            yield json.dumps({'success': False, 'error': error}).encode('utf-8')
+            return
+        game_id = fields['game_id']
+        player_hand = fields['player_hand']
+        open_deck = fields['open_deck']
+        game_state = fields['game_state']
+        
+        try:
+            check_admission(event, game_id)
+        except RateLimitedError as error:
+            logger.warning(f"Shedding request for game {game_id}: {error}")
+            status_code = 429
+            prelude_sent = True
+            yield stream_prelude(429, {**CORS_HEADERS, 'Retry-After': error.retry_after_header})
+            yield json.dumps({'success': False, 'error': str(error)}).encode('utf-8')
+            return
+        
+        prelude_sent = True
+        yield stream_prelude(200, dict(STREAM_HEADERS))
+        logger.info(f"Streaming suggestion for game {game_id}")
+        
+        fingerprint = request_fingerprint(player_hand, open_deck, game_state)
+        ready = get_index_suggestion(player_hand, open_deck, game_state, timer)
+        if ready is not None:
+            cached = False
+        elif SUGGESTION_PROVIDER == 'engine':
+            with timer.stage('engine'):
+                ready = get_engine_suggestion(player_hand, open_deck, game_state)
+            cached = False
+            timer.label(cache='bypass')
+        else:
+            ready = suggestion_cache.get(fingerprint)
+            cached = ready is not None
+            timer.label(cache='hit' if cached else 'miss')
+        
+        if ready is not None:
+            source = ready['source']
+            prompt_tokens = ready.get('promptTokens')
+            yield stream_event('chunk', {'text': ready['message']})
+        else:
+            bedrock_service, client_init_ms = bedrock_service_with_init_ms()
+            init_duration_ms += client_init_ms
+            with timer.stage('prompt'):
+                prompt, prompt_tokens, plan, snapshot = build_prompt(game_id, player_hand, open_deck, game_state)
+            
+            parts = []
+            answered = False
+            try:
+                for text in bedrock_service.stream_completion(
+                    prompt,
+                    request_deadline_seconds(context),
+                    session_id=plan.session_id if plan else None,
+                    timer=timer
+                ):
+                    parts.append(text)
+                    yield stream_event('chunk', {'text': text})
+                answered = True
+                source = 'bedrock-agent'
+            except Exception as bedrock_error:
+                # Part of the answer already reached the client; it cannot be replaced by a fallback
+                if parts:
+                    raise
+                logger.error(f"Bedrock Agent error: {str(bedrock_error) or type(bedrock_error).__name__}")
+                timer.label(fallback=failure_reason(bedrock_error))
+                with timer.stage('fallback'):
+                    fallback = get_fallback_suggestion(game_id, player_hand, open_deck, game_state)
+                source = fallback['source']
+                yield stream_event('chunk', {'text': fallback['message']})
+            finally:
+                # Also runs when the client disconnects mid-stream; the next call then resyncs
+                if plan:
+                    if answered:
+                        _agent_sessions.commit(plan, snapshot)
+                    else:
+                        _agent_sessions.release(plan, lost=True)
+            
+            if answered:
+                suggestion_cache.put(fingerprint, {
+                    'success': True,
+                    'message': ''.join(parts),
+                    'source': source,
+                    'promptTokens': prompt_tokens
+                })
+        
+        timer.label(provider=source)
+        yield stream_event('done', {
+            'success': True,
+            'gameId': game_id,
+            'timestamp': datetime.now().isoformat(),
+            'source': source,
+            'cached': cached,
+            'promptTokens': prompt_tokens,
+            'coldStart': cold_start,
+            'initDurationMs': round(init_duration_ms, 2),
+            'timings': timer.as_dict()
+        })
+    
+    except Exception as e:
+        logger.error(f"Unexpected streaming error: {str(e)}")
+        if not prelude_sent:
+            status_code = 500
+            yield stream_prelude(500, dict(CORS_HEADERS))
+            yield json.dumps({
                 'success': False,
                 'error': 'Internal server error',
                 'message': 'Failed to process suggestion request'
+            }).encode('utf-8')
+        else:
+            yield stream_event('error', {
+                'success': False,
+                'error': 'Suggestion stream interrupted',
+                'timestamp': datetime.now().isoformat()
             })
-        }
+    finally:
+        record_request(timer, 'lambda_stream_handler', status_code)
+
+def read_streamed_response(stream: Iterator[bytes]) -> Tuple[Dict[str, Any], bytes]:
+    """Split a streamed response into its prelude and body, for local testing"""
+    raw = b''.join(stream)
+    prelude, _, body = raw.partition(STREAM_PRELUDE_DELIMITER)
+    return json.loads(prelude), body
+
+_module_init_ms = (time.perf_counter() - _module_init_started) * 1000
 
 # For local testing
 if __name__ == "__main__":
@@ -327,5 +757,10 @@ if __name__ == "__main__":
         })
     }
     
-    result = lambda_handler(test_event, None)
-    print(json.dumps(result, indent=2)) 
\ No newline at end of file
+    if '--stream' in sys.argv:
+        prelude, body = read_streamed_response(lambda_stream_handler(test_event, None))
+        print(json.dumps(prelude, indent=2))
+        print(body.decode('utf-8'))
+    else:
+        result = lambda_handler(test_event, None)
+        print(json.dumps(result, indent=2)) 
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Compact, token-budgeted prompts for the Bedrock Agent
+Two-character card codes, precompiled static sections, and low-value context dropped first when over budget
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from rummy_engine import card_field, parse_rank, parse_suit
+
+# Rank 10 is "T" so every card code is exactly two characters
+RANK_CODES = {1: 'A', 10: 'T', 11: 'J', 12: 'Q', 13: 'K', **{n: str(n) for n in range(2, 10)}}
+# Same suit order as rummy_engine.SUIT_INDEX
+SUIT_CODES = 'HDCS'
+PRINTED_JOKER = 'JK'
+
+# Rough BPE-style estimate: each word, number or punctuation mark is about one token
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class _Section(NamedTuple):
+    text: str
+    tokens: int
+
+
+def _section(text: str) -> _Section:
+    return _Section(text, estimate_tokens(text))
+
+
+# Static sections are built and measured once at import
+LEGEND = _section("Indian Rummy coach. Cards are rank+suit, T=10, suits H D C S, JK=printed joker.")
+TASK = _section("Advise: draw closed or top discard, which discard and why, melds to form, overall plan.")
+STRATEGY = _section("Favor pure sequence first, jokers in impure melds, connected cards, low deadwood.")
+
+# Optional sections, dropped in this order when the prompt is over budget
+DROP_ORDER = ("recent_discards", "opponent", "strategy", "meld_cards")
+
+
+def card_code(card: Any) -> str:
+    """Two-character code such as 'TS' (10 of spades); unknown cards keep their raw rank and suit"""
+    raw_rank = card_field(card, 'rank')
+    if str(raw_rank).strip().lower() == 'joker':
+        return PRINTED_JOKER
+    rank = parse_rank(raw_rank)
+    suit = parse_suit(card_field(card, 'suit'))
+    if rank is None or suit is None:
+        return f"{raw_rank}{card_field(card, 'suit') or ''}".replace(' ', '')
+    return RANK_CODES[rank] + SUIT_CODES[suit]
+
+
+def cards_code(cards: Optional[List[Any]]) -> str:
+    return " ".join(card_code(card) for card in cards) if cards else "-"
+
+
+def _hand_order(card: Any) -> tuple:
+    suit = parse_suit(card_field(card, 'suit'))
+    rank = parse_rank(card_field(card, 'rank'))
+    return (suit if suit is not None else 4, rank or 0)
+
+
+def hand_code(cards: List[Any]) -> str:
+    """Hand sorted by suit then rank so runs read left to right, e.g. 'AH 4H 5H 6H 9S TS JK'"""
+    return cards_code(sorted(cards, key=_hand_order))
+
+
+class BuiltPrompt(NamedTuple):
+    text: str
+    tokens: int
+    dropped: List[str]
+
+
+class PositionSnapshot(NamedTuple):
+    """Card codes of one position, kept per agent session to describe the next turn as a delta"""
+    hand: Tuple[str, ...]
+    top_discard: str
+    joker: str
+    melds: Tuple[Tuple[str, ...], ...]
+
+
+def position_snapshot(player_hand: List[Any], open_deck: Optional[List[Any]], joker_card: Any = None,
+                      player_melds: Optional[List[List[Any]]] = None) -> PositionSnapshot:
+    return PositionSnapshot(
+        tuple(sorted(card_code(card) for card in player_hand or [])),
+        card_code(open_deck[-1]) if open_deck else "-",
+        card_code(joker_card) if joker_card is not None else "-",
+        tuple(tuple(card_code(card) for card in meld) for meld in player_melds or [])
+    )
+
+
+def _remove_all(cards: Counter, other: Counter) -> List[str]:
+    return sorted((cards - other).elements())
+
+
+class PromptBuilder:
+    """
+    Builds the agent prompt from the hand, top discard, joker and melds.
+
+    Hand, top discard, joker and meld count are always sent. Recent discards, the opponent hint
+    (card_tracker), the strategy reminder and the individual meld cards are optional and dropped (in DROP_ORDER) until the
+    estimated size fits token_budget; 0 means no budget.
+    """
+
+    def __init__(self, token_budget: int = 0, recent_discards: int = 4):
+        self.token_budget = token_budget
+        self.recent_discards = recent_discards
+        self._lock = threading.Lock()
+        self._built = 0
+        self._total_tokens = 0
+        self._max_tokens = 0
+        self._over_budget = 0
+        self._dropped: Dict[str, int] = {name: 0 for name in DROP_ORDER}
+
+    @classmethod
+    def from_env(cls) -> "PromptBuilder":
+        return cls(
+            token_budget=int(os.environ.get('PROMPT_TOKEN_BUDGET', '100')),
+            recent_discards=int(os.environ.get('PROMPT_RECENT_DISCARDS', '4'))
+        )
+
+    def build(self, player_hand: List[Any], open_deck: Optional[List[Any]], joker_card: Any = None,
+              player_melds: Optional[List[List[Any]]] = None, opponent: Optional[str] = None) -> BuiltPrompt:
+        hand = _section(f"Hand: {hand_code(player_hand or [])}")
+        top = open_deck[-1] if open_deck else None
+        discard = _section(f"Top discard: {card_code(top) if top is not None else '-'}")
+        joker = _section(self._joker_line(joker_card)) if joker_card is not None else None
+        melds = player_melds or []
+        meld_count = _section(f"Melds on table: {len(melds)}") if melds else None
+
+        optional: Dict[str, _Section] = {"strategy": STRATEGY}
+        if melds:
+            optional["meld_cards"] = _section("Melds on table: " + ", ".join(cards_code(meld) for meld in melds))
+        history = list(open_deck[-1 - self.recent_discards:-1]) if open_deck and self.recent_discards > 0 else []
+        if history:
+            optional["recent_discards"] = _section(f"Earlier discards: {cards_code(history)}")
+        if opponent:
+            optional["opponent"] = _section(opponent)
+
+        required = [LEGEND, hand, discard, TASK] + ([joker] if joker else [])
+        tokens = sum(section.tokens for section in required)
+        tokens += sum(section.tokens for section in optional.values())
+        dropped: List[str] = []
+        for name in DROP_ORDER:
+            if not self.token_budget or tokens <= self.token_budget:
+                break
+            section = optional.pop(name, None)
+            if section is None:
+                continue
+            tokens -= section.tokens
+            if name == "meld_cards":
+                tokens += meld_count.tokens
+            dropped.append(name)
+
+        lines = [LEGEND.text, hand.text, discard.text]
+        if joker:
+            lines.append(joker.text)
+        if "meld_cards" in optional:
+            lines.append(optional["meld_cards"].text)
+        elif meld_count:
+            lines.append(meld_count.text)
+        if "recent_discards" in optional:
+            lines.append(optional["recent_discards"].text)
+        if "opponent" in optional:
+            lines.append(optional["opponent"].text)
+        lines.append(TASK.text)
+        if "strategy" in optional:
+            lines.append(optional["strategy"].text)
+
+        self._record(tokens, dropped)
+        return BuiltPrompt("\n".join(lines), tokens, dropped)
+
+    def build_delta(self, previous: PositionSnapshot, current: PositionSnapshot) -> Optional[BuiltPrompt]:
+        """
+        Turn update for an agent session that has already seen `previous`.
+
+        Returns None when the positions cannot be bridged by a delta (new joker, i.e. a new deal).
+        """
+        if previous.joker != current.joker:
+            return None
+        before, after = Counter(previous.hand), Counter(current.hand)
+        drawn = _remove_all(after, before)
+        removed = Counter(_remove_all(before, after))
+        new_melds = list((Counter(current.melds) - Counter(previous.melds)).elements())
+        melded = Counter(code for meld in new_melds for code in meld) & removed
+        discarded = sorted((removed - melded).elements())
+
+        parts = ["Same game, update since your last advice."]
+        if drawn:
+            parts.append(f"Drew {' '.join(drawn)}.")
+        if discarded:
+            parts.append(f"Discarded {' '.join(discarded)}.")
+        if new_melds:
+            parts.append(f"Melded {', '.join(' '.join(meld) for meld in new_melds)}.")
+        if not (drawn or discarded or new_melds):
+            parts.append("Hand unchanged.")
+        parts.append(f"Top discard: {current.top_discard}.")
+        text = " ".join(parts) + "\n" + TASK.text
+        tokens = estimate_tokens(text)
+        self._record(tokens, [])
+        return BuiltPrompt(text, tokens, [])
+
+    def _joker_line(self, joker_card: Any) -> str:
+        code = card_code(joker_card)
+        if code == PRINTED_JOKER or len(code) != 2:
+            return f"Joker: {code}"
+        return f"Joker: {code}, every {code[0]} is wild"
+
+    def _record(self, tokens: int, dropped: List[str]):
+        with self._lock:
+            self._built += 1
+            self._total_tokens += tokens
+            self._max_tokens = max(self._max_tokens, tokens)
+            if self.token_budget and tokens > self.token_budget:
+                self._over_budget += 1
+            for name in dropped:
+                self._dropped[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "token_budget": self.token_budget,
+                "prompts": self._built,
+                "mean_tokens": round(self._total_tokens / self._built, 1) if self._built else 0.0,
+                "max_tokens": self._max_tokens,
+                "over_budget": self._over_budget,
+                "dropped": dict(self._dropped)
+            }
+
+
+# Shared by the FastAPI service and the Lambda handler within one process
+prompt_builder = PromptBuilder.from_env()
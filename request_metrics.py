@@ -0,0 +1,286 @@
+"""
+Per-request stage timings and process-wide metrics shared by the FastAPI service and the Lambda handler
+Stages are returned in a Server-Timing header (Lambda: also in the response body) and aggregated for /metrics
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Stage names, in the order a request goes through them
+STAGES = (
+    "parse",          # request body JSON decoding
+    "validate",       # request / game state validation
+    "store",          # game store lookup
+    "index",          # precomputed suggestion index lookup
+    "admission_wait", # waiting for an agent slot in the admission queue
+    "prompt",         # prompt building and session planning
+    "first_chunk",    # invoke_agent call until the first completion chunk
+    "stream",         # draining the rest of the completion stream
+    "agent_failed",   # agent attempts that ended without an answer (errors, deadline)
+    "engine",         # rule engine analysis
+    "analysis_wait",  # analysis pool queueing and transfer, excluding the job itself
+    "simulate",       # Monte Carlo draw simulation
+    "fallback",       # building the fallback answer after an agent failure
+)
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CHUNK_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144)
+
+
+class RequestTimer:
+    """Stage durations and outcome labels (provider, cache, fallback) of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.labels: Dict[str, str] = {}
+        self.chunks = 0
+        self.bytes = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        # Stages repeated within one request (batch items, retries) add up
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def label(self, **labels: str):
+        self.labels.update(labels)
+
+    def add_agent_call(self, timings: Dict[str, float]):
+        """Fold in the timings collected by one invoke_agent call on a worker thread"""
+        for name in ("first_chunk", "stream"):
+            if name in timings:
+                self.record(name, timings[name])
+        self.chunks += int(timings.get("chunks", 0))
+        self.bytes += int(timings.get("bytes", 0))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def stages_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. 'prompt;dur=0.41, first_chunk;dur=612.08, total;dur=640.3'"""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stagesMs": self.stages_ms(),
+            "totalMs": round(self.elapsed() * 1000, 2),
+            "chunks": self.chunks,
+            "bytes": self.bytes
+        }
+
+
+class _NullTimer(RequestTimer):
+    """Used outside an instrumented request; records nothing"""
+
+    def record(self, name: str, seconds: float):
+        pass
+
+    def label(self, **labels: str):
+        pass
+
+    def add_agent_call(self, timings: Dict[str, float]):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar('request_timer', default=None)
+
+
+def current_timer() -> RequestTimer:
+    """Timer of the request being handled in this task, or a no-op timer"""
+    return _current_timer.get() or _NULL_TIMER
+
+
+@contextmanager
+def timed_request(timer: RequestTimer) -> Iterator[RequestTimer]:
+    """Make `timer` the current timer for code running in this context"""
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts: Dict[LabelKey, List[int]] = {}
+        self.sums: Dict[LabelKey, float] = {}
+
+    def observe(self, key: LabelKey, value: float):
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[key] += value
+
+
+class MetricsRegistry:
+    """Counters, gauges and fixed-bucket histograms rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def counter(self, name: str, help_text: str):
+        self._help[name] = ("counter", help_text)
+        self._counters[name] = {}
+
+    def gauge(self, name: str, help_text: str):
+        self._help[name] = ("gauge", help_text)
+        self._gauges[name] = {}
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = SECONDS_BUCKETS):
+        self._help[name] = ("histogram", help_text)
+        self._histograms[name] = _Histogram(buckets)
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._gauges[name][key] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._histograms[name].observe(key, value)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text) in self._help.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind in ("counter", "gauge"):
+                    series = self._counters[name] if kind == "counter" else self._gauges[name]
+                    for key, value in series.items():
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                    continue
+                histogram = self._histograms[name]
+                for key, counts in histogram.counts.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, le=_format_value(bound))} {cumulative}")
+                    cumulative += counts[-1]
+                    lines.append(f"{name}_bucket{_format_labels(key, le='+Inf')} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.sums[key])}")
+                    lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(key: LabelKey, le: Optional[str] = None) -> str:
+    pairs = list(key) + ([("le", le)] if le is not None else [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+metrics = MetricsRegistry()
+metrics.counter("botorial_requests_total", "Requests by endpoint, status, provider and cache outcome")
+metrics.counter("botorial_fallbacks_total", "Agent fallbacks by reason")
+metrics.histogram("botorial_request_seconds", "End-to-end request duration")
+metrics.histogram("botorial_stage_seconds", "Time spent per request stage")
+metrics.histogram("botorial_agent_chunks", "Completion chunks received per request", CHUNK_BUCKETS)
+metrics.histogram("botorial_agent_bytes", "Completion bytes received per request", BYTE_BUCKETS)
+metrics.counter("botorial_analysis_jobs_total", "Analysis pool jobs by job and status (ok, error, timeout, rejected)")
+metrics.counter("botorial_analysis_busy_seconds_total", "Worker time spent running analysis jobs; utilization = rate / workers")
+metrics.gauge("botorial_analysis_pool_workers", "Analysis worker processes")
+metrics.gauge("botorial_analysis_pool_in_flight", "Analysis jobs queued or running")
+metrics.histogram("botorial_analysis_job_seconds", "Analysis job run time on the worker")
+metrics.histogram("botorial_analysis_wait_seconds", "Analysis job queueing and transfer time")
+metrics.counter("botorial_admission_total", "Admission decisions by priority and outcome (admitted, shed_client, shed_game, degraded_wait, degraded_queue_full)")
+metrics.gauge("botorial_admission_queue_depth", "Requests waiting for an agent slot")
+
+
+def record_request(timer: RequestTimer, endpoint: str, status: int):
+    """Add one finished request to the process-wide metrics"""
+    labels = timer.labels
+    metrics.inc(
+        "botorial_requests_total",
+        endpoint=endpoint,
+        status=str(status),
+        provider=labels.get("provider", "none"),
+        cache=labels.get("cache", "none")
+    )
+    if "fallback" in labels:
+        metrics.inc("botorial_fallbacks_total", endpoint=endpoint, reason=labels["fallback"])
+    metrics.observe("botorial_request_seconds", timer.elapsed(), endpoint=endpoint)
+    for name, seconds in timer.stages.items():
+        metrics.observe("botorial_stage_seconds", seconds, endpoint=endpoint, stage=name)
+    if timer.chunks:
+        metrics.observe("botorial_agent_chunks", timer.chunks, endpoint=endpoint)
+        metrics.observe("botorial_agent_bytes", timer.bytes, endpoint=endpoint)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware: one RequestTimer per HTTP request, a Server-Timing header on the response,
+    and the request recorded in `metrics` once the last body byte is sent.
+
+    Streaming responses send their headers before the stream starts, so their header only
+    carries the stages finished by then; the full breakdown still reaches /metrics.
+    """
+
+    def __init__(self, app, skip_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with timed_request(timer):
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            # The router stores the matched endpoint in the scope; label by its name to keep cardinality low
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            record_request(timer, endpoint, status)
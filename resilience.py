@@ -0,0 +1,311 @@
+"""
+Deadline-aware Bedrock invocation shared by the FastAPI service and the Lambda handler
+Bounded retries with jitter drawn from a retry budget, optional hedging and a circuit breaker
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional
+
+# Error codes worth retrying: the agent is overloaded, not misconfigured
+THROTTLING_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException"
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the agent while the breaker is open"""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when no attempt finished before the request deadline"""
+
+
+def is_throttling_error(error: Exception) -> bool:
+    response = getattr(error, 'response', None)
+    code = response.get('Error', {}).get('Code') if isinstance(response, dict) else None
+    if code:
+        return code in THROTTLING_CODES
+    return any(name in str(error) for name in THROTTLING_CODES)
+
+
+def failure_reason(error: Exception) -> str:
+    """Short label for why an agent call gave no answer, used as the fallback reason in metrics"""
+    message = str(error)
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, DeadlineExceededError):
+        return "deadline"
+    if is_throttling_error(error):
+        return "throttled"
+    if "ResourceNotFoundException" in message:
+        return "agent_not_found"
+    if "AccessDeniedException" in message:
+        return "access_denied"
+    return "error"
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries and hedges to a share of normal traffic.
+
+    Every request deposits `ratio` tokens and every retry or hedge spends one, plus a small
+    steady refill so low-traffic workers can still retry. During an outage the bucket drains
+    and requests fail fast instead of multiplying load on the agent.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 0.5, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.spent = 0
+        self.denied = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.spent += 1
+                return True
+            self.denied += 1
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; after reset_seconds lets one probe through (half-open)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """Free a half-open probe whose caller went away without recording an outcome"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+
+class LatencyTracker:
+    """Rolling window of successful attempt latencies, used to pick the hedging delay"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class ResilientInvoker:
+    """
+    Run a blocking agent call on an executor under a deadline.
+
+    `attempt(cancel)` performs one call and should stop reading the stream once `cancel` is set;
+    it is set when the deadline passes or another attempt has already won.
+    """
+
+    def __init__(self, executor: Executor, max_attempts: int = 3, backoff_base: float = 0.2,
+                 backoff_cap: float = 2.0, hedge_percentile: Optional[float] = None,
+                 budget: Optional[RetryBudget] = None, breaker: Optional[CircuitBreaker] = None):
+        self.executor = executor
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_percentile = hedge_percentile
+        self.budget = budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    @classmethod
+    def from_env(cls, executor: Executor) -> "ResilientInvoker":
+        hedge = float(os.environ.get('BEDROCK_HEDGE_PERCENTILE', '0'))
+        return cls(
+            executor,
+            max_attempts=int(os.environ.get('BEDROCK_MAX_ATTEMPTS', '3')),
+            backoff_base=float(os.environ.get('BEDROCK_BACKOFF_BASE_SECONDS', '0.2')),
+            backoff_cap=float(os.environ.get('BEDROCK_BACKOFF_CAP_SECONDS', '2.0')),
+            hedge_percentile=hedge if hedge > 0 else None,
+            budget=RetryBudget(ratio=float(os.environ.get('BEDROCK_RETRY_BUDGET_RATIO', '0.1'))),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.environ.get('BEDROCK_BREAKER_FAILURES', '5')),
+                reset_seconds=float(os.environ.get('BEDROCK_BREAKER_RESET_SECONDS', '30'))
+            )
+        )
+
+    async def invoke(self, attempt: Callable[[threading.Event], Any], timeout: float, hedge: bool = True) -> Any:
+        """Return the first successful attempt's result or raise the error that ended the request
+
+        hedge=False for calls that must not run twice at once (e.g. a stateful agent session).
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Bedrock Agent circuit is open")
+        self.budget.deposit()
+        deadline = time.monotonic() + timeout
+
+        try:
+            for attempt_number in range(self.max_attempts):
+                try:
+                    result = await self._race(attempt, deadline, hedge)
+                    self.breaker.record_success()
+                    return result
+                except DeadlineExceededError:
+                    self.deadline_exceeded += 1
+                    self.breaker.record_failure()
+                    raise
+                except Exception as error:
+                    # Full jitter, and only if the retry still fits before the deadline
+                    delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt_number))
+                    retry = (
+                        is_throttling_error(error)
+                        and attempt_number + 1 < self.max_attempts
+                        and time.monotonic() + delay < deadline
+                        and self.budget.try_spend()
+                    )
+                    if not retry:
+                        self.breaker.record_failure()
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(delay)
+        finally:
+            self.breaker.release_probe()
+
+    async def _race(self, attempt: Callable[[threading.Event], Any], deadline: float, hedge: bool) -> Any:
+        loop = asyncio.get_running_loop()
+        cancel = threading.Event()
+        started = time.monotonic()
+
+        def launch() -> asyncio.Future:
+            future = loop.run_in_executor(self.executor, attempt, cancel)
+            # Losing attempts finish in the background; consume their outcome so nothing is logged
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            return future
+
+        primary = launch()
+        pending = {primary}
+        hedge_at = None
+        if hedge and self.hedge_percentile is not None:
+            hedge_after = self.latency.percentile(self.hedge_percentile)
+            if hedge_after is not None:
+                hedge_at = started + hedge_after
+        last_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise DeadlineExceededError("Bedrock Agent deadline exceeded")
+                wake_at = min(deadline, hedge_at) if hedge_at is not None else deadline
+                done, pending = await asyncio.wait(pending, timeout=wake_at - now, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        self.latency.record(time.monotonic() - started)
+                        if future is not primary:
+                            self.hedge_wins += 1
+                        return future.result()
+                    last_error = future.exception()
+                if not done and hedge_at is not None and time.monotonic() >= hedge_at:
+                    hedge_at = None
+                    if self.budget.try_spend():
+                        self.hedges += 1
+                        pending.add(launch())
+            raise last_error
+        finally:
+            cancel.set()
+
+    def stats(self) -> Dict[str, Any]:
+        hedge_after = self.latency.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        return {
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            "circuit_rejected": self.breaker.rejected,
+            "retries": self.retries,
+            "retry_budget_tokens": round(self.budget.tokens, 2),
+            "retry_budget_denied": self.budget.denied,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_after_ms": round(hedge_after * 1000, 1) if hedge_after is not None else None,
+            "deadline_exceeded": self.deadline_exceeded
+        }
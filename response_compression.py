@@ -0,0 +1,136 @@
+"""
+Negotiated response compression (brotli when installed, gzip) for buffered JSON responses
+Streaming responses (Server-Sent Events) pass through untouched so chunks still reach the client as they are produced
+"""
+
+import gzip
+import os
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preference order when the client accepts several with the same q-value
+ENCODINGS = ("br", "gzip")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def available_encodings(configured: str) -> Tuple[str, ...]:
+    """Configured encodings this process can produce, in preference order"""
+    wanted = {name.strip().lower() for name in configured.split(",") if name.strip()}
+    return tuple(name for name in ENCODINGS if name in wanted and (name != "br" or brotli is not None))
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding value -> {coding: q}, e.g. 'br;q=1.0, gzip;q=0.8' -> {'br': 1.0, 'gzip': 0.8}"""
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header: str, encodings: Tuple[str, ...]) -> Optional[str]:
+    """Best encoding the client accepts (q > 0), or None for identity"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware: compress a response whose whole body arrives in one message, is at least
+    `minimum_size` bytes and is not already encoded, with the best encoding the client accepts.
+
+    Responses sent in several body messages (StreamingResponse) are passed through as they are;
+    buffering them would hold back every chunk until the stream ends.
+    """
+
+    def __init__(self, app, encodings: Tuple[str, ...] = ENCODINGS, minimum_size: int = 1024):
+        self.app = app
+        self.encodings = encodings
+        self.minimum_size = minimum_size
+
+    @classmethod
+    def options_from_env(cls) -> Dict[str, object]:
+        return {
+            "encodings": available_encodings(os.getenv('RESPONSE_COMPRESSION', 'br,gzip')),
+            "minimum_size": int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept, self.encodings) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                content_type = next((value for name, value in message.get("headers", []) if name == b"content-type"), b"")
+                if content_type.startswith(b"text/event-stream"):
+                    # Event streams keep sending their headers right away
+                    passthrough = True
+                    await send(message)
+                    return
+                # Hold the headers until the first body message shows whether the body is complete
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers: List[Tuple[bytes, bytes]] = list(start_message.get("headers", []))
+            body = message.get("body", b"")
+            already_encoded = any(name == b"content-encoding" for name, _ in headers)
+            if message.get("more_body", False) or already_encoded or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = [(name, value) for name, value in headers if name not in (b"content-length", b"vary")]
+            vary = [value for name, value in start_message.get("headers", []) if name == b"vary"]
+            headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            passthrough = True
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
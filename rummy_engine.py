@@ -0,0 +1,584 @@
+"""
+Rule-based Rummy suggestion engine
+Computes the draw decision, best discard and candidate melds in-process, without an LLM
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Rank and suit spellings used by the frontend, the Node.js backend and the Lambda event shapes
+RANK_VALUES = {
+    'a': 1, 'ace': 1, 'j': 11, 'jack': 11, 'q': 12, 'queen': 12, 'k': 13, 'king': 13,
+    **{str(n): n for n in range(2, 11)}
+}
+SUIT_INDEX = {'h': 0, 'd': 1, 'c': 2, 's': 3, '♥': 0, '♦': 1, '♣': 2, '♠': 3}
+SUIT_NAMES = ('hearts', 'diamonds', 'clubs', 'spades')
+
+# Cards a player holds between turns; they hold one more after drawing until they discard
+HAND_SIZE = 13
+
+# Meld kinds, in the order they are reported
+PURE_SEQUENCE = "pure_sequence"
+SEQUENCE = "sequence"
+SET = "set"
+
+
+def card_field(card: Any, field: str) -> Any:
+    """Read a card attribute from either a Pydantic Card or a plain dict"""
+    if isinstance(card, dict):
+        return card.get(field)
+    return getattr(card, field, None)
+
+
+def parse_rank(rank: Any) -> Optional[int]:
+    """1 (Ace) to 13 (King), or None for printed jokers and unknown ranks"""
+    if rank is None:
+        return None
+    return RANK_VALUES.get(str(rank).strip().lower())
+
+
+def parse_suit(suit: Any) -> Optional[int]:
+    if not suit:
+        return None
+    return SUIT_INDEX.get(str(suit).strip()[0].lower())
+
+
+def card_label(card: Any) -> str:
+    return f"{card_field(card, 'rank')} of {card_field(card, 'suit')}"
+
+
+def card_points(rank: Optional[int]) -> int:
+    """Indian Rummy points: face cards and aces count 10, number cards their value"""
+    if rank is None or rank == 1 or rank > 10:
+        return 10
+    return rank
+
+
+def _rank_gap(rank: int, other: int) -> int:
+    """Distance between two ranks in a sequence; the ace sits both below the two and above the king"""
+    gap = abs(other - rank)
+    if 1 in (rank, other):
+        gap = min(gap, 14 - max(rank, other))
+    return gap
+
+
+def _completes_run(rank: int, held: set) -> bool:
+    """Whether `rank` and two of the `held` ranks of one suit make three consecutive ranks"""
+    held = held | {14} if 1 in held else held
+    for slot in ((rank, 14) if rank == 1 else (rank,)):
+        if {slot - 1, slot + 1} <= held or {slot - 2, slot - 1} <= held or {slot + 1, slot + 2} <= held:
+            return True
+    return False
+
+
+def _designations(positions_by_suit: Dict[int, List[int]]) -> List[List[int]]:
+    """Every non-empty choice of joker-rank cards to play as naturals; same-suit copies are interchangeable"""
+    choices: List[List[int]] = [[]]
+    for positions in positions_by_suit.values():
+        choices = [chosen + positions[:count] for chosen in choices for count in range(len(positions) + 1)]
+    return choices[1:]
+
+
+class _Meld:
+    __slots__ = ('mask', 'jokers', 'kind')
+
+    def __init__(self, mask: int, jokers: int, kind: str):
+        self.mask = mask
+        self.jokers = jokers
+        self.kind = kind
+
+
+class HandAnalysis:
+    """Best meld arrangement of one hand, split into naturals and wild cards"""
+
+    def __init__(self, cards: List[Any], joker_card: Any = None):
+        self.cards = cards
+        joker_rank = parse_rank(card_field(joker_card, 'rank')) if joker_card is not None else None
+        self.joker_rank = joker_rank
+
+        naturals: List[int] = []
+        wilds: List[int] = []
+        # Joker-rank cards are wild, but may also stand for themselves in a pure sequence
+        rank_wilds: Dict[int, List[int]] = {}
+        same_suit: Dict[int, set] = {}
+        for position, card in enumerate(cards):
+            raw_rank = card_field(card, 'rank')
+            rank = parse_rank(raw_rank)
+            suit = parse_suit(card_field(card, 'suit'))
+            if str(raw_rank).strip().lower() == 'joker':
+                wilds.append(position)
+            elif joker_rank is not None and rank == joker_rank:
+                wilds.append(position)
+                if suit is not None:
+                    rank_wilds.setdefault(suit, []).append(position)
+            else:
+                naturals.append(position)
+                if rank is not None:
+                    same_suit.setdefault(suit, set()).add(rank)
+        any_points = self._arrange(naturals, wilds)
+
+        # A joker-rank card only helps as a natural inside a pure sequence, so only when two naturals
+        # of its suit make a run with it, and only while the best pure arrangement costs more than
+        # the best arrangement overall (as a wild it can fill any slot a natural could)
+        natural_slots = {
+            suit: positions for suit, positions in rank_wilds.items()
+            if _completes_run(joker_rank, same_suit.get(suit, set()))
+        }
+        if natural_slots and (not self.has_pure_sequence or self.deadwood_points > any_points):
+            best = self
+            for chosen in _designations(natural_slots):
+                variant = HandAnalysis.__new__(HandAnalysis)
+                variant.cards = cards
+                variant.joker_rank = joker_rank
+                variant._arrange(sorted(naturals + chosen), [p for p in wilds if p not in chosen])
+                if variant.key < best.key:
+                    best = variant
+            if best is not self:
+                self.__dict__.update(best.__dict__)
+
+    def _arrange(self, naturals: List[int], wilds: List[int]) -> int:
+        """
+        Best meld arrangement with the cards at `naturals` as themselves and `wilds` as jokers.
+        Returns the deadwood of the best arrangement with or without a pure sequence.
+        """
+        cards = self.cards
+        # Naturals get bit positions for the meld search; wild cards are a plain count
+        self.natural_ids = naturals
+        self.wild_ids = wilds
+        self.ranks: List[Optional[int]] = [parse_rank(card_field(cards[p], 'rank')) for p in naturals]
+        self.suits: List[Optional[int]] = [parse_suit(card_field(cards[p], 'suit')) for p in naturals]
+        self.points = [card_points(rank) for rank in self.ranks]
+        # (suit, rank) -> naturals held, for O(1) checks on a single added card
+        self.natural_counts: Dict[Tuple[Optional[int], Optional[int]], int] = {}
+        for rank, suit in zip(self.ranks, self.suits):
+            self.natural_counts[(suit, rank)] = self.natural_counts.get((suit, rank), 0) + 1
+
+        self._candidates = self._find_candidate_melds()
+        self._memo: Dict[int, tuple] = {}
+        # Naturals no candidate meld uses are deadwood in every arrangement; keep them out of the search
+        loose_mask = 0
+        loose_points = 0
+        for i, candidates in enumerate(self._candidates):
+            if not candidates:
+                loose_mask |= 1 << i
+                loose_points += self.points[i]
+        full_mask = (1 << len(self.natural_ids)) - 1
+        best_any, best_pure = self._solve(full_mask & ~loose_mask, len(self.wild_ids))
+        best_any = (best_any[0] + loose_points, best_any[1])
+        if best_pure is not None:
+            best_pure = (best_pure[0] + loose_points, best_pure[1])
+
+        self.has_pure_sequence = best_pure is not None
+        self.deadwood_points, melds = best_pure if best_pure is not None else best_any
+        self.melds: List[_Meld] = list(melds)
+        melded = 0
+        for meld in self.melds:
+            melded |= meld.mask
+        self.deadwood = [i for i in range(len(self.natural_ids)) if not melded >> i & 1]
+        self.spare_jokers = len(self.wild_ids) - sum(meld.jokers for meld in self.melds)
+        return best_any[0]
+
+    def is_wild(self, card: Any) -> bool:
+        raw_rank = card_field(card, 'rank')
+        return str(raw_rank).strip().lower() == 'joker' or \
+            (self.joker_rank is not None and parse_rank(raw_rank) == self.joker_rank)
+
+    def can_meld(self, rank: int, suit: int) -> bool:
+        """Whether a natural (rank, suit) added to this hand could be part of any candidate meld"""
+        counts = self.natural_counts
+        if any(counts.get((other_suit, rank)) for other_suit in range(4) if other_suit != suit):
+            return True
+        # Two naturals of a suit form a sequence when the gap between them can be filled with jokers
+        reach = len(self.wild_ids) + 1
+        for other in range(1, 14):
+            if other != rank and counts.get((suit, other)) and _rank_gap(rank, other) <= reach:
+                return True
+        return False
+
+    def _derive(self, cards: List[Any]) -> "HandAnalysis":
+        derived = HandAnalysis.__new__(HandAnalysis)
+        derived.cards = cards
+        derived.joker_rank = self.joker_rank
+        derived.has_pure_sequence = self.has_pure_sequence
+        derived.deadwood_points = self.deadwood_points
+        derived.spare_jokers = self.spare_jokers
+        derived.natural_counts = dict(self.natural_counts)
+        derived._candidates = None
+        derived._memo = None
+        return derived
+
+    def with_card(self, card: Any) -> Optional["HandAnalysis"]:
+        """
+        Analysis of this hand plus `card` (appended), derived without a new search.
+
+        Exact when the card is a natural that cannot join any meld: it can only be deadwood, so
+        the best arrangement of the rest is unchanged. Returns None otherwise.
+        """
+        rank = parse_rank(card_field(card, 'rank'))
+        suit = parse_suit(card_field(card, 'suit'))
+        if rank is None or suit is None or self.is_wild(card) or self.can_meld(rank, suit):
+            return None
+        derived = self._derive(self.cards + [card])
+        derived.natural_ids = self.natural_ids + [len(self.cards)]
+        derived.wild_ids = list(self.wild_ids)
+        derived.ranks = self.ranks + [rank]
+        derived.suits = self.suits + [suit]
+        derived.points = self.points + [card_points(rank)]
+        derived.melds = list(self.melds)
+        derived.deadwood = self.deadwood + [len(self.natural_ids)]
+        derived.deadwood_points += card_points(rank)
+        derived.natural_counts[(suit, rank)] = derived.natural_counts.get((suit, rank), 0) + 1
+        return derived
+
+    def without(self, position: int) -> Optional["HandAnalysis"]:
+        """
+        Analysis of this hand minus cards[position], derived without a new search.
+
+        Exact for an unmatched natural (the rest keep their best arrangement) or a joker no meld
+        uses. Returns None when the card is part of a meld.
+        """
+        shift = lambda p: p - (p > position)
+        if position in self.wild_ids:
+            if not self.spare_jokers:
+                return None
+            derived = self._derive(self.cards[:position] + self.cards[position + 1:])
+            derived.natural_ids = [shift(p) for p in self.natural_ids]
+            derived.wild_ids = [shift(p) for p in self.wild_ids if p != position]
+            derived.ranks, derived.suits, derived.points = self.ranks, self.suits, self.points
+            derived.melds = list(self.melds)
+            derived.deadwood = list(self.deadwood)
+            derived.spare_jokers -= 1
+            return derived
+
+        i = self.natural_ids.index(position)
+        if i not in self.deadwood:
+            return None
+        low = (1 << i) - 1
+        derived = self._derive(self.cards[:position] + self.cards[position + 1:])
+        derived.natural_ids = [shift(p) for p in self.natural_ids if p != position]
+        derived.wild_ids = [shift(p) for p in self.wild_ids]
+        derived.ranks = self.ranks[:i] + self.ranks[i + 1:]
+        derived.suits = self.suits[:i] + self.suits[i + 1:]
+        derived.points = self.points[:i] + self.points[i + 1:]
+        derived.melds = [_Meld((m.mask & low) | (m.mask >> (i + 1) << i), m.jokers, m.kind) for m in self.melds]
+        derived.deadwood = [d - (d > i) for d in self.deadwood if d != i]
+        derived.deadwood_points -= self.points[i]
+        key = (self.suits[i], self.ranks[i])
+        derived.natural_counts[key] -= 1
+        if not derived.natural_counts[key]:
+            del derived.natural_counts[key]
+        return derived
+
+    @property
+    def key(self) -> Tuple[bool, int]:
+        """Sort key: a hand with a pure sequence beats any hand without one, then fewer points"""
+        return (not self.has_pure_sequence, self.deadwood_points)
+
+    def _find_candidate_melds(self) -> List[List[_Meld]]:
+        wilds = len(self.wild_ids)
+        seen = set()
+        melds: List[_Meld] = []
+
+        def add(mask: int, jokers: int, kind: str):
+            if (mask, jokers) not in seen:
+                seen.add((mask, jokers))
+                melds.append(_Meld(mask, jokers, kind))
+
+        for suit in range(4):
+            # One representative card per rank; the ace also sits above the king
+            by_rank: Dict[int, int] = {}
+            for i, (rank, card_suit) in enumerate(zip(self.ranks, self.suits)):
+                if card_suit == suit and rank is not None and rank not in by_rank:
+                    by_rank[rank] = i
+            if 1 in by_rank:
+                by_rank[14] = by_rank[1]
+            present = sorted(by_rank)
+            for a, low in enumerate(present):
+                mask = 1 << by_rank[low]
+                count = 1
+                for high in present[a + 1:]:
+                    if high - low > 12:
+                        break
+                    mask |= 1 << by_rank[high]
+                    count += 1
+                    missing = max(high - low + 1, 3) - count
+                    if missing == 0:
+                        # Longer runs split into two pure sequences of the same cards
+                        if count <= 5:
+                            add(mask, 0, PURE_SEQUENCE)
+                    elif missing <= wilds:
+                        add(mask, missing, SEQUENCE)
+
+        by_value: Dict[int, Dict[int, int]] = {}
+        for i, (rank, suit) in enumerate(zip(self.ranks, self.suits)):
+            if rank is not None and suit is not None:
+                by_value.setdefault(rank, {}).setdefault(suit, i)
+        for suits in by_value.values():
+            members = list(suits.values())
+            if len(members) >= 3:
+                full = sum(1 << m for m in members)
+                add(full, 0, SET)
+                if len(members) == 4:
+                    for m in members:
+                        add(full & ~(1 << m), 0, SET)
+            if wilds and len(members) >= 2:
+                for a in range(len(members)):
+                    for b in range(a + 1, len(members)):
+                        add((1 << members[a]) | (1 << members[b]), 1, SET)
+
+        by_card: List[List[_Meld]] = [[] for _ in self.natural_ids]
+        for meld in melds:
+            for i in range(len(self.natural_ids)):
+                if meld.mask >> i & 1:
+                    by_card[i].append(meld)
+        return by_card
+
+    def _solve(self, mask: int, jokers: int) -> tuple:
+        """Return (best_any, best_with_pure_sequence) as (deadwood, melds) over the cards in mask"""
+        memo = self._memo
+        candidates = self._candidates
+        points = self.points
+        shift = len(points)
+
+        def solve(mask: int, jokers: int) -> tuple:
+            key = jokers << shift | mask
+            cached = memo.get(key)
+            if cached is not None:
+                return cached
+            if mask == 0:
+                result = memo[key] = ((0, ()), None)
+                return result
+
+            i = (mask & -mask).bit_length() - 1
+            sub_any, sub_pure = solve(mask & ~(1 << i), jokers)
+            best_any = (sub_any[0] + points[i], sub_any[1])
+            best_pure = (sub_pure[0] + points[i], sub_pure[1]) if sub_pure else None
+
+            for meld in candidates[i]:
+                if meld.mask & mask != meld.mask or meld.jokers > jokers:
+                    continue
+                sub_any, sub_pure = solve(mask & ~meld.mask, jokers - meld.jokers)
+                if sub_any[0] < best_any[0]:
+                    best_any = (sub_any[0], (meld,) + sub_any[1])
+                if meld.kind == PURE_SEQUENCE:
+                    if best_pure is None or sub_any[0] < best_pure[0]:
+                        best_pure = (sub_any[0], (meld,) + sub_any[1])
+                elif sub_pure is not None and (best_pure is None or sub_pure[0] < best_pure[0]):
+                    best_pure = (sub_pure[0], (meld,) + sub_pure[1])
+
+            result = memo[key] = (best_any, best_pure)
+            return result
+
+        return solve(mask, jokers)
+
+    def connections(self, i: int) -> int:
+        """How many other naturals could still form a meld with natural i"""
+        rank, suit = self.ranks[i], self.suits[i]
+        if rank is None:
+            return 0
+        total = 0
+        for j, (other_rank, other_suit) in enumerate(zip(self.ranks, self.suits)):
+            if j == i or other_rank is None:
+                continue
+            if other_suit == suit:
+                if 0 < _rank_gap(rank, other_rank) <= 2:
+                    total += 1
+            elif other_rank == rank:
+                total += 1
+        return total
+
+    def best_discard(self, discard_risk: Optional[Callable[[Any], int]] = None) -> Tuple[int, str]:
+        """Index into cards of the card to throw, with a short reason
+
+        discard_risk (card -> int, higher means the opponent more likely wants it) breaks ties
+        between unmatched cards of equal points and connections.
+        """
+        if self.deadwood:
+            risk = (lambda d: discard_risk(self.cards[self.natural_ids[d]])) if discard_risk else (lambda d: 0)
+            i = max(self.deadwood, key=lambda d: (self.points[d], -self.connections(d), -risk(d)))
+            links = self.connections(i)
+            reason = f"{self.points[i]} pts" + (", no connecting cards" if links == 0 else f", {links} connecting card(s)")
+            return self.natural_ids[i], reason
+
+        # Every natural is melded: break the largest meld where removing one card keeps it valid
+        for meld in sorted(self.melds, key=lambda m: -bin(m.mask).count('1')):
+            members = [i for i in range(len(self.natural_ids)) if meld.mask >> i & 1]
+            if len(members) + meld.jokers > 3:
+                if meld.kind == SET:
+                    i = max(members, key=lambda m: self.points[m])
+                else:
+                    ordered = sorted(members, key=lambda m: self.ranks[m])
+                    i = max((ordered[0], ordered[-1]), key=lambda m: self.points[m])
+                return self.natural_ids[i], "surplus card from a 4+ card meld"
+        if self.spare_jokers:
+            return self.wild_ids[-1], "spare joker"
+        return (self.natural_ids or self.wild_ids)[-1], "hand is fully melded"
+
+    def describe_melds(self) -> List[Dict[str, Any]]:
+        wild_pool = list(self.wild_ids)
+        described = []
+        for meld in self.melds:
+            indices = [i for i in range(len(self.natural_ids)) if meld.mask >> i & 1]
+            if meld.kind == SET:
+                members = [self.natural_ids[i] for i in indices] + [wild_pool.pop() for _ in range(meld.jokers)]
+            else:
+                # Wild cards are shown in the slots they fill: gaps first, then extending the run
+                others = [self.ranks[i] for i in indices if self.ranks[i] != 1]
+                ace_high = len(others) < len(indices) and 14 - min(others) < max(others) - 1
+                sequence_rank = lambda i: 14 if ace_high and self.ranks[i] == 1 else self.ranks[i]
+                indices.sort(key=sequence_rank)
+                members = []
+                for k, i in enumerate(indices):
+                    if k:
+                        members += [wild_pool.pop() for _ in range(sequence_rank(i) - sequence_rank(indices[k - 1]) - 1)]
+                    members.append(self.natural_ids[i])
+                extend = [wild_pool.pop() for _ in range(meld.jokers - (len(members) - len(indices)))]
+                members = extend + members if sequence_rank(indices[-1]) == 14 else members + extend
+            described.append({
+                "type": meld.kind,
+                "cards": [card_label(self.cards[m]) for m in members],
+                "jokers": meld.jokers
+            })
+        order = {PURE_SEQUENCE: 0, SEQUENCE: 1, SET: 2}
+        return sorted(described, key=lambda meld: order[meld["type"]])
+
+
+def _run_span(ranks: List[int]) -> Optional[int]:
+    """Slots from the lowest to the highest of distinct ranks, ace low or high; None on a repeat"""
+    if len(set(ranks)) < len(ranks):
+        return None
+    span = max(ranks) - min(ranks) + 1
+    if 1 in ranks:
+        high = [14 if rank == 1 else rank for rank in ranks]
+        span = min(span, max(high) - min(high) + 1)
+    return span
+
+
+def meld_kind(cards: List[Any], joker_card: Any = None) -> Optional[str]:
+    """
+    Kind of meld `cards` make when laid down together: PURE_SEQUENCE, SEQUENCE or SET, else None.
+    Joker-rank cards count as themselves when that makes a pure sequence or a set, else as wild.
+    """
+    if len(cards) < 3:
+        return None
+    joker_rank = parse_rank(card_field(joker_card, 'rank')) if joker_card is not None else None
+    suited: List[Tuple[int, int]] = []
+    printed = 0
+    for card in cards:
+        raw_rank = card_field(card, 'rank')
+        if str(raw_rank).strip().lower() == 'joker':
+            printed += 1
+            continue
+        rank, suit = parse_rank(raw_rank), parse_suit(card_field(card, 'suit'))
+        if rank is None or suit is None:
+            return None
+        suited.append((rank, suit))
+
+    def is_set(members: List[Tuple[int, int]]) -> bool:
+        return bool(members) and len(cards) <= 4 and len({rank for rank, _ in members}) == 1 and \
+            len({suit for _, suit in members}) == len(members)
+
+    if not printed:
+        if len({suit for _, suit in suited}) == 1 and _run_span([rank for rank, _ in suited]) == len(cards):
+            return PURE_SEQUENCE
+        if is_set(suited):
+            return SET
+    naturals = [(rank, suit) for rank, suit in suited if rank != joker_rank]
+    wilds = len(cards) - len(naturals)
+    if is_set(naturals):
+        return SET
+    if naturals and len({suit for _, suit in naturals}) == 1:
+        span = _run_span([rank for rank, _ in naturals])
+        if span is not None and span - len(naturals) <= wilds and len(cards) <= 14:
+            return SEQUENCE
+    return None
+
+
+def suggest_move(player_hand: List[Any], open_deck: Optional[List[Any]], joker_card: Any = None,
+                 player_melds: Optional[list] = None, analysis: Optional[HandAnalysis] = None,
+                 discard_risk: Optional[Callable[[Any], int]] = None) -> Dict[str, Any]:
+    """
+    Suggest a full turn for a hand of Card models or card dicts.
+
+    With 13 cards the draw is decided first (top of the open deck is taken only when it ends up
+    in a meld and improves the hand); with 14 cards only the discard is suggested. A warm
+    `analysis` of exactly player_hand (same order) skips the initial search. With
+    `discard_risk` (e.g. CardTracker.discard_risk) ties go to the card the opponent least wants
+    and the suggested discard reports its risk.
+    """
+    hand = list(player_hand or [])
+    top_discard = open_deck[-1] if open_deck else None
+    current = analysis if analysis is not None else HandAnalysis(hand, joker_card)
+    draw: Optional[Dict[str, Any]] = None
+    analysis = current
+
+    if len(hand) <= 13:
+        draw = {"source": "closed", "card": None, "reason": "top discard does not improve the hand"}
+        if top_discard is None:
+            draw["reason"] = "open deck is empty"
+        else:
+            with_open = current.with_card(top_discard) or HandAnalysis(hand + [top_discard], joker_card)
+            picked = len(hand)
+            if picked in with_open.wild_ids:
+                draw = {"source": "open", "card": card_label(top_discard), "reason": "top discard is a joker"}
+                analysis = with_open
+            else:
+                discard_position, _ = with_open.best_discard()
+                melded_open = picked in with_open.natural_ids and \
+                    with_open.natural_ids.index(picked) not in with_open.deadwood
+                if melded_open and discard_position != picked:
+                    after = with_open.without(discard_position) or \
+                        HandAnalysis([c for p, c in enumerate(with_open.cards) if p != discard_position], joker_card)
+                    if after.key < current.key:
+                        draw = {
+                            "source": "open",
+                            "card": card_label(top_discard),
+                            "reason": f"completes a meld and lowers deadwood to {after.deadwood_points} pts"
+                        }
+                        analysis = with_open
+
+    discard_position, discard_reason = analysis.best_discard(discard_risk)
+    discard_card = analysis.cards[discard_position]
+    discard = {"card": card_label(discard_card), "reason": discard_reason}
+    if discard_risk is not None:
+        discard["risk"] = discard_risk(discard_card)
+        if discard["risk"] > 0:
+            discard["reason"] += ", the opponent may be collecting it"
+    # Dropping an unmatched card leaves the optimal arrangement of the rest unchanged
+    final = analysis.without(discard_position) or \
+        HandAnalysis([c for p, c in enumerate(analysis.cards) if p != discard_position], joker_card)
+    deadwood_points = final.deadwood_points
+
+    return {
+        "draw": draw,
+        "discard": discard,
+        "melds": final.describe_melds(),
+        "deadwood_points": deadwood_points,
+        "has_pure_sequence": final.has_pure_sequence,
+        "melds_on_table": len(player_melds) if player_melds else 0
+    }
+
+
+def format_suggestion(result: Dict[str, Any]) -> str:
+    """Render an engine result in the same plain-text register as the agent's answers"""
+    lines = ["🧮 Engine Suggestion:"]
+    draw = result.get("draw")
+    if draw:
+        if draw["source"] == "open":
+            lines.append(f"1. Draw: pick {draw['card']} from the discard pile ({draw['reason']}).")
+        else:
+            lines.append(f"1. Draw: take from the closed deck ({draw['reason']}).")
+    discard = result["discard"]
+    lines.append(f"2. Discard: {discard['card']} ({discard['reason']}).")
+    if result["melds"]:
+        described = "; ".join(
+            f"{' - '.join(meld['cards'])} ({meld['type'].replace('_', ' ')})" for meld in result["melds"]
+        )
+        lines.append(f"3. Melds: {described}.")
+    else:
+        lines.append("3. Melds: none yet, keep connected middle cards.")
+    if result["has_pure_sequence"]:
+        lines.append(f"4. Strategy: pure sequence secured, {result['deadwood_points']} pts left in unmatched cards.")
+    else:
+        lines.append(f"4. Strategy: no pure sequence yet, build one before anything else "
+                     f"({result['deadwood_points']} pts unmatched).")
+    return "\n".join(lines)
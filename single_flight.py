@@ -0,0 +1,49 @@
+"""
+Single-flight coalescing for concurrent identical suggestion requests
+Callers with the same key share one in-flight task instead of each invoking the provider
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Run at most one task per key; concurrent callers for that key await the same result"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return (result, coalesced). The first caller for a key starts factory(); callers that
+        arrive while it is running wait on the same task and get coalesced=True. The shared task
+        is shielded, so one caller going away does not cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        self.leaders += 1
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+
+        def release(finished: asyncio.Task):
+            if self._in_flight.get(key) is finished:
+                del self._in_flight[key]
+
+        task.add_done_callback(release)
+        return await asyncio.shield(task), False
+
+    def running(self, key: str) -> bool:
+        """Whether a caller arriving now for key would join an in-flight task"""
+        return key in self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
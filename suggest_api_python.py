@@ -3,25 +3,113 @@ Python implementation for the /suggest API endpoint
 Handles Rummy game move suggestions using AWS Bedrock Agent
 """
 
-from fastapi import FastAPI, HTTPException, Path
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
-import boto3
+import time
+_module_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import FastAPI, HTTPException, Path, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import Callable, Dict, Any, Iterator, Literal, Optional, List, Union
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import json
 import logging
 import os
+import random
+import threading
 from datetime import datetime
 import uuid
 
+from admission import BATCH, INTERACTIVE, PRIORITIES, AdmissionController, RateLimitedError
+from rummy_engine import HAND_SIZE, format_suggestion, meld_kind
+from fast_ingest import CompactGameState, compact_card
+from game_analysis import GameAnalysisCache
+from game_store import create_game_store
+from agent_sessions import AgentSessionRegistry, SessionPlan
+from card_tracker import CardTrackerRegistry
+import draw_simulator
+from draw_simulator import simulate_draw
+from analysis_pool import AnalysisQueueFullError, AnalysisTimeoutError, analysis_pool, engine_suggestion, pack_state
+from prompt_builder import BuiltPrompt, PositionSnapshot, estimate_tokens, position_snapshot, prompt_builder
+from resilience import CircuitOpenError, DeadlineExceededError, ResilientInvoker, failure_reason, is_throttling_error
+from request_metrics import ServerTimingMiddleware, current_timer, metrics
+from single_flight import SingleFlight
+from suggestion_cache import state_fingerprint, suggestion_cache
+from suggestion_index import SuggestionIndex
+from response_compression import CompressionMiddleware
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Module import and lifespan startup phases of this worker, reported on /health
+startup_timings: Dict[str, Any] = {"import_ms": None, "phases_ms": {}, "total_ms": None, "warm_connections": 0}
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings["phases_ms"][name] = round((time.perf_counter() - started) * 1000, 2)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Everything slow happens here, before the worker takes requests: analysis workers are forked
+    first (while this process has no extra threads), then the suggestion index is mapped and
+    paged in, the agent client is created and its connection pool opened. On exit everything
+    is released again.
+    """
+    global suggestion_index
+    started = time.perf_counter()
+    with startup_phase("analysis_pool"):
+        analysis_pool.start()
+    with startup_phase("suggestion_index"):
+        suggestion_index = SuggestionIndex.from_env()
+        if suggestion_index:
+            suggestion_index.warm()
+    with startup_phase("bedrock_client"):
+        bedrock_service.start()
+    with startup_phase("bedrock_connections"):
+        startup_timings["warm_connections"] = bedrock_service.warm_up_connections()
+    startup_timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info(f"🚀 Worker ready: imports {startup_timings['import_ms']} ms, startup {startup_timings['total_ms']} ms")
+    
+    keep_warm = None
+    if startup_timings["warm_connections"] and bedrock_service.keep_warm_seconds > 0:
+        keep_warm = asyncio.ensure_future(bedrock_service.keep_connections_warm())
+    try:
+        yield
+    finally:
+        if keep_warm is not None:
+            keep_warm.cancel()
+        bedrock_service.shutdown()
+        analysis_pool.shutdown()
+        game_store.close()
+        draw_simulator.shutdown()
+        if suggestion_index:
+            suggestion_index.close()
+
 app = FastAPI(
     title="Botorial Rummy Suggest API",
     description="AI-powered move suggestions for Rummy game using AWS Bedrock Agent",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson encodes large suggestion and batch payloads several times faster than json
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
+# Per-stage timings: Server-Timing header on every response, aggregated on /metrics
+app.add_middleware(ServerTimingMiddleware)
+# brotli / gzip for buffered responses above RESPONSE_COMPRESSION_MIN_BYTES; event streams are left alone
+app.add_middleware(CompressionMiddleware, **CompressionMiddleware.options_from_env())
 
 # Pydantic models for request/response
 class Card(BaseModel):
@@ -39,6 +127,7 @@ class GameState(BaseModel):
     currentPlayer: str
     gameStatus: str
     playerMelds: List[List[Card]] = []
+    version: int = Field(0, description="Moves applied to the stored game; part of the suggestion ETag and cache key")
 
 class SuggestionResponse(BaseModel):
     success: bool
@@ -46,32 +135,199 @@ class SuggestionResponse(BaseModel):
     timestamp: str
     error: Optional[str] = None
     source: str = "bedrock-agent"
+    cached: bool = False
+    prompt_tokens: Optional[int] = Field(None, description="Estimated input tokens sent to the agent")
 
 class ErrorResponse(BaseModel):
     success: bool = False
     error: str
     timestamp: str
 
+class BatchSuggestionRequest(BaseModel):
+    items: List[Union[str, GameState]] = Field(
+        ...,
+        description="Game IDs of stored games and/or inline game states"
+    )
+
+class BatchItemResult(BaseModel):
+    index: int
+    gameId: Optional[str] = None
+    success: bool
+    suggestion: Optional[str] = None
+    source: Optional[str] = None
+    cached: bool = False
+    deduplicated: bool = False
+    error: Optional[str] = None
+
+class BatchSuggestionResponse(BaseModel):
+    success: bool
+    results: List[BatchItemResult]
+    unique_positions: int
+    timestamp: str
+
+class MoveRequest(BaseModel):
+    type: Literal["draw_closed", "draw_open", "discard", "meld",
+                  "opponent_draw_closed", "opponent_draw_open", "opponent_discard"]
+    card: Optional[Card] = Field(None, description="Card drawn from the closed deck (draw_closed) or thrown by the opponent (opponent_discard)")
+    cardId: Optional[str] = Field(None, description="Card to discard (discard)")
+    cardIds: Optional[List[str]] = Field(None, description="Cards laid down as one meld (meld)")
+
+class HandSummary(BaseModel):
+    deadwood_points: int
+    has_pure_sequence: bool
+    melds: int
+    jokers: int
+    spare_jokers: int
+
+class OpponentSummary(BaseModel):
+    moves: int
+    opponent_picks: int
+    opponent_discards: int
+    opponent_closed_draws: int
+    collecting: Dict[str, List[str]] = Field(..., description="Suits and ranks the opponent appears to collect, strongest first")
+
+class MoveResponse(BaseModel):
+    success: bool
+    gameId: str
+    move: str
+    handSize: int
+    topDiscard: Optional[Card] = None
+    closedDeckCount: int
+    analysis: HandSummary
+    incremental: bool = Field(..., description="Analysis updated from the previous one instead of recomputed")
+    opponent: OpponentSummary
+    timestamp: str
+
+class DrawHand(BaseModel):
+    deadwood: int
+    has_pure_sequence: bool
+    points: int
+
+class DrawOption(BaseModel):
+    card: Optional[str] = Field(None, description="Top discard taken (open option)")
+    discard: Optional[str] = Field(None, description="Card thrown after taking it (open option), from the vectorized discard scores")
+    expected_deadwood: float
+    deadwood_reduction: float = Field(..., description="Current deadwood minus expected deadwood")
+    pure_sequence_probability: float
+    expected_points: float = Field(..., description="Deadwood with a pure sequence, else all cards (max 80)")
+
+class DrawAdvantage(BaseModel):
+    points: float = Field(..., description="Expected points saved by taking the top discard")
+    stderr: float
+
+class DrawOddsResponse(BaseModel):
+    success: bool
+    gameId: str
+    recommendation: Literal["open", "closed"]
+    reason: str
+    current: DrawHand
+    options: Dict[str, DrawOption]
+    advantage: Optional[DrawAdvantage] = None
+    samples: int
+    horizon: int
+    unseen_cards: int
+    elapsed_ms: float
+    timestamp: str
+
+MOCK_RESPONSES = (
+    "🤖 Bedrock Strategy: Draw from closed deck to avoid revealing your strategy. Consider forming sequences with middle cards.",
+    "🎯 AI Suggestion: Your hand shows potential for a hearts sequence. Pick the 6♥ if available, discard the King♠.",
+    "💡 Bedrock Analysis: Form the 7-8-9 of spades sequence first. Discard face cards unless they complete sets.",
+    "🎲 Strategic Advice: Focus on forming pure sequences first (mandatory for declaration). Middle cards (5-9) offer more flexibility than edge cards.",
+    "🃏 Tactical Response: Use jokers wisely for high-value sets. Track opponent's picks/discards to predict their hand."
+)
+
 # AWS Bedrock Agent Service
 class BedrockAgentService:
     def __init__(self):
         self.use_real_bedrock = os.getenv('USE_BEDROCK', 'true').lower() == 'true'
-        self.session_id = self.generate_session_id()
+        # "bedrock" asks the agent; "engine" answers from the in-process rule engine
+        self.provider = os.getenv('SUGGESTION_PROVIDER', 'bedrock').lower()
+        # "compact" uses the token-budgeted prompt builder; "verbose" keeps the original prose prompt
+        self.prompt_style = os.getenv('PROMPT_STYLE', 'compact').lower()
+        # One agent session per game, so later turns can be sent as deltas
+        self.sessions = AgentSessionRegistry.from_env()
+        # Hand analysis per stored game, updated by moves instead of recomputed
+        self.hand_analyses = GameAnalysisCache.from_env()
+        # Seen / discarded / opponent-picked cards per game, updated by moves
+        self.card_trackers = CardTrackerRegistry.from_env()
+        # Add Monte Carlo draw odds to rule engine suggestions
+        self.draw_simulation = os.getenv('ENGINE_DRAW_SIMULATION', 'false').lower() == 'true'
         self.is_demo = True  # Start in demo mode, will be set to False if Bedrock initializes successfully
         
+        # boto3 is blocking, so agent calls run on a bounded thread pool instead of the event loop
+        self.max_concurrency = int(os.getenv('BEDROCK_MAX_CONCURRENCY', '64'))
+        self.max_queue_depth = int(os.getenv('BEDROCK_MAX_QUEUE_DEPTH', '512'))
+        # Hedges run on the same threads, so more connections than threads would never be used
+        self.max_pool_connections = int(os.getenv('BEDROCK_MAX_POOL_CONNECTIONS', str(self.max_concurrency)))
+        # Connections opened at startup and re-opened while idle, so the first calls skip the TLS handshake
+        self.warm_connections = min(int(os.getenv('BEDROCK_WARM_CONNECTIONS', '4')), self.max_pool_connections)
+        self.keep_warm_seconds = float(os.getenv('BEDROCK_KEEP_WARM_SECONDS', '60'))
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix='bedrock-agent'
+        )
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._peak_queue_depth = 0
+        self._last_call = 0.0
+        self.started = False
+        self.single_flight = SingleFlight()
+        # Per-client / per-game token buckets, and agent slots handed out interactive-first
+        self.admission = AdmissionController.from_env()
+        
+        # Every agent call gets a deadline; throttles are retried within a retry budget, optional
+        # hedging covers slow tails and a circuit breaker skips the agent while it keeps failing
+        self.deadline_seconds = float(os.getenv('BEDROCK_DEADLINE_SECONDS', '12'))
+        self.fallback_provider = os.getenv('BEDROCK_FALLBACK_PROVIDER', 'mock').lower()
+        self.invoker = ResilientInvoker.from_env(self.executor)
+        
+        if self.provider == 'engine':
+            logger.info("🧮 Suggestion provider: rule engine")
+    
+    def start(self):
+        """Create the agent client; runs in the app lifespan, or on the first agent call without one"""
+        if self.started:
+            return
+        self.started = True
         if self.use_real_bedrock:
             self.initialize_bedrock_agent()
         else:
             logger.info("🎯 Mock Bedrock Service initialized - perfect for demos!")
     
     def initialize_bedrock_agent(self):
+        if os.getenv('BEDROCK_RUNTIME', 'aws').lower() == 'fake':
+            # Local performance testing: simulated agent with injected latency and errors
+            from fake_bedrock import FakeAgentRuntime
+            self.client = FakeAgentRuntime.from_env()
+            self.agent_id = os.getenv('BEDROCK_AGENT_ID', 'AJBHXXILZN')
+            self.agent_alias_id = os.getenv('BEDROCK_AGENT_ALIAS_ID', 'AVKP1ITZAA')
+            self.is_demo = False
+            logger.info("🧪 Using fake Bedrock Agent Runtime (BEDROCK_RUNTIME=fake)")
+            return
+        
         try:
+            # Imported here so workers that never call the agent do not pay for boto3 at import
+            import boto3
+            from botocore.config import Config
             self.client = boto3.client(
                 'bedrock-agent-runtime',
                 region_name=os.getenv('AWS_REGION', 'us-east-1'),
                 aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
                 aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                aws_session_token=os.getenv('AWS_SESSION_TOKEN')
+                aws_session_token=os.getenv('AWS_SESSION_TOKEN'),
+                config=Config(
+                    max_pool_connections=self.max_pool_connections,
+                    connect_timeout=min(self.deadline_seconds, 5),
+                    read_timeout=self.deadline_seconds,
+                    # Keep pooled connections alive between calls instead of letting idle ones drop
+                    tcp_keepalive=True,
+                    # Retries are handled by the invoker so they respect the deadline and retry budget
+                    retries={'max_attempts': 1, 'mode': 'standard'}
+                )
             )
             
             # Use the same default values as the Node.js implementation
@@ -92,20 +348,250 @@ class BedrockAgentService:
             logger.error(f"❌ Bedrock Agent initialization failed: {error}")
             self.is_demo = True
     
+    def warm_up_connections(self) -> int:
+        """
+        Open warm_connections pooled HTTPS connections to the agent endpoint, concurrently so each
+        takes its own pool slot. Sends an unsigned HEAD request (answered 403 without reaching the
+        agent); the connection then stays in the client's pool for the next invoke_agent calls.
+        Returns the connections opened.
+        """
+        endpoint = getattr(getattr(self, 'client', None), '_endpoint', None)
+        if self.is_demo or endpoint is None or self.warm_connections <= 0:
+            # Mock mode or the fake runtime: nothing to connect to
+            return 0
+        from botocore.awsrequest import AWSRequest
+        url = self.client.meta.endpoint_url
+        
+        def connect(_):
+            try:
+                endpoint.http_session.send(AWSRequest(method='HEAD', url=url).prepare())
+                return True
+            except Exception as error:
+                logger.warning(f"⚠️ Could not pre-connect to {url}: {error}")
+                return False
+        
+        opened = sum(self.executor.map(connect, range(self.warm_connections)))
+        self._last_call = time.monotonic()
+        return opened
+    
+    async def keep_connections_warm(self):
+        """Re-open warm connections whenever no agent call used the pool for keep_warm_seconds"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.keep_warm_seconds)
+            if time.monotonic() - self._last_call >= self.keep_warm_seconds:
+                await loop.run_in_executor(None, self.warm_up_connections)
+    
     def generate_session_id(self):
         return f"session-{int(datetime.now().timestamp())}-{str(uuid.uuid4())[:8]}"
     
-    async def invoke_bedrock_agent(self, prompt: str, session_id: Optional[str] = None):
+    async def invoke_bedrock_agent(self, prompt: str, session_id: Optional[str] = None,
+                                   fallback: Optional[Callable[[str], Dict[str, Any]]] = None,
+                                   hedge: bool = True):
+        self.start()
         if self.is_demo or not hasattr(self, 'client'):
             return self.get_mock_response(prompt)
         
+        if self._pending >= self.max_concurrency + self.max_queue_depth:
+            with self._stats_lock:
+                self._rejected += 1
+            logger.warning("⚠️ Bedrock Agent queue is full, answering from mock responses")
+            current_timer().label(fallback="queue_full")
+            return self.fallback_response(prompt, "Bedrock Agent queue full. Falling back to mock responses.", fallback)
+        
+        session = session_id or self.generate_session_id()
+        
+        def attempt(cancel: threading.Event):
+            if cancel.is_set():
+                # The caller gave up while this attempt waited for a worker thread
+                raise DeadlineExceededError("Bedrock Agent deadline exceeded before the call started")
+            timings: Dict[str, float] = {}
+            completion = self._invoke_agent_sync(prompt, session, on_chunk=lambda _: not cancel.is_set(), timings=timings)
+            return completion, timings
+        
+        invoke_started = time.perf_counter()
         try:
             logger.info(f"🤖 Invoking Bedrock Agent: {self.agent_id}")
             
+            self._pending += 1
+            with self._stats_lock:
+                queue_depth = self._pending - self._running
+                self._peak_queue_depth = max(self._peak_queue_depth, queue_depth)
+            try:
+                completion, timings = await self.invoker.invoke(attempt, self.deadline_seconds, hedge=hedge)
+            finally:
+                self._pending -= 1
+            # Stage timings of the attempt that answered
+            current_timer().add_agent_call(timings)
+            
+            return {
+                "success": True,
+                "message": completion,
+                "sessionId": session,
+                "source": "bedrock-agent"
+            }
+            
+        except Exception as error:
+            logger.error(f"Bedrock Agent service error: {error}")
+            # Time spent on attempts that did not produce an answer
+            current_timer().record("agent_failed", time.perf_counter() - invoke_started)
+            
+            # Fall back instead of returning an error
+            fallback_message = self.describe_agent_error(error)
+            logger.info(f"🎯 {fallback_message}")
+            return self.fallback_response(prompt, fallback_message, fallback)
+    
+    async def stream_bedrock_agent(self, prompt: str, session_id: Optional[str] = None,
+                                   fallback: Optional[Callable[[str], Dict[str, Any]]] = None):
+        """Yield (source, text) pairs as completion chunks arrive from the agent
+        
+        The first chunk must arrive within the deadline; streams are not retried or hedged
+        because chunks may already have reached the client.
+        """
+        self.start()
+        if self.is_demo or not hasattr(self, 'client'):
+            mock = self.get_mock_response(prompt)
+            yield mock["source"], mock["message"]
+            return
+        
+        if self._pending >= self.max_concurrency + self.max_queue_depth:
+            with self._stats_lock:
+                self._rejected += 1
+            logger.warning("⚠️ Bedrock Agent queue is full, answering from mock responses")
+            current_timer().label(fallback="queue_full")
+            mock = self.fallback_response(prompt, "Bedrock Agent queue full. Falling back to mock responses.", fallback)
+            yield mock["source"], mock["message"]
+            return
+        
+        breaker = self.invoker.breaker
+        if not breaker.allow_request():
+            mock = self.fallback_response(prompt, self.describe_agent_error(CircuitOpenError()), fallback)
+            yield mock["source"], mock["message"]
+            return
+        
+        logger.info(f"🤖 Streaming Bedrock Agent: {self.agent_id}")
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stream_closed = threading.Event()
+        end_of_stream = object()
+        
+        def on_chunk(text: str) -> bool:
+            loop.call_soon_threadsafe(chunks.put_nowait, text)
+            return not stream_closed.is_set()
+        
+        self._pending += 1
+        with self._stats_lock:
+            self._peak_queue_depth = max(self._peak_queue_depth, self._pending - self._running)
+        timings: Dict[str, float] = {}
+        future = loop.run_in_executor(
+            self.executor,
+            self._invoke_agent_sync,
+            prompt,
+            session_id or self.generate_session_id(),
+            on_chunk,
+            timings
+        )
+        future.add_done_callback(lambda _: chunks.put_nowait(end_of_stream))
+        
+        deadline = loop.time() + self.deadline_seconds
+        received_any = False
+        try:
+            while True:
+                if received_any:
+                    text = await chunks.get()
+                else:
+                    try:
+                        text = await asyncio.wait_for(chunks.get(), timeout=max(deadline - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        self.invoker.deadline_exceeded += 1
+                        raise DeadlineExceededError("Bedrock Agent deadline exceeded before the first chunk")
+                if text is end_of_stream:
+                    break
+                received_any = True
+                yield "bedrock-agent", text
+            await future
+            current_timer().add_agent_call(timings)
+            breaker.record_success()
+        except Exception as error:
+            logger.error(f"Bedrock Agent streaming error: {error}")
+            current_timer().record("agent_failed", loop.time() - (deadline - self.deadline_seconds))
+            breaker.record_failure()
+            if received_any:
+                raise
+            fallback_message = self.describe_agent_error(error)
+            logger.info(f"🎯 {fallback_message}")
+            mock = self.fallback_response(prompt, fallback_message, fallback)
+            yield mock["source"], mock["message"]
+        finally:
+            # Tell the executor thread to stop draining if the client went away
+            stream_closed.set()
+            breaker.release_probe()
+            self._pending -= 1
+    
+    def describe_agent_error(self, error: Exception) -> str:
+        """Log a Bedrock failure and return the fallback reason shown to the user"""
+        error_message = str(error)
+        current_timer().label(fallback=failure_reason(error))
+        if "ResourceNotFoundException" in error_message:
+            logger.error(f"❌ Agent ID '{self.agent_id}' not found. Please check your BEDROCK_AGENT_ID environment variable.")
+            return f"Agent ID '{self.agent_id}' not found. Falling back to mock responses."
+        elif "AccessDeniedException" in error_message:
+            logger.error("❌ Access denied. Please check your AWS credentials and permissions.")
+            return "Access denied to Bedrock Agent. Falling back to mock responses."
+        elif isinstance(error, CircuitOpenError):
+            logger.warning("⚡ Bedrock Agent circuit is open, skipping the agent")
+            return "Bedrock Agent temporarily unavailable. Falling back to mock responses."
+        elif isinstance(error, DeadlineExceededError):
+            return "Bedrock Agent timed out. Falling back to mock responses."
+        elif is_throttling_error(error):
+            return "Bedrock Agent is throttling requests. Falling back to mock responses."
+        return "Bedrock Agent error. Falling back to mock responses."
+    
+    def fallback_response(self, prompt: str, reason: str, fallback: Optional[Callable[[str], Dict[str, Any]]] = None):
+        """Answer from the fallback provider when the agent cannot be used"""
+        with current_timer().stage("fallback"):
+            if fallback is not None:
+                return fallback(reason)
+            return self.get_mock_response(prompt, fallback_reason=reason)
+    
+    def fallback_for(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any],
+                     game_id: Optional[str] = None):
+        """Fallback provider for this position; None means mock responses (BEDROCK_FALLBACK_PROVIDER)"""
+        if self.fallback_provider != 'engine':
+            return None
+        return lambda reason: {
+            **self.get_engine_response(player_hand, open_deck, game_state, game_id=game_id),
+            "fallback_reason": reason
+        }
+    
+    def admission_fallback(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any],
+                           game_id: Optional[str] = None):
+        """Fallback answer for a request the admission queue did not admit in time"""
+        logger.warning("⚠️ No agent slot within the wait budget, answering from the fallback provider")
+        return self.fallback_response(
+            "",
+            "Server busy. Falling back to mock responses.",
+            self.fallback_for(player_hand, open_deck, game_state, game_id=game_id)
+        )
+    
+    def _invoke_agent_sync(self, prompt: str, session_id: str, on_chunk=None,
+                           timings: Optional[Dict[str, float]] = None) -> str:
+        """Run a blocking invoke_agent call and drain its completion stream (executor thread)
+
+        When on_chunk is given it is called with each decoded chunk; returning False stops draining.
+        When timings is given it receives first_chunk / stream seconds and chunk / byte counts.
+        """
+        with self._stats_lock:
+            self._running += 1
+        call_started = time.perf_counter()
+        first_chunk_at = None
+        chunk_count = 0
+        byte_count = 0
+        try:
             response = self.client.invoke_agent(
                 agentId=self.agent_id,
                 agentAliasId=self.agent_alias_id,
-                sessionId=session_id or self.session_id,
+                sessionId=session_id,
                 inputText=prompt
             )
             
@@ -115,34 +601,149 @@ class BedrockAgentService:
                     if 'chunk' in event:
                         chunk = event['chunk']
                         if 'bytes' in chunk:
-                            completion += chunk['bytes'].decode('utf-8')
-            
+                            if first_chunk_at is None:
+                                first_chunk_at = time.perf_counter()
+                            chunk_count += 1
+                            byte_count += len(chunk['bytes'])
+                            chunk_text = chunk['bytes'].decode('utf-8')
+                            completion += chunk_text
+                            if on_chunk and not on_chunk(chunk_text):
+                                break
+            return completion
+        finally:
+            with self._stats_lock:
+                self._running -= 1
+                self._completed += 1
+            self._last_call = time.monotonic()
+            if timings is not None:
+                finished = time.perf_counter()
+                timings["first_chunk"] = (first_chunk_at or finished) - call_started
+                timings["stream"] = finished - first_chunk_at if first_chunk_at else 0.0
+                timings["chunks"] = chunk_count
+                timings["bytes"] = byte_count
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Snapshot of the Bedrock invocation pool for /health"""
+        with self._stats_lock:
             return {
-                "success": True,
-                "message": completion,
-                "sessionId": session_id or self.session_id,
-                "source": "bedrock-agent"
+                "max_concurrency": self.max_concurrency,
+                "max_pool_connections": self.max_pool_connections,
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self._running,
+                "queue_depth": max(self._pending - self._running, 0),
+                "peak_queue_depth": self._peak_queue_depth,
+                "completed": self._completed,
+                "rejected": self._rejected
             }
+    
+    def shutdown(self):
+        """Release the invocation thread pool"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def get_game_suggestion(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any],
+                                  game_id: Optional[str] = None, priority: str = INTERACTIVE):
+        timer = current_timer()
+        indexed = self.get_index_response(player_hand, open_deck, game_state)
+        if indexed is not None:
+            timer.label(provider="suggestion-index", cache="index")
+            return indexed
+        if self.provider == 'engine':
+            timer.label(provider="rule-engine", cache="bypass")
+            return await self.analyze_engine_response(player_hand, open_deck, game_state, game_id=game_id)
+        
+        fingerprint = self.game_fingerprint(player_hand, open_deck, game_state)
+        cached = suggestion_cache.get(fingerprint)
+        if cached is not None:
+            timer.label(provider=cached.get("source", "bedrock-agent"), cache="hit")
+            return {**cached, "cached": True}
+        
+        async def ask_agent():
+            with timer.stage("prompt"):
+                prompt, plan, snapshot = self.plan_game_prompt(game_id, player_hand, open_deck, game_state)
+            answered = False
+            try:
+                result = await self.invoke_bedrock_agent(
+                    prompt.text,
+                    session_id=plan.session_id if plan else None,
+                    fallback=self.fallback_for(player_hand, open_deck, game_state, game_id=game_id),
+                    # A stateful session must not receive the same turn twice
+                    hedge=not (plan and plan.leased)
+                )
+                answered = result.get("source") == "bedrock-agent"
+            finally:
+                self.finish_session(plan, snapshot, answered)
+            result["prompt_tokens"] = prompt.tokens
             
-        except Exception as error:
-            logger.error(f"Bedrock Agent service error: {error}")
-            
-            # Check for specific error types
-            error_message = str(error)
-            if "ResourceNotFoundException" in error_message:
-                logger.error(f"❌ Agent ID '{self.agent_id}' not found. Please check your BEDROCK_AGENT_ID environment variable.")
-                fallback_message = f"Agent ID '{self.agent_id}' not found. Falling back to mock responses."
-            elif "AccessDeniedException" in error_message:
-                logger.error("❌ Access denied. Please check your AWS credentials and permissions.")
-                fallback_message = "Access denied to Bedrock Agent. Falling back to mock responses."
-            else:
-                fallback_message = "Bedrock Agent error. Falling back to mock responses."
-            
-            # Fall back to mock response instead of returning error
-            logger.info(f"🎯 {fallback_message}")
-            return self.get_mock_response(prompt, fallback_reason=fallback_message)
+            # Only real agent answers are cached; fallbacks should be retried next time
+            if result.get("source") == "bedrock-agent":
+                suggestion_cache.put(fingerprint, result)
+            return result
+        
+        async def fetch():
+            # A request that cannot get an agent slot within its wait budget is answered right away
+            if not await self.admission.acquire(priority):
+                return self.admission_fallback(player_hand, open_deck, game_state, game_id=game_id)
+            try:
+                return await ask_agent()
+            finally:
+                self.admission.release()
+        
+        # Identical requests already in flight (double clicks, retries) share one agent call
+        result, coalesced = await self.single_flight.run(fingerprint, fetch)
+        timer.label(provider=result.get("source", "bedrock-agent"), cache="coalesced" if coalesced else "miss")
+        return {**result, "coalesced": True} if coalesced else result
+    
+    def game_fingerprint(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any]) -> str:
+        return state_fingerprint(
+            player_hand,
+            open_deck,
+            game_state.get("jokerCard"),
+            game_state.get("playerMelds"),
+            game_state.get("closedDeckCount"),
+            game_state.get("version", 0)
+        )
+    
+    def plan_game_prompt(self, game_id: Optional[str], player_hand: List[Card], open_deck: List[Card],
+                         game_state: Dict[str, Any]):
+        """Prompt, session plan and snapshot for one agent call
+        
+        With the compact prompt style a game's later turns are sent as a delta against the
+        position its agent session last answered; otherwise the full state is sent.
+        """
+        if self.prompt_style == 'verbose':
+            return self.build_game_prompt(player_hand, open_deck, game_state), None, None
+        snapshot = position_snapshot(player_hand, open_deck, game_state.get("jokerCard"), game_state.get("playerMelds"))
+        plan = self.sessions.plan(game_id, snapshot)
+        prompt = prompt_builder.build_delta(plan.previous, snapshot) if plan.previous else None
+        if prompt is None:
+            prompt = self.build_game_prompt(player_hand, open_deck, game_state, game_id=game_id)
+        return prompt, plan, snapshot
+    
+    def finish_session(self, plan: Optional[SessionPlan], snapshot: Optional[PositionSnapshot], answered: bool):
+        """Advance the game's session after an agent answer; otherwise drop it so the next turn resyncs"""
+        if plan is None:
+            return
+        if answered:
+            self.sessions.commit(plan, snapshot)
+        else:
+            self.sessions.release(plan, lost=True)
+    
+    def build_game_prompt(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any],
+                          game_id: Optional[str] = None) -> BuiltPrompt:
+        """Agent prompt for this position with its estimated token count (PROMPT_STYLE)"""
+        if self.prompt_style == 'verbose':
+            text = self.create_game_prompt(player_hand, open_deck, game_state)
+            return BuiltPrompt(text, estimate_tokens(text), [])
+        tracker = self.card_trackers.peek(game_id)
+        return prompt_builder.build(
+            player_hand,
+            open_deck,
+            game_state.get("jokerCard"),
+            game_state.get("playerMelds"),
+            opponent=tracker.hint() if tracker else None
+        )
     
-    async def get_game_suggestion(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any]):
+    def create_game_prompt(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any]) -> str:
         hand_description = self.format_hand_for_ai(player_hand)
         discard_description = (
             f"Top discard: {open_deck[-1].rank} of {open_deck[-1].suit}" 
@@ -162,9 +763,78 @@ Provide a strategic suggestion for:
 
         system_prompt = """You are a Rummy game AI assistant. Analyze the hand and provide tactical suggestions. Be specific about card choices and explain the reasoning behind each suggestion."""
         
-        full_prompt = f"{system_prompt}\n\nUser: {prompt}"
+        return f"{system_prompt}\n\nUser: {prompt}"
+    
+    def get_engine_response(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any],
+                            game_id: Optional[str] = None):
+        # Stored games keep their hand analysis warm between moves
+        with current_timer().stage("engine"):
+            warm = self.hand_analyses.get(game_id, player_hand, game_state.get("jokerCard")) if game_id else None
+            return engine_suggestion(
+                player_hand,
+                open_deck,
+                game_state.get("jokerCard"),
+                game_state.get("playerMelds"),
+                game_state.get("closedDeckCount"),
+                analysis=warm,
+                draw_simulation=self.draw_simulation,
+                tracker=self.card_trackers.peek(game_id)
+            )
+    
+    async def analyze_engine_response(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any],
+                                      game_id: Optional[str] = None):
+        """get_engine_response on the analysis pool, off the event loop
+        
+        Games whose hand analysis is already warm are answered in-process (no search left to do).
+        A full pool queue or a job timeout answers from mock responses, like a full agent queue.
+        """
+        warm = self.hand_analyses.peek(game_id, player_hand, game_state.get("jokerCard")) if game_id else None
+        if warm is not None:
+            return self.get_engine_response(player_hand, open_deck, game_state, game_id=game_id)
+        if not analysis_pool.enabled:
+            # No worker processes: search on a thread so the event loop keeps serving
+            return await asyncio.to_thread(self.get_engine_response, player_hand, open_deck, game_state, game_id=game_id)
         
-        return await self.invoke_bedrock_agent(full_prompt)
+        state = pack_state(
+            player_hand,
+            open_deck,
+            game_state.get("jokerCard"),
+            game_state.get("playerMelds"),
+            game_state.get("closedDeckCount")
+        )
+        try:
+            with current_timer().stage("engine"):
+                return await analysis_pool.run(
+                    "engine", state, draw_simulation=self.draw_simulation, tracker=self.card_trackers.peek(game_id)
+                )
+        except AnalysisQueueFullError:
+            logger.warning("⚠️ Analysis queue is full, answering from mock responses")
+            current_timer().label(fallback="analysis_queue_full")
+            return self.get_mock_response("", fallback_reason="Analysis queue full")
+        except AnalysisTimeoutError:
+            logger.warning("⚠️ Analysis job timed out, answering from mock responses")
+            current_timer().label(fallback="analysis_timeout")
+            return self.get_mock_response("", fallback_reason="Analysis timed out")
+    
+    def get_index_response(self, player_hand: List[Card], open_deck: List[Card], game_state: Dict[str, Any]):
+        """Precomputed suggestion from the memory-mapped index (SUGGESTION_INDEX_PATH), or None"""
+        if suggestion_index is None:
+            return None
+        with current_timer().stage("index"):
+            analysis = suggestion_index.lookup(
+                player_hand,
+                open_deck,
+                game_state.get("jokerCard"),
+                game_state.get("playerMelds")
+            )
+        if analysis is None:
+            return None
+        return {
+            "success": True,
+            "message": format_suggestion(analysis),
+            "analysis": analysis,
+            "source": "suggestion-index"
+        }
     
     def format_hand_for_ai(self, hand: List[Card]) -> str:
         if not hand:
@@ -172,16 +842,7 @@ Provide a strategic suggestion for:
         return ", ".join([f"{card.rank}{card.suit[0]}" for card in hand])
     
     def get_mock_response(self, message: str, fallback_reason: str = None):
-        mock_responses = [
-            "🤖 Bedrock Strategy: Draw from closed deck to avoid revealing your strategy. Consider forming sequences with middle cards.",
-            "🎯 AI Suggestion: Your hand shows potential for a hearts sequence. Pick the 6♥ if available, discard the King♠.",
-            "💡 Bedrock Analysis: Form the 7-8-9 of spades sequence first. Discard face cards unless they complete sets.",
-            "🎲 Strategic Advice: Focus on forming pure sequences first (mandatory for declaration). Middle cards (5-9) offer more flexibility than edge cards.",
-            "🃏 Tactical Response: Use jokers wisely for high-value sets. Track opponent's picks/discards to predict their hand."
-        ]
-        
-        import random
-        random_response = random.choice(mock_responses)
+        random_response = random.choice(MOCK_RESPONSES)
         
         # Add fallback reason if provided
         if fallback_reason:
@@ -194,23 +855,87 @@ Provide a strategic suggestion for:
             "source": "bedrock-mock"
         }
 
+# Precomputed suggestions for common positions, mapped in the lifespan; the pages are shared by all workers
+suggestion_index: Optional[SuggestionIndex] = None
+
 # Initialize the Bedrock service
 bedrock_service = BedrockAgentService()
 
-# In-memory game storage (in production, use a proper database)
-active_games: Dict[str, GameState] = {}
+# Game storage: bounded in-memory LRU by default, SQLite (WAL) to share games between workers.
+# Stored games are CompactGameState objects (same fields as GameState, slot-based shared cards).
+game_store = create_game_store(CompactGameState)
+
+# Batch fan-out limits
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '200'))
+BATCH_MAX_PARALLELISM = int(os.getenv('BATCH_MAX_PARALLELISM', '16'))
+BATCH_ITEM_TIMEOUT_SECONDS = float(os.getenv('BATCH_ITEM_TIMEOUT_SECONDS', '25'))
+
+def get_state_context(game_state: GameState) -> Dict[str, Any]:
+    """The game_state dict the suggestion service expects alongside hand and open deck"""
+    return {
+        "jokerCard": game_state.jokerCard,
+        "playerMelds": game_state.playerMelds,
+        "closedDeckCount": game_state.closedDeckCount,
+        "gameStatus": game_state.gameStatus,
+        "version": game_state.version
+    }
+
+# Answers that are the same on every poll of an unchanged position; fallbacks are retried instead
+REPEATABLE_SOURCES = ("bedrock-agent", "rule-engine", "suggestion-index")
+
+def suggestion_etag(fingerprint: str) -> str:
+    """
+    Weak validator of a position's suggestion: the body's timestamp changes between polls, the advice does not.
+    The fingerprint covers the stored game's version, so every worker gives a stored state the same ETag.
+    """
+    return f'W/"{bedrock_service.provider}-{fingerprint}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check with weak comparison (W/ prefixes ignored)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def request_priority(request: Request) -> str:
+    """X-Request-Priority header: "interactive" (default) or "batch" for analytics clients"""
+    priority = request.headers.get("x-request-priority", INTERACTIVE).lower()
+    return priority if priority in PRIORITIES else INTERACTIVE
+
+def admit_request(request: Request, game_id: Optional[str] = None, priority: str = INTERACTIVE):
+    """Spend the caller's (X-Client-Id header, else client address) and the game's tokens; 429 when out"""
+    client_id = request.headers.get("x-client-id") or (request.client.host if request.client else None)
+    try:
+        bedrock_service.admission.check_rate(client_id, game_id, priority)
+    except RateLimitedError as error:
+        logger.warning(f"🚦 Shedding request: {error}")
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "success": False,
+                "error": str(error),
+                "timestamp": datetime.now().isoformat()
+            },
+            headers={"Retry-After": error.retry_after_header}
+        )
 
 @app.get(
     "/suggest/{game_id}",
     response_model=SuggestionResponse,
     responses={
+        304: {"description": "Position unchanged since the suggestion with the If-None-Match ETag"},
         404: {"model": ErrorResponse, "description": "Game not found"},
+        429: {"model": ErrorResponse, "description": "Too many requests for this client or game"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     },
     summary="Get AI suggestion for next move",
     description="Returns an AI-powered suggestion for the player's next move based on current game state"
 )
 async def get_suggestion(
+    request: Request,
+    response: Response,
     game_id: str = Path(..., description="Unique identifier for the game", example="game_1234567890_abc123")
 ):
     """
@@ -222,6 +947,9 @@ async def get_suggestion(
     - Possible melds to form
     - Overall strategy assessment
     
+    Repeatable suggestions carry an ETag of the position; polling with If-None-Match gets a
+    304 while the position is unchanged, without asking any provider.
+    
     Args:
         game_id: The unique identifier for the game
         
@@ -229,11 +957,13 @@ async def get_suggestion(
         SuggestionResponse: Contains the AI suggestion and metadata
         
     Raises:
-        HTTPException: 404 if game not found, 500 for server errors
+        HTTPException: 404 if game not found, 429 when rate limited, 500 for server errors
     """
     try:
         # Retrieve game state
-        if game_id not in active_games:
+        with current_timer().stage("store"):
+            game_state = await game_store.get_async(game_id)
+        if game_state is None:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -243,25 +973,40 @@ async def get_suggestion(
                 }
             )
         
-        game_state = active_games[game_id]
+        state_context = get_state_context(game_state)
+        fingerprint = bedrock_service.game_fingerprint(game_state.playerHand, game_state.openDeck, state_context)
+        etag = suggestion_etag(fingerprint)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            # Unchanged position: no provider call and no rate tokens spent
+            current_timer().label(cache="not_modified")
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        
+        priority = request_priority(request)
+        # Polls that join the agent call already in flight for this position share its tokens
+        if not bedrock_service.single_flight.running(fingerprint):
+            admit_request(request, game_id, priority)
         
         # Get suggestion from Bedrock Agent (with automatic fallback to mock)
         suggestion_result = await bedrock_service.get_game_suggestion(
             game_state.playerHand,
             game_state.openDeck,
-            {
-                "jokerCard": game_state.jokerCard,
-                "playerMelds": game_state.playerMelds,
-                "gameStatus": game_state.gameStatus
-            }
+            state_context,
+            game_id=game_state.gameId,
+            priority=priority
         )
         
+        if suggestion_result.get("source") in REPEATABLE_SOURCES and "fallback_reason" not in suggestion_result:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "no-cache"
+        
         # The service now always returns success=True with fallback to mock responses
         return SuggestionResponse(
             success=True,
             suggestion=suggestion_result["message"],
             timestamp=datetime.now().isoformat(),
-            source=suggestion_result.get("source", "bedrock-agent")
+            source=suggestion_result.get("source", "bedrock-agent"),
+            cached=suggestion_result.get("cached", False),
+            prompt_tokens=suggestion_result.get("prompt_tokens")
         )
         
     except HTTPException:
@@ -277,6 +1022,512 @@ async def get_suggestion(
             }
         )
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get(
+    "/suggest/{game_id}/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Stream of suggestion chunks"},
+        404: {"model": ErrorResponse, "description": "Game not found"},
+        429: {"model": ErrorResponse, "description": "Too many requests for this client or game"}
+    },
+    summary="Stream AI suggestion for next move",
+    description="Streams the suggestion as Server-Sent Events: one `chunk` event per Bedrock completion chunk, then a `done` event with the source and timing"
+)
+async def stream_suggestion(
+    request: Request,
+    game_id: str = Path(..., description="Unique identifier for the game", example="game_1234567890_abc123")
+):
+    """
+    Stream an AI-powered move suggestion for a Rummy game.
+    
+    Each Bedrock completion chunk is forwarded as soon as it arrives, so the client can
+    render text after the first chunk instead of waiting for the full completion.
+    
+    Args:
+        game_id: The unique identifier for the game
+        
+    Returns:
+        StreamingResponse: `chunk` events followed by a single `done` (or `error`) event
+        
+    Raises:
+        HTTPException: 404 if game not found, 429 when rate limited
+    """
+    timer = current_timer()
+    with timer.stage("store"):
+        game_state = await game_store.get_async(game_id)
+    if game_state is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "error": "Game not found",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    priority = request_priority(request)
+    admit_request(request, game_id, priority)
+    
+    state_context = get_state_context(game_state)
+    fingerprint = bedrock_service.game_fingerprint(game_state.playerHand, game_state.openDeck, state_context)
+    
+    async def event_stream():
+        started = time.perf_counter()
+        first_chunk_ms = None
+        chunk_count = 0
+        source = "bedrock-agent"
+        prompt_tokens = None
+        holding_slot = False
+        indexed = bedrock_service.get_index_response(game_state.playerHand, game_state.openDeck, state_context)
+        if indexed is not None:
+            cached = None
+            ready = indexed
+            timer.label(cache="index")
+        elif bedrock_service.provider == 'engine':
+            cached = None
+            timer.label(cache="bypass")
+            ready = await bedrock_service.analyze_engine_response(
+                game_state.playerHand, game_state.openDeck, state_context, game_id=game_state.gameId
+            )
+        else:
+            cached = ready = suggestion_cache.get(fingerprint)
+            timer.label(cache="hit" if cached is not None else "miss")
+            if ready is None:
+                holding_slot = await bedrock_service.admission.acquire(priority)
+                if not holding_slot:
+                    ready = bedrock_service.admission_fallback(
+                        game_state.playerHand, game_state.openDeck, state_context, game_id=game_state.gameId
+                    )
+        try:
+            if ready is not None:
+                source = ready["source"]
+                first_chunk_ms = round((time.perf_counter() - started) * 1000, 2)
+                chunk_count = 1
+                prompt_tokens = ready.get("prompt_tokens")
+                yield format_sse("chunk", {"text": ready["message"]})
+            else:
+                with timer.stage("prompt"):
+                    prompt, plan, snapshot = bedrock_service.plan_game_prompt(
+                        game_state.gameId, game_state.playerHand, game_state.openDeck, state_context
+                    )
+                prompt_tokens = prompt.tokens
+                answered = False
+                try:
+                    parts = []
+                    fallback = bedrock_service.fallback_for(
+                        game_state.playerHand, game_state.openDeck, state_context, game_id=game_state.gameId
+                    )
+                    async for source, text in bedrock_service.stream_bedrock_agent(
+                        prompt.text,
+                        session_id=plan.session_id if plan else None,
+                        fallback=fallback
+                    ):
+                        if first_chunk_ms is None:
+                            first_chunk_ms = round((time.perf_counter() - started) * 1000, 2)
+                        chunk_count += 1
+                        parts.append(text)
+                        yield format_sse("chunk", {"text": text})
+                    answered = source == "bedrock-agent"
+                finally:
+                    bedrock_service.finish_session(plan, snapshot, answered)
+                if answered:
+                    suggestion_cache.put(fingerprint, {
+                        "success": True,
+                        "message": "".join(parts),
+                        "source": source,
+                        "prompt_tokens": prompt.tokens
+                    })
+        except Exception as error:
+            timer.label(provider=source)
+            logger.error(f"Stream suggestion error: {error}")
+            yield format_sse("error", {
+                "success": False,
+                "error": "Suggestion stream interrupted",
+                "timestamp": datetime.now().isoformat()
+            })
+            return
+        finally:
+            if holding_slot:
+                bedrock_service.admission.release()
+        
+        timer.label(provider=source)
+        yield format_sse("done", {
+            "success": True,
+            "source": source,
+            "cached": cached is not None,
+            "prompt_tokens": prompt_tokens,
+            "timestamp": datetime.now().isoformat(),
+            "timing": {
+                "time_to_first_chunk_ms": first_chunk_ms,
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                "chunks": chunk_count,
+                "stages_ms": timer.stages_ms()
+            }
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post(
+    "/suggest/batch",
+    response_model=BatchSuggestionResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Too many items in the batch"},
+        429: {"model": ErrorResponse, "description": "Too many requests for this client"}
+    },
+    summary="Get AI suggestions for many games",
+    description="Returns one result per item; identical positions are answered once and the rest run concurrently"
+)
+async def get_batch_suggestions(request: BatchSuggestionRequest, http_request: Request):
+    """
+    Get suggestions for a batch of stored games and/or inline game states.
+    
+    Items with the same position (same fingerprint as the suggestion cache) share one
+    suggestion. Unique positions are fanned out with at most BATCH_MAX_PARALLELISM in flight,
+    and each one is bounded by BATCH_ITEM_TIMEOUT_SECONDS, so a slow or failing item only
+    affects its own result. Items wait for agent slots behind interactive requests.
+    
+    Args:
+        request: Batch of game IDs and/or GameState objects
+        
+    Returns:
+        BatchSuggestionResponse: Per-item results in request order
+        
+    Raises:
+        HTTPException: 400 if the batch exceeds BATCH_MAX_ITEMS, 429 when rate limited
+    """
+    admit_request(http_request, priority=BATCH)
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "error": f"Batch exceeds {BATCH_MAX_ITEMS} items",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    
+    results: List[Optional[BatchItemResult]] = [None] * len(request.items)
+    positions: Dict[str, List[int]] = {}
+    states: Dict[str, GameState] = {}
+    
+    for index, item in enumerate(request.items):
+        game_state = await game_store.get_async(item) if isinstance(item, str) else item
+        if game_state is None:
+            results[index] = BatchItemResult(index=index, gameId=item, success=False, error="Game not found")
+            continue
+        fingerprint = bedrock_service.game_fingerprint(
+            game_state.playerHand,
+            game_state.openDeck,
+            get_state_context(game_state)
+        )
+        positions.setdefault(fingerprint, []).append(index)
+        states.setdefault(fingerprint, game_state)
+    
+    semaphore = asyncio.Semaphore(BATCH_MAX_PARALLELISM)
+    
+    async def suggest_position(fingerprint: str):
+        game_state = states[fingerprint]
+        async with semaphore:
+            try:
+                outcome = await asyncio.wait_for(
+                    bedrock_service.get_game_suggestion(
+                        game_state.playerHand,
+                        game_state.openDeck,
+                        get_state_context(game_state),
+                        priority=BATCH
+                    ),
+                    timeout=BATCH_ITEM_TIMEOUT_SECONDS
+                )
+                error = None
+            except asyncio.TimeoutError:
+                outcome, error = None, "Suggestion timed out"
+            except Exception as exc:
+                logger.error(f"Batch suggestion error: {exc}")
+                outcome, error = None, "Failed to get suggestion"
+        
+        for position, index in enumerate(positions[fingerprint]):
+            item = request.items[index]
+            results[index] = BatchItemResult(
+                index=index,
+                gameId=item if isinstance(item, str) else item.gameId,
+                success=error is None,
+                suggestion=outcome["message"] if outcome else None,
+                source=outcome.get("source") if outcome else None,
+                cached=outcome.get("cached", False) if outcome else False,
+                deduplicated=position > 0,
+                error=error
+            )
+    
+    await asyncio.gather(*(suggest_position(fingerprint) for fingerprint in positions))
+    
+    return BatchSuggestionResponse(
+        success=all(result.success for result in results),
+        results=results,
+        unique_positions=len(positions),
+        timestamp=datetime.now().isoformat()
+    )
+
+def invalid_move(message: str):
+    raise HTTPException(
+        status_code=400,
+        detail={
+            "success": False,
+            "error": message,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+def move_conflict(message: str):
+    raise HTTPException(
+        status_code=409,
+        detail={
+            "success": False,
+            "error": message,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+def find_card_positions(hand: List[Any], card_ids: List[str]) -> List[int]:
+    """Hand positions of the given card ids; a repeated id matches a further copy"""
+    positions: List[int] = []
+    for card_id in card_ids:
+        position = next((p for p, card in enumerate(hand) if card.id == card_id and p not in positions), None)
+        if position is None:
+            invalid_move(f"Card {card_id} is not in the player's hand")
+        positions.append(position)
+    return positions
+
+@app.post(
+    "/games/{game_id}/moves",
+    response_model=MoveResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Malformed move, unknown card or cards that do not form a meld"},
+        404: {"model": ErrorResponse, "description": "Game not found"},
+        409: {"model": ErrorResponse, "description": "Not this move's turn: drawing with 14 cards held, discarding with 13"}
+    },
+    summary="Apply a move to a stored game",
+    description="Draws, discards and melds update the stored game and its hand analysis; moves out of turn or invalid melds are rejected"
+)
+async def apply_move(
+    move: MoveRequest,
+    game_id: str = Path(..., description="Unique identifier for the game", example="game_1234567890_abc123")
+):
+    """
+    Apply one move to a stored game instead of re-posting the whole state.
+    
+    - draw_closed: `card` (the card the player drew) joins the hand
+    - draw_open: the top of the open deck joins the hand
+    - discard: `cardId` leaves the hand and becomes the top of the open deck
+    - meld: `cardIds` (3 or more forming a pure sequence, sequence or set) leave the hand as one meld on the table
+    - opponent_draw_closed / opponent_draw_open / opponent_discard (`card`): the opponent's
+      turn, recorded in the game's card tracker (dead cards, safe discards, what they collect)
+    
+    Cards held (hand plus melds) set whose turn it is: draws and opponent moves need 13 or
+    fewer, a discard needs 14. The stored game is replaced only once the move is valid.
+    
+    The hand analysis is updated for the changed card when it is not part of a meld, so the
+    next suggestion starts from a warm analysis.
+    """
+    timer = current_timer()
+    with timer.stage("store"):
+        game_state = await game_store.get_async(game_id)
+    if game_state is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "error": "Game not found",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    
+    hand = game_state.playerHand
+    added = None
+    removed: List[int] = []
+    
+    # Validate everything before touching the game or its tracker
+    if move.type in ("draw_closed", "opponent_discard"):
+        if move.card is None:
+            invalid_move(f"card is required for {move.type}")
+    if move.type == "discard" and not move.cardId:
+        invalid_move("cardId is required for discard")
+    if move.type == "meld" and (not move.cardIds or len(move.cardIds) < 3):
+        invalid_move("A meld needs at least 3 cardIds")
+    held = len(hand) + sum(len(meld) for meld in game_state.playerMelds)
+    if move.type == "discard" and held <= HAND_SIZE:
+        move_conflict(f"Draw before discarding: the player holds {held} cards")
+    if move.type != "discard" and move.type != "meld" and held > HAND_SIZE:
+        move_conflict(f"The player holds {held} cards and must discard first")
+    if move.type in ("draw_closed", "opponent_draw_closed") and game_state.closedDeckCount <= 0:
+        invalid_move("Closed deck is empty")
+    if move.type in ("draw_open", "opponent_draw_open") and not game_state.openDeck:
+        invalid_move("Open deck is empty")
+    if move.type == "discard":
+        removed = find_card_positions(hand, [move.cardId])
+    elif move.type == "meld":
+        removed = find_card_positions(hand, move.cardIds)
+        if meld_kind([hand[position] for position in removed], game_state.jokerCard) is None:
+            invalid_move("Cards do not form a pure sequence, sequence or set")
+    
+    # The store may hand out its live object; change a copy and put it back
+    game_state = game_state.copy()
+    # Every move is a new version: suggestion ETags and cache keys change even when the cards do not
+    game_state.version += 1
+    # Tracking starts from the stored state the first time a game sees a move
+    tracker = bedrock_service.card_trackers.get(game_id, game_state)
+    if move.type == "draw_closed":
+        added = compact_card(move.card.model_dump())
+        game_state.closedDeckCount -= 1
+        tracker.player_drew(added)
+    elif move.type == "draw_open":
+        added = game_state.openDeck.pop()
+    elif move.type == "discard":
+        game_state.openDeck.append(hand[removed[0]])
+        tracker.player_discarded(hand[removed[0]])
+    elif move.type == "meld":
+        game_state.playerMelds.append([hand[position] for position in removed])
+    elif move.type == "opponent_draw_closed":
+        game_state.closedDeckCount -= 1
+        tracker.opponent_drew_closed()
+    elif move.type == "opponent_draw_open":
+        tracker.opponent_picked_open(game_state.openDeck.pop())
+    else:
+        discarded = compact_card(move.card.model_dump())
+        game_state.openDeck.append(discarded)
+        tracker.opponent_discarded_card(discarded)
+    
+    game_state.playerHand = [card for position, card in enumerate(hand) if position not in removed]
+    if added is not None:
+        game_state.playerHand.append(added)
+    with timer.stage("engine"):
+        if move.type.startswith("opponent_"):
+            # The player's hand is unchanged; reuse its analysis when one is cached
+            analysis = bedrock_service.hand_analyses.peek(game_id, game_state.playerHand, game_state.jokerCard)
+            incremental = analysis is not None
+            if analysis is None:
+                analysis = bedrock_service.hand_analyses.get(game_id, game_state.playerHand, game_state.jokerCard)
+        else:
+            analysis, incremental = bedrock_service.hand_analyses.apply(
+                game_id, game_state.playerHand, game_state.jokerCard, added=added, removed_positions=removed
+            )
+    with timer.stage("store"):
+        await game_store.put_async(game_state)
+    
+    return MoveResponse(
+        success=True,
+        gameId=game_id,
+        move=move.type,
+        handSize=len(game_state.playerHand),
+        topDiscard=game_state.openDeck[-1].to_dict() if game_state.openDeck else None,
+        closedDeckCount=game_state.closedDeckCount,
+        analysis=HandSummary(
+            deadwood_points=analysis.deadwood_points,
+            has_pure_sequence=analysis.has_pure_sequence,
+            melds=len(analysis.melds),
+            jokers=len(analysis.wild_ids),
+            spare_jokers=analysis.spare_jokers
+        ),
+        incremental=incremental,
+        opponent=OpponentSummary(**tracker.summary()),
+        timestamp=datetime.now().isoformat()
+    )
+
+@app.get(
+    "/games/{game_id}/draw-odds",
+    response_model=DrawOddsResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "The player has already drawn this turn"},
+        404: {"model": ErrorResponse, "description": "Game not found"},
+        503: {"model": ErrorResponse, "description": "Analysis pool queue full or job timed out"}
+    },
+    summary="Monte Carlo odds for the draw decision",
+    description="Samples future closed-deck draws from the unseen cards and compares drawing closed with taking the top discard"
+)
+async def get_draw_odds(
+    game_id: str = Path(..., description="Unique identifier for the game", example="game_1234567890_abc123"),
+    budget_ms: float = Query(draw_simulator.DEFAULT_BUDGET_MS, ge=0, le=1000, description="Sampling time budget, 0 for max_samples exactly"),
+    horizon: int = Query(draw_simulator.DEFAULT_HORIZON, ge=1, le=10, description="Own draws played forward"),
+    max_samples: int = Query(draw_simulator.DEFAULT_MAX_SAMPLES, ge=1, le=100000),
+    seed: Optional[int] = Query(None, description="Seed for reproducible estimates")
+):
+    """
+    Quantified draw recommendation for a stored game whose player has not drawn yet.
+    
+    The unseen pool is both decks minus the hand, the open deck, the joker card and the
+    player's melds. Every sample plays `horizon` draws forward with a greedy discard; both
+    options share the same sampled draws, so `advantage` has a small standard error.
+    """
+    timer = current_timer()
+    with timer.stage("store"):
+        game_state = await game_store.get_async(game_id)
+    if game_state is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "error": "Game not found",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    
+    options = {"budget_ms": budget_ms, "horizon": horizon, "seed": seed, "max_samples": max_samples}
+    try:
+        with timer.stage("simulate"):
+            if analysis_pool.enabled:
+                state = pack_state(
+                    game_state.playerHand,
+                    game_state.openDeck,
+                    game_state.jokerCard,
+                    game_state.playerMelds,
+                    game_state.closedDeckCount
+                )
+                # budget_ms=0 runs exactly max_samples, so the job gets as long as those take
+                timeout = analysis_pool.timeout_seconds + draw_simulator.expected_run_seconds(budget_ms, max_samples, horizon)
+                odds = await analysis_pool.run("draw_odds", state, timeout=timeout, **options)
+            else:
+                # Without the pool the sampling still stays off the event loop
+                odds = await asyncio.to_thread(
+                    simulate_draw,
+                    game_state.playerHand,
+                    game_state.openDeck,
+                    game_state.jokerCard,
+                    game_state.closedDeckCount,
+                    game_state.playerMelds,
+                    **options
+                )
+    except (AnalysisQueueFullError, AnalysisTimeoutError) as error:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "success": False,
+                "error": str(error),
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    if odds is None:
+        invalid_move("No draw to decide: the hand already holds 14 cards or the closed deck is empty")
+    
+    return DrawOddsResponse(
+        success=True,
+        gameId=game_id,
+        recommendation=odds["recommendation"],
+        reason=odds["reason"],
+        current=odds["current"],
+        options=odds["options"],
+        advantage=odds["advantage"],
+        samples=odds["samples"],
+        horizon=odds["horizon"],
+        unseen_cards=odds["unseen_cards"],
+        elapsed_ms=odds["elapsed_ms"],
+        timestamp=datetime.now().isoformat()
+    )
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -286,21 +1537,69 @@ async def health_check():
         "service": "Botorial Suggest API",
         "timestamp": datetime.now().isoformat(),
         "bedrock_enabled": not bedrock_service.is_demo,
+        "provider": bedrock_service.provider,
         "agent_id": getattr(bedrock_service, 'agent_id', 'Not configured'),
-        "agent_alias_id": getattr(bedrock_service, 'agent_alias_id', 'Not configured')
+        "agent_alias_id": getattr(bedrock_service, 'agent_alias_id', 'Not configured'),
+        "bedrock_pool": bedrock_service.get_pool_stats(),
+        "bedrock_resilience": bedrock_service.invoker.stats(),
+        "suggestion_cache": suggestion_cache.stats(),
+        "single_flight": bedrock_service.single_flight.stats(),
+        "prompt": prompt_builder.stats(),
+        "agent_sessions": bedrock_service.sessions.stats(),
+        "hand_analysis": bedrock_service.hand_analyses.stats(),
+        "card_tracker": bedrock_service.card_trackers.stats(),
+        "admission": bedrock_service.admission.stats(),
+        "analysis_pool": analysis_pool.stats(),
+        "suggestion_index": suggestion_index.stats() if suggestion_index else None,
+        "game_store": await game_store.stats_async(),
+        "startup": startup_timings
     }
 
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Request metrics",
+    description="Prometheus text format: request and stage duration histograms, provider / cache / fallback counters, completion chunks and bytes"
+)
+async def get_metrics():
+    """Process-wide request metrics of this worker"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Utility endpoint to add a game for testing
-@app.post("/test/add-game")
-async def add_test_game(game_state: GameState):
+@app.post(
+    "/test/add-game",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/GameState"}}}
+        }
+    }
+)
+async def add_test_game(request: Request):
     """Add a game state for testing purposes"""
-    active_games[game_state.gameId] = game_state
+    # Validate the raw body in one pass instead of building a Pydantic model per card
+    timer = current_timer()
+    body = await request.body()
+    try:
+        # JSON parsing and validation are one pass here, recorded as the validate stage
+        with timer.stage("validate"):
+            game_state = CompactGameState.model_validate_json(body)
+    except ValidationError as error:
+        raise RequestValidationError([
+            {**detail, "loc": ("body", *detail["loc"])} for detail in error.errors(include_url=False)
+        ])
+    with timer.stage("store"):
+        await game_store.put_async(game_state)
+    # A posted state replaces the game: card tracking restarts from it
+    bedrock_service.card_trackers.discard(game_state.gameId)
     return {
         "success": True,
         "message": f"Game {game_state.gameId} added successfully",
         "timestamp": datetime.now().isoformat()
     }
 
+startup_timings["import_ms"] = round((time.perf_counter() - _module_import_started) * 1000, 2)
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000) 
@@ -0,0 +1,118 @@
+"""
+Suggestion cache shared by the FastAPI service and the Lambda handler
+Keys suggestions on a canonical fingerprint of the game state the prompt uses
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+
+def _card_field(card: Any, field: str) -> Any:
+    """Read a card attribute from either a Pydantic Card or a plain dict"""
+    if isinstance(card, dict):
+        return card.get(field)
+    return getattr(card, field, None)
+
+
+def card_key(card: Any) -> str:
+    """Canonical text for one card, e.g. '7|hearts'"""
+    if card is None:
+        return "-"
+    rank = _card_field(card, 'rank')
+    suit = _card_field(card, 'suit')
+    if rank is None or suit is None:
+        return str(card)
+    return f"{rank}|{str(suit).lower()}"
+
+
+def state_fingerprint(player_hand: Iterable[Any], open_deck: Optional[list], joker_card: Any = None,
+                      player_melds: Optional[list] = None, closed_deck_count: Optional[int] = None,
+                      version: int = 0) -> str:
+    """
+    Fingerprint the parts of a game state that the suggestion prompt depends on:
+    the hand (order-insensitive), the top discard, the joker, the meld count, the closed deck
+    count and the stored game's version (bumped by every move, so opponent moves that leave the
+    cards as they were still make a new suggestion).
+    """
+    hand = ",".join(sorted(card_key(card) for card in (player_hand or [])))
+    top_discard = card_key(open_deck[-1]) if open_deck else "-"
+    meld_count = len(player_melds) if player_melds else 0
+    closed = "-" if closed_deck_count is None else closed_deck_count
+    canonical = f"{hand};{top_discard};{card_key(joker_card)};{meld_count};{closed};{version}"
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SuggestionCache:
+    """Bounded LRU cache with per-entry TTL for suggestion results"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "SuggestionCache":
+        return cls(
+            max_size=int(os.environ.get('SUGGESTION_CACHE_SIZE', '1024')),
+            ttl_seconds=float(os.environ.get('SUGGESTION_CACHE_TTL_SECONDS', '300'))
+        )
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a fingerprint, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[fingerprint]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return value
+
+    def put(self, fingerprint: str, value: Dict[str, Any]):
+        """Store a result, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[fingerprint] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for health/metrics endpoints"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# One cache per process; both entry points import this instance
+suggestion_cache = SuggestionCache.from_env()
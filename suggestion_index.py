@@ -0,0 +1,330 @@
+"""
+Precomputed rule-engine suggestions for common positions, canonicalized under suit relabeling
+An offline builder writes a sorted binary index; the API and the Lambda handler mmap it and binary-search it
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from rummy_engine import SUIT_NAMES, card_field, card_label, parse_rank, parse_suit, suggest_move
+
+logger = logging.getLogger(__name__)
+
+# File layout: header, then fixed-size records sorted by key, then the payload blob
+MAGIC = b"BSIX"
+# Version 2: joker-rank cards keep their suit in the key (they can stand for themselves)
+VERSION = 2
+HEADER = struct.Struct(">4sHI")      # magic, version, record count
+RECORD = struct.Struct(">16sIH")     # canonical key, payload offset, payload length
+KEY_BYTES = 16
+
+RANK_CODES = {1: 'A', 11: 'J', 12: 'Q', 13: 'K', **{n: str(n) for n in range(2, 11)}}
+WILD = "W"
+
+
+class CanonicalPosition(NamedTuple):
+    """Index key of a position plus the suit relabeling that produced it"""
+    key: bytes
+    # canonical suit index -> the caller's suit index
+    suits: Tuple[int, ...]
+
+
+def _natural(card: Any) -> Optional[Tuple[int, int]]:
+    """
+    (suit, rank) of a suited card, None for printed jokers; raises ValueError for unreadable cards.
+    Joker-rank cards keep their suit: the engine may play them as themselves in a pure sequence.
+    """
+    raw_rank = card_field(card, 'rank')
+    if str(raw_rank).strip().lower() == 'joker':
+        return None
+    rank = parse_rank(raw_rank)
+    if rank is None:
+        raise ValueError(f"unknown rank {raw_rank!r}")
+    suit = parse_suit(card_field(card, 'suit'))
+    if suit is None:
+        raise ValueError(f"unknown suit {card_field(card, 'suit')!r}")
+    return suit, rank
+
+
+def canonical_position(player_hand: List[Any], open_deck: Optional[List[Any]],
+                       joker_card: Any = None) -> Optional[CanonicalPosition]:
+    """
+    Key shared by every position that differs only by a relabeling of suits.
+
+    Printed jokers only count; joker-rank cards are keyed like naturals, with the joker rank
+    alongside so the engine still treats them as wild.
+    Suits are ordered by their rank counts and whether they hold the top discard; suits that tie
+    are interchangeable, so any order between them gives the same position. Returns None for
+    hands the index cannot describe (unknown cards, more than three copies of a card).
+    """
+    joker_rank = parse_rank(card_field(joker_card, 'rank')) if joker_card is not None else None
+    counts = [[0] * 13 for _ in range(4)]
+    wilds = 0
+    try:
+        for card in player_hand:
+            natural = _natural(card)
+            if natural is None:
+                wilds += 1
+                continue
+            counts[natural[0]][natural[1] - 1] += 1
+        top = _natural(open_deck[-1]) if open_deck else None
+    except ValueError:
+        return None
+    if wilds > 15 or any(count > 3 for suit in counts for count in suit):
+        return None
+
+    marked = [tuple(counts[suit]) + (int(top is not None and top[0] == suit),) for suit in range(4)]
+    order = tuple(sorted(range(4), key=lambda suit: marked[suit], reverse=True))
+    value = 0
+    for suit in order:
+        for count in counts[suit]:
+            value = value << 2 | count
+    if not open_deck:
+        discard = 0
+    elif top is None:
+        discard = 1
+    else:
+        discard = 2 + order.index(top[0]) * 13 + top[1] - 1
+    value = (value << 4 | wilds) << 4 | (joker_rank or 0)
+    value = value << 6 | discard
+    return CanonicalPosition(value.to_bytes(KEY_BYTES, 'big'), order)
+
+
+def representative(position: CanonicalPosition) -> Tuple[List[Dict[str, str]], List[Dict[str, str]], Optional[Dict[str, str]]]:
+    """Hand, open deck and joker of the canonical position itself (canonical suit i = SUIT_NAMES[i])"""
+    value = int.from_bytes(position.key, 'big')
+    discard = value & 0x3F
+    joker_rank = value >> 6 & 0xF
+    wilds = value >> 10 & 0xF
+    value >>= 14
+    hand = [{"rank": "Joker", "suit": ""} for _ in range(wilds)]
+    for suit in range(3, -1, -1):
+        for rank in range(13, 0, -1):
+            hand.extend({"rank": RANK_CODES[rank], "suit": SUIT_NAMES[suit]} for _ in range(value & 3))
+            value >>= 2
+    if discard == 0:
+        open_deck = []
+    elif discard == 1:
+        open_deck = [{"rank": "Joker", "suit": ""}]
+    else:
+        open_deck = [{"rank": RANK_CODES[(discard - 2) % 13 + 1], "suit": SUIT_NAMES[(discard - 2) // 13]}]
+    joker = {"rank": RANK_CODES[joker_rank], "suit": SUIT_NAMES[0]} if joker_rank else None
+    return hand, open_deck, joker
+
+
+def encode_suggestion(position: CanonicalPosition) -> bytes:
+    """Engine suggestion for the canonical position, with cards as suit-free tokens ('2:7', 'W')"""
+    hand, open_deck, joker = representative(position)
+    tokens = {}
+    for card in hand + open_deck:
+        natural = _natural(card)
+        tokens[card_label(card)] = WILD if natural is None else f"{natural[0]}:{natural[1]}"
+    result = suggest_move(hand, open_deck, joker)
+    draw = result["draw"]
+    payload = {
+        "d": [draw["source"], tokens[draw["card"]] if draw["card"] else None, draw["reason"]] if draw else None,
+        "x": [tokens[result["discard"]["card"]], result["discard"]["reason"]],
+        "m": [[meld["type"], [tokens[card] for card in meld["cards"]], meld["jokers"]] for meld in result["melds"]],
+        "p": result["deadwood_points"],
+        "s": int(result["has_pure_sequence"])
+    }
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def write_index(path: str, positions: Iterable[CanonicalPosition]):
+    """Write the sorted index for these positions (engine suggestions are computed here)"""
+    unique = {position.key: position for position in positions}
+    records = []
+    blob = bytearray()
+    for key in sorted(unique):
+        payload = encode_suggestion(unique[key])
+        records.append(RECORD.pack(key, len(blob), len(payload)))
+        blob += payload
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        handle.writelines(records)
+        handle.write(blob)
+    os.replace(tmp_path, path)
+
+
+class SuggestionIndex:
+    """
+    Read-only view of an index file through mmap.
+
+    Nothing is parsed at load; every worker mapping the same file shares its pages through the
+    OS page cache. lookup() canonicalizes the position and binary-searches the fixed-size records.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.entries = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} suggestion index")
+        self._blob_start = HEADER.size + self.entries * RECORD.size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["SuggestionIndex"]:
+        """Index at SUGGESTION_INDEX_PATH, or None when unset or unreadable"""
+        path = os.environ.get('SUGGESTION_INDEX_PATH')
+        if not path:
+            return None
+        try:
+            index = cls(path)
+        except (OSError, ValueError) as error:
+            logger.warning(f"⚠️ Suggestion index not loaded: {error}")
+            return None
+        logger.info(f"📚 Suggestion index mapped: {path} ({index.entries} positions)")
+        return index
+
+    def warm(self) -> int:
+        """
+        Page in the record table every lookup binary-searches, so the first requests after a deploy
+        do not take page faults on it; the suggestion blobs stay lazy. Returns the bytes touched.
+        """
+        end = self._blob_start
+        if hasattr(self._map, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            self._map.madvise(mmap.MADV_WILLNEED, 0, end)
+        for offset in range(0, end, mmap.PAGESIZE):
+            self._map[offset]
+        return end
+
+    def _find(self, key: bytes) -> Optional[bytes]:
+        low, high = 0, self.entries
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            probe = self._map[offset:offset + KEY_BYTES]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                _, start, length = RECORD.unpack_from(self._map, offset)
+                start += self._blob_start
+                return self._map[start:start + length]
+        return None
+
+    def lookup(self, player_hand: List[Any], open_deck: Optional[List[Any]], joker_card: Any = None,
+               player_melds: Optional[list] = None) -> Optional[Dict[str, Any]]:
+        """Engine result (same shape as suggest_move) for this position, labelled with the caller's cards"""
+        position = canonical_position(player_hand, open_deck, joker_card)
+        payload = self._find(position.key) if position is not None else None
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self._render(json.loads(payload), position, player_hand, open_deck, joker_card, player_melds)
+
+    def _render(self, payload: Dict[str, Any], position: CanonicalPosition, player_hand: List[Any],
+                open_deck: Optional[List[Any]], joker_card: Any, player_melds: Optional[list]) -> Dict[str, Any]:
+        naturals: Dict[str, str] = {}
+        wild_labels: List[str] = []
+        for card in list(player_hand) + list(open_deck[-1:] if open_deck else []):
+            natural = _natural(card)
+            if natural is None:
+                wild_labels.append(card_label(card))
+            else:
+                naturals[f"{position.suits.index(natural[0])}:{natural[1]}"] = card_label(card)
+
+        def label(token: str, wild_pool: List[str]) -> str:
+            if token == WILD:
+                return wild_pool.pop() if wild_pool else "Joker"
+            return naturals[token]
+
+        draw = payload["d"]
+        meld_wilds = list(wild_labels)
+        return {
+            "draw": {
+                "source": draw[0],
+                "card": label(draw[1], list(wild_labels)) if draw[1] else None,
+                "reason": draw[2]
+            } if draw else None,
+            "discard": {"card": label(payload["x"][0], list(wild_labels)), "reason": payload["x"][1]},
+            "melds": [
+                {"type": kind, "cards": [label(token, meld_wilds) for token in tokens], "jokers": jokers}
+                for kind, tokens, jokers in payload["m"]
+            ],
+            "deadwood_points": payload["p"],
+            "has_pure_sequence": bool(payload["s"]),
+            "melds_on_table": len(player_melds) if player_melds else 0
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "entries": self.entries,
+            "bytes": len(self._map),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def iter_game_states(path: str) -> Iterable[Dict[str, Any]]:
+    """Game states from a JSON Lines file of API GameStates or Lambda request bodies"""
+    with open(path, 'r', encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip():
+                state = json.loads(line)
+                yield {**state, **state.get('gameState', {})}
+
+
+def build_index(output: str, game_states: Iterable[Dict[str, Any]], top: int = 100000) -> Dict[str, int]:
+    """Index the `top` most frequent canonical positions among game_states"""
+    frequency: Counter = Counter()
+    positions: Dict[bytes, CanonicalPosition] = {}
+    seen = 0
+    for state in game_states:
+        seen += 1
+        position = canonical_position(state.get('playerHand') or [], state.get('openDeck'), state.get('jokerCard'))
+        if position is None:
+            continue
+        frequency[position.key] += 1
+        positions.setdefault(position.key, position)
+    chosen = [positions[key] for key, _ in frequency.most_common(top)]
+    write_index(output, chosen)
+    return {"states": seen, "canonical_positions": len(frequency), "indexed": len(chosen)}
+
+
+def synthetic_game_states(count: int, seed: int = 42) -> Iterable[Dict[str, Any]]:
+    """Random mid-game states, for trying the index without exported game logs"""
+    import random
+    from bench_ingest import make_game_payload
+    rng = random.Random(seed)
+    for i in range(count):
+        yield json.loads(make_game_payload(i, rng))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed suggestion index")
+    parser.add_argument("output", help="index file to write, e.g. suggestion_index.bin")
+    parser.add_argument("--games", help="JSON Lines file of game states (API GameState or Lambda body)")
+    parser.add_argument("--top", type=int, default=100000, help="most frequent canonical positions to index")
+    parser.add_argument("--synthetic", type=int, default=0, help="random positions to index when no --games file")
+    args = parser.parse_args()
+    if not args.games and not args.synthetic:
+        parser.error("give --games or --synthetic")
+
+    logging.basicConfig(level=logging.INFO)
+    states = iter_game_states(args.games) if args.games else synthetic_game_states(args.synthetic)
+    summary = build_index(args.output, states, args.top)
+    print(f"📚 Indexed {summary['indexed']} of {summary['canonical_positions']} canonical positions "
+          f"from {summary['states']} game states -> {args.output} ({os.path.getsize(args.output)} bytes)")
@@ -0,0 +1,83 @@
+"""
+Tests for admission control: token buckets and the priority gate in front of agent calls
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from admission import BATCH, INTERACTIVE, PRIORITIES, AdmissionController, PriorityGate, RateLimitedError, TokenBuckets
+from suggest_api_python import app, bedrock_service
+from test_game_moves import game
+
+
+def test_bucket_sheds_past_the_burst_and_refills():
+    buckets = TokenBuckets(rate=2, burst=3)
+    assert [buckets.take("client", now=0) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("client", now=0) == pytest.approx(0.5)
+    assert buckets.take("client", now=0.5) == 0
+    assert buckets.take("other", now=0) == 0
+
+
+def test_least_recently_used_keys_are_dropped():
+    buckets = TokenBuckets(rate=1, burst=1, max_keys=2)
+    buckets.take("a", now=0)
+    buckets.take("b", now=0)
+    buckets.take("c", now=0)
+    assert len(buckets) == 2
+    # "a" was dropped and starts again with a full bucket
+    assert buckets.take("a", now=0) == 0
+
+
+def test_check_rate_reports_the_scope():
+    admission = AdmissionController(client_rate=1, client_burst=1, game_rate=1, game_burst=1)
+    admission.check_rate("client", "game")
+    with pytest.raises(RateLimitedError) as shed:
+        admission.check_rate("client", "other_game")
+    assert shed.value.scope == "client" and shed.value.retry_after_header == "1"
+    with pytest.raises(RateLimitedError) as shed:
+        admission.check_rate("other_client", "game")
+    assert shed.value.scope == "game"
+    assert admission.stats()["shed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_gate_serves_interactive_before_batch():
+    gate = PriorityGate(slots=1, max_queue=4)
+    assert await gate.acquire(PRIORITIES[INTERACTIVE], 1) is None
+    order = []
+
+    async def wait(priority):
+        assert await gate.acquire(PRIORITIES[priority], 1) is None
+        order.append(priority)
+        gate.release()
+
+    waiters = [asyncio.ensure_future(wait(BATCH)), asyncio.ensure_future(wait(INTERACTIVE))]
+    await asyncio.sleep(0)
+    assert gate.waiting == 2
+    gate.release()
+    await asyncio.gather(*waiters)
+    assert order == [INTERACTIVE, BATCH] and gate.holders == 0
+
+
+@pytest.mark.asyncio
+async def test_gate_refuses_when_full_or_after_the_wait():
+    gate = PriorityGate(slots=1, max_queue=1)
+    assert await gate.acquire(0, 1) is None
+    waiter = asyncio.ensure_future(gate.acquire(0, 0.01))
+    await asyncio.sleep(0)
+    assert await gate.acquire(0, 1) == "queue_full"
+    assert await waiter == "wait"
+    assert gate.waiting == 0 and gate.holders == 1
+
+
+def test_unknown_games_spend_no_tokens(monkeypatch):
+    monkeypatch.setattr(bedrock_service, "provider", "engine")
+    monkeypatch.setattr(bedrock_service, "admission", AdmissionController(client_rate=0.001, client_burst=1))
+    client = TestClient(app)
+    assert [client.get("/suggest/admission_missing").status_code for _ in range(2)] == [404, 404]
+    assert client.post("/test/add-game", json=game("admission_game", "4:Hearts 5:Hearts 9:Spades")).status_code == 200
+    assert client.get("/suggest/admission_game").status_code == 200
+    shed = client.get("/suggest/admission_game")
+    assert shed.status_code == 429 and "Retry-After" in shed.headers
@@ -0,0 +1,64 @@
+"""
+Tests for per-game agent sessions and the delta prompts sent on later turns
+"""
+
+from agent_sessions import AgentSessionRegistry
+from prompt_builder import PromptBuilder, position_snapshot
+
+JOKER = {"rank": "Ace", "suit": "Clubs"}
+
+
+def cards(spec):
+    return [{"rank": rank, "suit": suit} for rank, suit in (token.split(':') for token in spec.split())]
+
+
+def snapshot(hand, top="6:Hearts", joker=JOKER, melds=None):
+    return position_snapshot(cards(hand), cards(top), joker, [cards(meld) for meld in melds or []])
+
+
+FIRST = snapshot('7:Hearts 8:Hearts King:Spades 4:Clubs')
+
+
+def test_first_turn_sends_the_full_state_then_deltas():
+    registry = AgentSessionRegistry()
+    plan = registry.plan("game_1", FIRST)
+    assert plan.previous is None and plan.leased
+    registry.commit(plan, FIRST)
+    following = registry.plan("game_1", snapshot('7:Hearts 8:Hearts 6:Hearts 4:Clubs', top="King:Spades"))
+    assert following.previous == FIRST and following.session_id == plan.session_id
+    assert registry.stats()["delta_prompts"] == 1
+
+
+def test_delta_prompt_names_the_draw_discard_and_melds():
+    current = snapshot('4:Clubs 9:Diamonds', top="King:Spades", melds=['6:Hearts 7:Hearts 8:Hearts'])
+    text = PromptBuilder().build_delta(snapshot('6:Hearts 7:Hearts 8:Hearts King:Spades 4:Clubs'), current).text
+    assert "Drew 9D." in text and "Discarded KS." in text and "Melded 6H 7H 8H." in text
+    assert "Top discard: KS." in text
+    assert PromptBuilder().build_delta(FIRST, snapshot('7:Hearts', joker={"rank": "2", "suit": "Clubs"})) is None
+
+
+def test_a_busy_session_is_bypassed():
+    registry = AgentSessionRegistry()
+    leased = registry.plan("game_1", FIRST)
+    concurrent = registry.plan("game_1", FIRST)
+    assert not concurrent.leased and concurrent.session_id != leased.session_id
+    assert registry.stats()["busy_bypass"] == 1
+
+
+def test_a_new_deal_or_a_large_change_resends_the_full_state():
+    registry = AgentSessionRegistry(max_delta_cards=2)
+    plan = registry.plan("game_1", FIRST)
+    registry.commit(plan, FIRST)
+    plan = registry.plan("game_1", snapshot('2:Spades 3:Spades 4:Spades 5:Spades'))
+    assert plan.previous is None
+    registry.commit(plan, FIRST)
+    assert registry.plan("game_1", snapshot('7:Hearts 8:Hearts King:Spades 4:Clubs', joker=cards('2:Clubs')[0])).previous is None
+
+
+def test_a_lost_session_resyncs_in_a_new_one():
+    registry = AgentSessionRegistry()
+    plan = registry.plan("game_1", FIRST)
+    registry.release(plan, lost=True)
+    retry = registry.plan("game_1", FIRST)
+    assert retry.previous is None and retry.session_id != plan.session_id
+    assert registry.stats()["resyncs"] == 1
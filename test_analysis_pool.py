@@ -0,0 +1,76 @@
+"""
+Tests for the analysis process pool: lazy start off the event loop, dispatch, bounds, timeouts and shutdown
+"""
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from analysis_pool import AnalysisPool, AnalysisQueueFullError, AnalysisTimeoutError, pack_state
+
+START_METHOD = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+HAND = [{"id": f"c{i}", "rank": rank, "suit": "Hearts", "value": 1} for i, rank in enumerate(['4', '5', '6', 'King'])]
+STATE = pack_state(HAND, [{"id": "d", "rank": "9", "suit": "Spades", "value": 9}], {"id": "j", "rank": "2", "suit": "Clubs", "value": 2}, [], 40)
+# budget_ms=0 samples exactly max_samples, long enough to outlast a tiny timeout
+SLOW_ODDS = {"budget_ms": 0, "max_samples": 20000, "horizon": 5, "seed": 1}
+
+
+@pytest.fixture
+def pool():
+    pool = AnalysisPool(workers=1, max_queue=0, timeout_seconds=30, start_method=START_METHOD)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_lazy_start_does_not_block_the_event_loop(pool, monkeypatch):
+    start = pool.start
+
+    def slow_start():
+        time.sleep(0.2)
+        start()
+
+    monkeypatch.setattr(pool, "start", slow_start)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.ensure_future(ticker())
+    await pool.run("warm_up")
+    ticking.cancel()
+    assert ticks >= 5 and pool.stats()["running"]
+
+
+@pytest.mark.asyncio
+async def test_engine_job_runs_on_a_worker(pool):
+    result = await pool.run("engine", STATE)
+    assert result["source"] == "rule-engine" and result["analysis"]["discard"]["card"] == "King of Hearts"
+    stats = pool.stats()
+    assert stats["completed"] == 1 and stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_timeouts(pool):
+    pool.start()
+    slow = asyncio.ensure_future(pool.run("draw_odds", STATE, timeout=0.05, **SLOW_ODDS))
+    await asyncio.sleep(0)
+    with pytest.raises(AnalysisQueueFullError):
+        await pool.run("warm_up")
+    with pytest.raises(AnalysisTimeoutError):
+        await slow
+    stats = pool.stats()
+    assert stats["rejected"] == 1 and stats["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shutdown_and_restart(pool):
+    await pool.run("warm_up")
+    pool.shutdown()
+    assert not pool.stats()["running"]
+    assert isinstance(await pool.run("warm_up"), int) and pool.stats()["running"]
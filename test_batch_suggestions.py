@@ -0,0 +1,104 @@
+"""
+Tests for POST /suggest/batch: per-item failures, the size limit and shared agent calls for duplicates
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import suggest_api_python
+from admission import AdmissionController
+from agent_sessions import AgentSessionRegistry
+from fake_bedrock import FakeAgentRuntime
+from resilience import ResilientInvoker
+from suggest_api_python import app, bedrock_service
+from suggestion_cache import SuggestionCache
+from test_game_moves import game
+
+SPEC = "4:Hearts 5:Hearts 9:Spades"
+
+
+def use_fake_agent(monkeypatch, runtime: FakeAgentRuntime) -> FakeAgentRuntime:
+    """Answer agent calls from `runtime`, with a fresh cache, sessions, invoker and admission"""
+    monkeypatch.setattr(bedrock_service, "provider", "bedrock")
+    monkeypatch.setattr(bedrock_service, "started", True)
+    monkeypatch.setattr(bedrock_service, "is_demo", False)
+    monkeypatch.setattr(bedrock_service, "client", runtime, raising=False)
+    monkeypatch.setattr(bedrock_service, "agent_id", "AGENT", raising=False)
+    monkeypatch.setattr(bedrock_service, "agent_alias_id", "ALIAS", raising=False)
+    monkeypatch.setattr(bedrock_service, "sessions", AgentSessionRegistry.from_env())
+    monkeypatch.setattr(bedrock_service, "invoker", ResilientInvoker.from_env(bedrock_service.executor))
+    monkeypatch.setattr(bedrock_service, "admission", AdmissionController.from_env())
+    monkeypatch.setattr(suggest_api_python, "suggestion_cache", SuggestionCache())
+    return runtime
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(bedrock_service, "provider", "engine")
+    return TestClient(app)
+
+
+def add(client, game_id, spec=SPEC):
+    assert client.post("/test/add-game", json=game(game_id, spec)).status_code == 200
+
+
+def test_one_missing_game_fails_only_its_item(client):
+    add(client, "batch_ok")
+    items = ["batch_ok", "batch_missing", game("batch_inline", "7:Spades 8:Spades King:Hearts")]
+    response = client.post("/suggest/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is False and body["unique_positions"] == 2
+    ok, missing, inline = body["results"]
+    assert (missing["index"], missing["gameId"], missing["success"]) == (1, "batch_missing", False)
+    assert missing["error"] == "Game not found" and missing["suggestion"] is None
+    for result, game_id in ((ok, "batch_ok"), (inline, "batch_inline")):
+        assert result["success"] and result["gameId"] == game_id and result["error"] is None
+        assert result["source"] == "rule-engine" and result["suggestion"]
+
+
+def test_batch_size_limit(client, monkeypatch):
+    monkeypatch.setattr(suggest_api_python, "BATCH_MAX_ITEMS", 2)
+    add(client, "batch_limit")
+    response = client.post("/suggest/batch", json={"items": ["batch_limit"] * 3})
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "Batch exceeds 2 items"
+    assert client.post("/suggest/batch", json={"items": ["batch_limit"] * 2}).status_code == 200
+
+
+def test_duplicates_share_one_agent_call(client, monkeypatch):
+    runtime = use_fake_agent(monkeypatch, FakeAgentRuntime(first_chunk_ms=20, first_chunk_sigma=0, response_chars=60))
+    # Two stored games and an inline state in the same position
+    add(client, "batch_dup_1")
+    add(client, "batch_dup_2")
+    items = ["batch_dup_1", "batch_dup_2", game("batch_dup_3", SPEC), "batch_dup_1"]
+    body = client.post("/suggest/batch", json={"items": items}).json()
+    assert body["success"] and body["unique_positions"] == 1
+    assert [result["deduplicated"] for result in body["results"]] == [False, True, True, True]
+    assert {result["suggestion"] for result in body["results"]} == {body["results"][0]["suggestion"]}
+    assert body["results"][0]["source"] == "bedrock-agent"
+    assert runtime.invocations == 1
+
+    # The next batch with that position is answered from the suggestion cache
+    again = client.post("/suggest/batch", json={"items": ["batch_dup_2"]}).json()
+    assert again["results"][0]["cached"] is True
+    assert runtime.invocations == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_join_the_call_in_flight(monkeypatch):
+    runtime = FakeAgentRuntime(first_chunk_ms=200, first_chunk_sigma=0, response_chars=60)
+    async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+        assert (await client.post("/test/add-game", json=game("batch_flight", SPEC))).status_code == 200
+        use_fake_agent(monkeypatch, runtime)
+        coalesced = bedrock_service.single_flight.stats()["coalesced"]
+        responses = await asyncio.gather(*(
+            client.post("/suggest/batch", json={"items": ["batch_flight"]}) for _ in range(3)
+        ))
+    results = [response.json()["results"][0] for response in responses]
+    assert all(result["success"] and result["source"] == "bedrock-agent" for result in results)
+    assert runtime.invocations == 1
+    assert bedrock_service.single_flight.stats()["coalesced"] == coalesced + 2
@@ -0,0 +1,110 @@
+"""
+Tests for the hand encoding, its conversions and the vectorized meld / deadwood / discard scoring
+"""
+
+import random
+
+import numpy as np
+
+from card_encoding import (NO_CARD, PRINTED_JOKER, RANK_NAMES, SUIT_NAMES, card_code, counts_to_mask, decode_game_state,
+                           decode_hand, deadwood_points, encode_game_state, encode_hand, mask_to_counts, melded_counts,
+                           printed_jokers, score_discards, score_hand)
+from suggest_api_python import GameState
+
+
+def counts(spec):
+    """'5:Hearts 6:Hearts' -> 4x13 natural count matrix"""
+    matrix = np.zeros((4, 13), dtype=np.int16)
+    for token in spec.split():
+        code = card_code(dict(zip(("rank", "suit"), token.split(':'))))
+        matrix[divmod(code, 13)] += 1
+    return matrix
+
+
+def test_card_codes():
+    assert card_code({"rank": "Ace", "suit": "Hearts"}) == 0
+    assert card_code({"rank": "K", "suit": "♠"}) == 51
+    assert card_code({"rank": "Joker", "suit": ""}) == PRINTED_JOKER
+    for code in range(52):
+        suit, rank = divmod(code, 13)
+        assert card_code({"rank": RANK_NAMES[rank], "suit": SUIT_NAMES[suit]}) == code
+
+
+def test_runs_wrap_ace_above_king_and_sets_need_three_suits():
+    melded = melded_counts(counts('Queen:Spades King:Spades Ace:Spades 9:Hearts 9:Clubs 4:Diamonds 4:Clubs'))
+    assert melded.sum() == 3
+    melded = melded_counts(counts('9:Hearts 9:Clubs 9:Spades 9:Spades'))
+    # The second 9 of Spades is not needed by the set
+    assert melded.sum() == 3
+
+
+def test_deadwood_points_broadcasts_over_hands():
+    hands = np.stack([counts('4:Hearts 5:Hearts 6:Hearts King:Clubs'), counts('4:Hearts 6:Hearts King:Clubs')])
+    assert deadwood_points(hands).tolist() == [10, 20]
+    # A joker completes the 4-6 pair, the most valuable near-meld
+    assert deadwood_points(hands, np.array([0, 1])).tolist() == [10, 10]
+
+
+def cards(spec):
+    return [{"rank": rank, "suit": suit} for rank, suit in (token.split(':') for token in spec.split())]
+
+
+def random_hand(rng, size=14):
+    deck = [{"rank": rank, "suit": suit} for rank in RANK_NAMES for suit in SUIT_NAMES] * 2
+    deck += [{"rank": "Joker", "suit": "Joker"}] * 2
+    return rng.sample(deck, size)
+
+
+def scores_best(scores):
+    suit, rank = divmod(int(scores.codes[scores.best]), 13)
+    return f"{RANK_NAMES[rank]} of {SUIT_NAMES[suit]}"
+
+
+def test_hands_round_trip_through_the_mask_and_counts():
+    rng = random.Random(5)
+    for _ in range(200):
+        hand = random_hand(rng)
+        mask = encode_hand(hand)
+        assert sorted(map(card_code, decode_hand(mask))) == sorted(map(card_code, hand))
+        assert counts_to_mask(mask_to_counts(mask), printed_jokers(mask)) == mask
+        assert mask_to_counts(mask).sum() + printed_jokers(mask) == len(hand)
+
+
+def test_game_state_round_trip():
+    state = {
+        "gameId": "game_1", "closedDeckCount": 40, "currentPlayer": "player", "gameStatus": "in_progress",
+        "playerHand": cards('7:Hearts 7:Hearts King:Spades Joker:Joker'),
+        "openDeck": cards('2:Clubs 6:Hearts'),
+        "jokerCard": {"rank": "Ace", "suit": "Clubs"},
+        "playerMelds": [cards('9:Spades 9:Clubs 9:Diamonds')]
+    }
+    encoded = encode_game_state(state)
+    assert encoded.joker_rank == 1 and encoded.meld_count == 1 and encoded.top_discard == card_code(state["openDeck"][-1])
+    model = GameState.model_validate(decode_game_state(encoded, "game_1"))
+    assert encode_game_state(model) == encoded
+    assert encode_game_state({**state, "openDeck": []}).top_discard == NO_CARD
+
+
+def test_discard_scores_match_one_deadwood_call_per_candidate():
+    rng = random.Random(9)
+    for _ in range(100):
+        hand = random_hand(rng)
+        joker = rng.choice(RANK_NAMES)
+        scores = score_hand(hand, {"rank": joker, "suit": "Clubs"})
+        mask = encode_hand(hand)
+        counts = mask_to_counts(mask).astype(np.int16)
+        wild = RANK_NAMES.index(joker)
+        jokers = printed_jokers(mask) + int(counts[:, wild].sum())
+        counts[:, wild] = 0
+        for code, deadwood in zip(scores.codes, scores.deadwood):
+            variant = counts.copy()
+            variant[divmod(int(code), 13)] -= 1
+            assert deadwood == deadwood_points(variant, jokers)
+        assert scores.deadwood[scores.best] == scores.deadwood.min()
+
+
+def test_discard_scoring_keeps_the_taken_card():
+    hand = cards('4:Hearts 5:Hearts 6:Hearts 9:Spades 9:Clubs King:Clubs')
+    assert scores_best(score_hand(hand)) == 'King of Clubs'
+    assert scores_best(score_hand(hand, keep={"rank": "King", "suit": "Clubs"})) != 'King of Clubs'
+    assert score_discards(np.zeros((4, 13)), 2).best == NO_CARD
@@ -0,0 +1,143 @@
+"""
+Tests for card_tracker: seen/discarded counts, outs, discard risk, opponent inference and the per-game registry
+"""
+
+from fastapi.testclient import TestClient
+
+from card_encoding import PRINTED_JOKER, card_code
+from card_tracker import CardTracker, CardTrackerRegistry
+from suggest_api_python import app, bedrock_service
+from test_game_moves import cards, game
+
+JOKER = {"rank": "2", "suit": "Clubs"}
+
+
+def card(spec):
+    return cards(spec)[0]
+
+
+def tracker_from(hand, open_deck='6:Hearts', melds=()):
+    return CardTracker.from_state(cards(hand), cards(open_deck), JOKER, [cards(meld) for meld in melds])
+
+
+def test_seen_and_discarded_counts():
+    tracker = tracker_from('4:Hearts 5:Hearts 9:Spades', melds=['7:Clubs 8:Clubs 9:Clubs'])
+    four, six, nine = card_code(card('4:Hearts')), card_code(card('6:Hearts')), card_code(card('9:Spades'))
+    assert tracker.seen[four] == 1 and tracker.live(four) == 1
+    assert tracker.seen[six] == 1 and tracker.discarded[six] == 1
+    assert tracker.seen[card_code(card('9:Clubs'))] == 1
+    assert tracker.seen[card_code(JOKER)] == 1
+    assert tracker.live(PRINTED_JOKER) == 2
+
+    # The second 4 of Hearts comes off the closed deck: both copies are now accounted for
+    tracker.player_drew(card('4:Hearts'))
+    assert tracker.seen[four] == 2 and tracker.is_dead(card('4:Hearts'))
+    # Throwing a card the player already held adds a discard but nothing newly seen
+    tracker.player_discarded(card('9:Spades'))
+    assert tracker.seen[nine] == 1 and tracker.discarded[nine] == 1
+    tracker.opponent_discarded_card(card('9:Spades'))
+    assert tracker.seen[nine] == 2 and tracker.discarded[nine] == 2 and tracker.opponent_discarded[nine] == 1
+    assert tracker.is_dead(card('9:Spades'))
+    tracker.opponent_drew_closed()
+    assert tracker.moves == 4 and tracker.opponent_closed_draws == 1
+
+
+def test_outs_for_near_melds():
+    tracker = tracker_from('4:Hearts 5:Hearts 9:Spades 9:Clubs King:Spades')
+    # Both ends: two unseen 3s of Hearts, one 6 of Hearts left after the open deck
+    assert tracker.outs(card('4:Hearts'), card('5:Hearts')) == 3
+    # The middle of a one-gap pair: one 5 of Hearts is in the hand
+    assert tracker.outs(card('4:Hearts'), card('6:Hearts')) == 1
+    # The other two suits of a pair's rank
+    assert tracker.outs(card('9:Spades'), card('9:Clubs')) == 4
+    # King-Ace runs down to the Queen only
+    assert tracker.outs(card('King:Spades'), card('Ace:Spades')) == 2
+    # A needed card of the joker rank is counted by wild_outs, not here
+    assert tracker.outs(card('Ace:Hearts'), card('3:Hearts')) == 0
+    assert tracker.outs(card('4:Hearts'), card('9:Spades')) == 0
+    assert tracker.outs(card('2:Hearts'), card('3:Hearts')) == 0
+    # Two printed jokers plus seven unseen 2s (the joker card itself is seen)
+    assert tracker.wild_outs() == 9
+
+    tracker.player_drew(card('3:Hearts'))
+    tracker.opponent_discarded_card(card('3:Hearts'))
+    assert tracker.outs(card('4:Hearts'), card('5:Hearts')) == 1
+
+
+def test_opponent_picks_raise_discard_risk():
+    tracker = tracker_from('7:Spades 6:Hearts King:Diamonds')
+    assert tracker.discard_risk(card('7:Spades')) == 0 and tracker.is_safe_discard(card('7:Spades'))
+
+    tracker.opponent_picked_open(card('6:Spades'))
+    tracker.opponent_picked_open(card('8:Spades'))
+    # Spade interest 4, plus 3 for each picked neighbour
+    assert tracker.discard_risk(card('7:Spades')) == 10
+    assert not tracker.is_safe_discard(card('7:Spades'))
+    # Same rank as a pick: rank interest 2 plus 3 for the picked 6 of Spades
+    assert tracker.discard_risk(card('6:Hearts')) == 5
+    assert tracker.is_safe_discard(card('King:Diamonds'))
+    # Wild cards are never safe
+    assert tracker.discard_risk(card('2:Hearts')) == 100
+    assert tracker.discard_risk({"rank": "Joker", "suit": "Joker"}) == 100
+
+    # A rank the opponent threw away is safer than before
+    tracker.opponent_discarded_card(card('King:Spades'))
+    assert tracker.discard_risk(card('King:Diamonds')) == -4
+
+
+def test_collecting_and_hint():
+    tracker = tracker_from('7:Spades')
+    assert tracker.hint() is None
+    assert tracker.collecting() == {"suits": [], "ranks": []}
+
+    tracker.opponent_picked_open(card('6:Spades'))
+    tracker.opponent_picked_open(card('8:Spades'))
+    tracker.opponent_discarded_card(card('King:Spades'))
+    assert tracker.collecting() == {"suits": ["Spades"], "ranks": ["6", "8"]}
+    assert tracker.hint() == "Opponent picked: 6S 8S; likely collecting S 6 8"
+    assert tracker.summary() == {
+        "moves": 3,
+        "opponent_picks": 2,
+        "opponent_discards": 1,
+        "opponent_closed_draws": 0,
+        "collecting": {"suits": ["Spades"], "ranks": ["6", "8"]}
+    }
+
+    # A printed joker adds no interest: the hint names the pick without a guess
+    joker_pick = tracker_from('7:Spades')
+    joker_pick.opponent_picked_open({"rank": "Joker", "suit": "Joker"})
+    assert joker_pick.hint() == "Opponent picked: JK"
+
+
+def test_registry_builds_once_and_evicts_least_recent():
+    registry = CardTrackerRegistry(max_games=2)
+    assert registry.peek("a") is None and registry.peek(None) is None
+    first = registry.get("a", game("a", '4:Hearts 5:Hearts'))
+    assert first.seen[card_code(card('4:Hearts'))] == 1
+    assert registry.get("a", game("a", '9:Spades')) is first and registry.built == 1
+
+    registry.get("b", game("b", '9:Spades'))
+    # Touching "a" makes "b" the least recently used
+    assert registry.peek("a") is first
+    registry.get("c", game("c", '9:Spades'))
+    assert registry.peek("b") is None and registry.peek("a") is first
+    assert registry.stats() == {"games": 2, "max_games": 2, "built_from_state": 3}
+
+    registry.discard("a")
+    assert registry.peek("a") is None
+
+    uncached = CardTrackerRegistry(max_games=0)
+    uncached.get("a", game("a", '9:Spades'))
+    assert uncached.peek("a") is None and uncached.stats()["games"] == 0
+
+
+def test_moves_feed_the_game_tracker(monkeypatch):
+    monkeypatch.setattr(bedrock_service, "card_trackers", CardTrackerRegistry())
+    client = TestClient(app)
+    assert client.post("/test/add-game", json=game("tracked", "5:Hearts 7:Hearts 9:Spades")).status_code == 200
+    assert client.post("/games/tracked/moves", json={"type": "opponent_draw_open"}).status_code == 200
+    tracker = bedrock_service.card_trackers.peek("tracked")
+    assert tracker.summary()["opponent_picks"] == 1
+    # The opponent took the 6 of Hearts: the cards around it are no longer safe
+    assert not tracker.is_safe_discard(card('5:Hearts')) and not tracker.is_safe_discard(card('7:Hearts'))
+    assert tracker.is_safe_discard(card('9:Spades'))
@@ -0,0 +1,65 @@
+"""
+Tests for the Monte Carlo draw simulator
+"""
+
+import numpy as np
+
+from draw_simulator import (CODES, DECKS, PRINTED_JOKERS, expected_run_seconds, has_pure_sequence, hand_counts,
+                            score_hands, simulate_draw, unseen_pool)
+
+
+def cards(spec):
+    return [{"rank": rank, "suit": suit} for rank, suit in (token.split(':') for token in spec.split())]
+
+
+HAND = cards('4:Hearts 5:Hearts 9:Spades 9:Clubs 2:Diamonds King:Clubs Queen:Diamonds '
+             '7:Spades 3:Clubs Jack:Hearts 10:Diamonds 8:Clubs Ace:Diamonds')
+JOKER = {"rank": "2", "suit": "Spades"}
+
+
+def test_unseen_pool_leaves_out_every_visible_card():
+    open_deck = cards('6:Hearts')
+    pool = unseen_pool(HAND, open_deck, JOKER)
+    assert pool.size == (CODES - 1) * DECKS + PRINTED_JOKERS - len(HAND) - len(open_deck) - 1
+    assert np.all(np.bincount(pool, minlength=CODES) + hand_counts(HAND + open_deck + [JOKER]) <= DECKS)
+
+
+def test_pure_sequence_wraps_ace_above_king():
+    assert has_pure_sequence(hand_counts(cards('Queen:Spades King:Spades Ace:Spades'))[:52].reshape(4, 13))
+    assert not has_pure_sequence(hand_counts(cards('King:Spades Ace:Spades 2:Spades'))[:52].reshape(4, 13))
+
+
+def test_joker_rank_card_completes_a_pure_sequence_as_itself():
+    hand = hand_counts(cards('5:Hearts 6:Hearts 7:Hearts 9:Clubs King:Diamonds'))
+    deadwood, pure, points = score_hands(hand, joker_rank=6)
+    assert bool(pure) and int(points) == int(deadwood) == 19
+    # As a wild only, 6 of Clubs leaves 5 and 7 of Hearts without a pure sequence
+    _, pure, points = score_hands(hand_counts(cards('5:Hearts 6:Clubs 7:Hearts 9:Clubs King:Diamonds')), joker_rank=6)
+    assert not bool(pure) and int(points) == 31
+
+
+def test_seeded_runs_without_budget_are_reproducible():
+    options = {"budget_ms": 0, "max_samples": 1000, "seed": 3}
+    first = simulate_draw(HAND, cards('6:Hearts'), JOKER, 40, **options)
+    second = simulate_draw(HAND, cards('6:Hearts'), JOKER, 40, **options)
+    assert first["samples"] == 1000
+    assert first["options"] == second["options"] and first["advantage"] == second["advantage"]
+
+
+def test_a_discard_that_completes_a_pure_sequence_is_taken():
+    result = simulate_draw(HAND, cards('6:Hearts'), JOKER, 40, budget_ms=0, max_samples=1000, seed=3)
+    assert result["recommendation"] == "open"
+    assert result["options"]["open"]["pure_sequence_probability"] == 1.0
+    # The throw after taking it is scored once over all candidates and never the taken card
+    assert result["options"]["open"]["discard"] in ('Jack of Hearts', 'King of Clubs')
+    assert result["advantage"]["points"] > 2 * result["advantage"]["stderr"]
+
+
+def test_no_draw_to_decide():
+    assert simulate_draw(HAND + cards('6:Hearts'), [], JOKER, 40) is None
+    assert simulate_draw(HAND, cards('6:Hearts'), JOKER, 0) is None
+
+
+def test_expected_run_seconds():
+    assert expected_run_seconds(5, 100000, 3) == 0.005
+    assert expected_run_seconds(0, 1000, 2) > expected_run_seconds(0, 1000, 1) > 0
@@ -0,0 +1,69 @@
+"""
+Tests for the fake bedrock-agent-runtime client: response shape, chunking, timing knobs and injected errors
+"""
+
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from fake_bedrock import SUGGESTION_TEXT, FakeAgentRuntime
+
+
+def invoke(runtime):
+    return runtime.invoke_agent(agentId="AGENT", agentAliasId="ALIAS", sessionId="session-1", inputText="Hand: 4H 5H")
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("FAKE_BEDROCK_FIRST_CHUNK_MS", "30")
+    monkeypatch.setenv("FAKE_BEDROCK_FIRST_CHUNK_SIGMA", "0")
+    monkeypatch.setenv("FAKE_BEDROCK_CHUNK_INTERVAL_MS", "10")
+    monkeypatch.setenv("FAKE_BEDROCK_RESPONSE_CHARS", "250")
+    monkeypatch.setenv("FAKE_BEDROCK_CHUNK_CHARS", "50")
+    runtime = FakeAgentRuntime.from_env()
+    assert (runtime.first_chunk_ms, runtime.first_chunk_sigma, runtime.chunk_interval_ms) == (30.0, 0.0, 10.0)
+    assert (runtime.response_chars, runtime.chunk_chars) == (250, 50)
+    assert (runtime.throttle_rate, runtime.error_rate) == (0.0, 0.0)
+
+
+def test_completion_is_a_botocore_shaped_event_stream():
+    runtime = FakeAgentRuntime(first_chunk_ms=30, first_chunk_sigma=0, chunk_interval_ms=10,
+                               response_chars=250, chunk_chars=60)
+    started = time.perf_counter()
+    response = invoke(runtime)
+    assert response["contentType"] == "text/plain" and response["sessionId"] == "session-1"
+    # Like the real client, nothing is waited for until the stream is read
+    assert time.perf_counter() - started < 0.03
+
+    arrivals, texts = [], []
+    for event in response["completion"]:
+        arrivals.append(time.perf_counter() - started)
+        assert list(event) == ["chunk"] and list(event["chunk"]) == ["bytes"]
+        assert isinstance(event["chunk"]["bytes"], bytes)
+        texts.append(event["chunk"]["bytes"].decode("utf-8"))
+
+    # 250 characters in chunks of 60: four full chunks and a 10-character tail
+    assert [len(text) for text in texts] == [60, 60, 60, 60, 10]
+    assert "".join(texts) == (SUGGESTION_TEXT * 2)[:250]
+    assert arrivals[0] >= 0.03
+    assert all(later - earlier >= 0.01 for earlier, later in zip(arrivals, arrivals[1:]))
+    assert runtime.invocations == 1
+
+
+def test_injected_errors_are_client_errors():
+    throttled = FakeAgentRuntime(first_chunk_ms=1, first_chunk_sigma=0, throttle_rate=1.0)
+    with pytest.raises(ClientError) as error:
+        invoke(throttled)
+    assert error.value.response["Error"]["Code"] == "ThrottlingException"
+    assert error.value.operation_name == "InvokeAgent"
+
+    failing = FakeAgentRuntime(first_chunk_ms=1, first_chunk_sigma=0, error_rate=1.0)
+    with pytest.raises(ClientError) as error:
+        invoke(failing)
+    assert error.value.response["Error"]["Code"] == "InternalServerException"
+    assert failing.invocations == 1
+
+
+def test_seeded_latency_is_repeatable():
+    first, second = FakeAgentRuntime(seed=7), FakeAgentRuntime(seed=7)
+    assert [first._draw() for _ in range(5)] == [second._draw() for _ in range(5)]
@@ -0,0 +1,43 @@
+"""
+Tests for fast-path GameState ingestion: same states and errors as the precompiled validator
+"""
+
+import json
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from bench_ingest import make_game_payload
+from fast_ingest import CompactGameState, game_state_validator
+
+
+def payload(**changes):
+    state = json.loads(make_game_payload(0, random.Random(1)))
+    state.update(changes)
+    return state
+
+
+def test_exact_payloads_match_the_validator():
+    raw = json.dumps(payload()).encode()
+    assert CompactGameState.model_validate_json(raw).to_dict() == CompactGameState(game_state_validator.validate_json(raw)).to_dict()
+
+
+def test_coercible_payloads_go_through_the_validator():
+    state = payload(closedDeckCount=40.0, playerMelds=[[{"id": "7_h", "rank": "7", "suit": "hearts", "value": "7"}]])
+    state["playerHand"][0]["value"] = True
+    built = CompactGameState.model_validate_json(json.dumps(state))
+    assert built.closedDeckCount == 40 and type(built.closedDeckCount) is int
+    assert built.playerMelds[0][0].value == 7 and built.playerHand[0].value == 1
+
+
+@pytest.mark.parametrize("raw", [
+    b'{"gameId": "g"',
+    json.dumps(payload(playerMelds=None)),
+    json.dumps(payload(jokerCard={"id": "x", "rank": "7"})),
+    json.dumps(payload(playerHand=[["not", "a", "card"]])),
+    json.dumps([1, 2, 3])
+])
+def test_invalid_payloads_raise_validation_errors(raw):
+    with pytest.raises(ValidationError):
+        CompactGameState.model_validate_json(raw)
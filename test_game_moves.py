@@ -0,0 +1,88 @@
+"""
+Tests for POST /games/{game_id}/moves: turn checks, meld validation and the stored game
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from rummy_engine import PURE_SEQUENCE, SEQUENCE, SET, meld_kind
+from suggest_api_python import app, game_store
+
+RANKS = ['Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King']
+
+
+def cards(spec):
+    return [{"rank": rank, "suit": suit} for rank, suit in (token.split(':') for token in spec.split())]
+
+
+def game(game_id, spec):
+    hand = [{"id": f"card_{i}", "value": RANKS.index(card["rank"]) + 1, **card} for i, card in enumerate(cards(spec))]
+    return {
+        "gameId": game_id,
+        "playerHand": hand,
+        "openDeck": [{"id": "discard_1", "rank": "6", "suit": "Hearts", "value": 6}],
+        "closedDeckCount": 40,
+        "jokerCard": {"id": "joker_1", "rank": "2", "suit": "Clubs", "value": 2},
+        "currentPlayer": "player",
+        "gameStatus": "in_progress",
+        "playerMelds": []
+    }
+
+
+HAND = ('4:Hearts 5:Hearts 7:Hearts 9:Spades 9:Clubs 9:Diamonds King:Clubs '
+        'Queen:Diamonds 3:Spades Jack:Hearts 10:Diamonds 8:Clubs Ace:Diamonds')
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def add(client, game_id, spec=HAND):
+    assert client.post("/test/add-game", json=game(game_id, spec)).status_code == 200
+
+
+def test_meld_kind():
+    joker = {"rank": "6", "suit": "Clubs"}
+    assert meld_kind(cards('5:Hearts 6:Hearts 7:Hearts'), joker) == PURE_SEQUENCE
+    assert meld_kind(cards('Queen:Spades King:Spades Ace:Spades')) == PURE_SEQUENCE
+    assert meld_kind(cards('5:Hearts 6:Spades 7:Hearts'), joker) == SEQUENCE
+    assert meld_kind(cards('5:Hearts Joker: 8:Hearts'), joker) is None
+    assert meld_kind(cards('9:Hearts 9:Spades Joker:'), joker) == SET
+    assert meld_kind(cards('9:Hearts 9:Hearts 9:Clubs'), joker) is None
+    assert meld_kind(cards('King:Spades Ace:Spades 2:Spades')) is None
+    assert meld_kind(cards('2:Hearts 3:Hearts')) is None
+
+
+def test_draw_then_discard(client):
+    add(client, "moves_turns")
+    response = client.post("/games/moves_turns/moves", json={"type": "draw_open"})
+    assert response.status_code == 200 and response.json()["handSize"] == 14
+    assert client.post("/games/moves_turns/moves", json={"type": "draw_open"}).status_code == 409
+    assert client.post("/games/moves_turns/moves", json={"type": "opponent_draw_closed"}).status_code == 409
+    response = client.post("/games/moves_turns/moves", json={"type": "discard", "cardId": "card_6"})
+    assert response.status_code == 200 and response.json()["handSize"] == 13
+    assert client.post("/games/moves_turns/moves", json={"type": "discard", "cardId": "card_5"}).status_code == 409
+
+
+def test_meld_must_be_valid(client):
+    add(client, "moves_melds")
+    bad = client.post("/games/moves_melds/moves", json={"type": "meld", "cardIds": ["card_0", "card_1", "card_3"]})
+    assert bad.status_code == 400
+    assert len(game_store.get("moves_melds").playerMelds) == 0
+    good = client.post("/games/moves_melds/moves", json={"type": "meld", "cardIds": ["card_3", "card_4", "card_5"]})
+    assert good.status_code == 200 and good.json()["handSize"] == 10
+    # Melded cards still count as held: the player has not drawn yet
+    assert client.post("/games/moves_melds/moves", json={"type": "discard", "cardId": "card_0"}).status_code == 409
+
+
+def test_rejected_move_leaves_the_stored_game_alone(client):
+    add(client, "moves_copy")
+    before = game_store.get("moves_copy")
+    hand, open_deck = list(before.playerHand), list(before.openDeck)
+    assert client.post("/games/moves_copy/moves", json={"type": "draw_open"}).status_code == 200
+    # The object read earlier is not the one the move changed
+    assert before.playerHand == hand and before.openDeck == open_deck
+    assert len(game_store.get("moves_copy").playerHand) == 14
+    assert client.post("/games/moves_copy/moves", json={"type": "discard", "cardId": "nope"}).status_code == 400
+    assert len(game_store.get("moves_copy").playerHand) == 14
@@ -0,0 +1,82 @@
+"""
+Tests for the game stores: LRU and TTL eviction, and the SQLite store's round trip off the event loop
+"""
+
+import threading
+import time
+
+import pytest
+
+from fast_ingest import CompactGameState
+from game_store import MemoryGameStore, SQLiteGameStore
+
+
+def state(game_id, status="in_progress"):
+    return CompactGameState({
+        "gameId": game_id,
+        "playerHand": [{"id": "card_1", "rank": "7", "suit": "Hearts", "value": 7}],
+        "openDeck": [{"id": "discard_1", "rank": "6", "suit": "Hearts", "value": 6}],
+        "closedDeckCount": 40,
+        "jokerCard": {"id": "joker_1", "rank": "Ace", "suit": "Clubs", "value": 1},
+        "currentPlayer": "player",
+        "gameStatus": status,
+        "playerMelds": [[{"id": "card_2", "rank": "9", "suit": "Spades", "value": 9}]]
+    })
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    store = SQLiteGameStore(CompactGameState, path=str(tmp_path / "games.db"), finished_ttl_seconds=60)
+    yield store
+    store.close()
+
+
+def test_memory_store_drops_the_least_recently_used():
+    store = MemoryGameStore(CompactGameState, max_games=2)
+    store.put(state("a"))
+    store.put(state("b"))
+    assert store.get("a") is not None
+    store.put(state("c"))
+    assert "a" in store and "b" not in store and "c" in store
+    assert store.evictions == 1
+
+
+def test_finished_games_expire_first(sqlite_store):
+    sqlite_store.put(state("done", status="completed"))
+    sqlite_store.put(state("live"))
+    assert sqlite_store.is_expired("completed", time.time() - 61, time.time())
+    assert not sqlite_store.is_expired("in_progress", time.time() - 61, time.time())
+    sqlite_store.finished_ttl_seconds = -1
+    assert sqlite_store.get("done") is None and sqlite_store.get("live") is not None
+    assert sqlite_store.evictions == 1
+
+
+def test_sqlite_round_trip(sqlite_store):
+    sqlite_store.put(state("game_1"))
+    loaded = sqlite_store.get("game_1")
+    assert loaded.to_dict() == state("game_1").to_dict()
+    sqlite_store.delete("game_1")
+    assert sqlite_store.get("game_1") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_async_calls_run_on_the_store_thread(sqlite_store, monkeypatch):
+    threads = []
+    get = sqlite_store.get
+
+    def recording_get(game_id):
+        threads.append(threading.current_thread().name)
+        return get(game_id)
+
+    monkeypatch.setattr(sqlite_store, "get", recording_get)
+    await sqlite_store.put_async(state("game_2"))
+    loaded = await sqlite_store.get_async("game_2")
+    assert loaded.gameId == "game_2" and threads[0].startswith("game-store")
+    assert (await sqlite_store.stats_async())["games"] == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_async_calls_run_inline():
+    store = MemoryGameStore(CompactGameState)
+    await store.put_async(state("game_3"))
+    assert store.executor is None and (await store.get_async("game_3")).gameId == "game_3"
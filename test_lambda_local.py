@@ -2,6 +2,12 @@ import json
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+import pytest
+
+import lambda_suggest
+from fake_bedrock import FakeAgentRuntime
+from suggestion_cache import SuggestionCache
+
 def format_hand_for_ai(hand: list) -> str:
     """Format hand cards for AI analysis"""
     if not hand or not isinstance(hand, list):
@@ -199,6 +205,107 @@ Based on your hand: {format_hand_for_ai(player_hand)}
             })
         }
 
+STREAM_EVENT = {
+    'body': json.dumps({
+        'gameId': 'stream_game',
+        'playerHand': [
+            {'rank': '4', 'suit': 'Hearts'},
+            {'rank': '5', 'suit': 'Hearts'},
+            {'rank': '9', 'suit': 'Spades'}
+        ],
+        'openDeck': [{'rank': '6', 'suit': 'Hearts'}],
+        'gameState': {
+            'jokerCard': {'rank': '2', 'suit': 'Clubs'},
+            'playerMelds': [],
+            'closedDeckCount': 40
+        }
+    })
+}
+
+
+class FailingMidStreamRuntime(FakeAgentRuntime):
+    """Sends the first chunk, then the connection drops"""
+
+    def _completion(self, first_chunk_delay):
+        for event in super()._completion(first_chunk_delay):
+            yield event
+            raise ConnectionError("stream reset (fake)")
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Install a Bedrock service with the given fake runtime as the container's service"""
+    monkeypatch.setenv('BEDROCK_RUNTIME', 'fake')
+    monkeypatch.setattr(lambda_suggest, 'SUGGESTION_PROVIDER', 'bedrock')
+    monkeypatch.setattr(lambda_suggest, 'BEDROCK_FALLBACK_PROVIDER', 'engine')
+    monkeypatch.setattr(lambda_suggest, 'suggestion_cache', SuggestionCache())
+
+    def install(runtime):
+        service = lambda_suggest.BedrockAgentService()
+        service.client = runtime
+        monkeypatch.setattr(lambda_suggest, '_bedrock_service', service)
+        return runtime
+    return install
+
+
+def stream(event=STREAM_EVENT):
+    """Prelude and the (event, data) pairs of one streamed response"""
+    prelude, body = lambda_suggest.read_streamed_response(lambda_suggest.lambda_stream_handler(event, None))
+    text = body.decode('utf-8')
+    assert text.endswith('\n\n')
+    events = []
+    for message in text[:-2].split('\n\n'):
+        event_line, data_line = message.split('\n')
+        assert event_line.startswith('event: ') and data_line.startswith('data: ')
+        events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return prelude, events
+
+
+def test_stream_sends_chunks_then_done(agent):
+    runtime = agent(FakeAgentRuntime(first_chunk_ms=1, first_chunk_sigma=0, chunk_interval_ms=1,
+                                     response_chars=100, chunk_chars=30))
+    prelude, events = stream()
+    assert prelude['statusCode'] == 200
+    assert prelude['headers']['Content-Type'] == 'text/event-stream'
+    assert [name for name, _ in events] == ['chunk'] * 4 + ['done']
+    text = ''.join(data['text'] for _, data in events[:-1])
+    assert len(text) == 100 and text.startswith('🎯 Fake Agent:')
+    done = events[-1][1]
+    assert done['source'] == 'bedrock-agent' and done['cached'] is False and done['gameId'] == 'stream_game'
+    assert done['promptTokens'] > 0 and done['timings']['chunks'] == 4
+    assert {'prompt', 'first_chunk', 'stream'} <= set(done['timings']['stagesMs'])
+
+    # The same position is answered from the cache in one chunk
+    _, events = stream()
+    assert [name for name, _ in events] == ['chunk', 'done']
+    assert events[0][1]['text'] == text and events[1][1]['cached'] is True
+    assert runtime.invocations == 1
+
+
+def test_stream_falls_back_when_bedrock_fails(agent):
+    agent(FakeAgentRuntime(first_chunk_ms=1, first_chunk_sigma=0, error_rate=1.0))
+    prelude, events = stream()
+    assert prelude['statusCode'] == 200
+    assert [name for name, _ in events] == ['chunk', 'done']
+    assert events[1][1]['source'] == 'rule-engine'
+    assert 'agent_failed' in events[1][1]['timings']['stagesMs']
+
+
+def test_stream_error_event_when_bedrock_fails_mid_stream(agent):
+    agent(FailingMidStreamRuntime(first_chunk_ms=1, first_chunk_sigma=0, response_chars=100, chunk_chars=30))
+    prelude, events = stream()
+    assert prelude['statusCode'] == 200
+    assert [name for name, _ in events] == ['chunk', 'error']
+    assert events[1][1]['success'] is False and events[1][1]['error'] == 'Suggestion stream interrupted'
+
+
+def test_stream_rejects_invalid_requests(agent):
+    prelude, body = lambda_suggest.read_streamed_response(
+        lambda_suggest.lambda_stream_handler({'body': json.dumps({'playerHand': []})}, None)
+    )
+    assert prelude['statusCode'] == 400 and prelude['headers']['Content-Type'] == 'application/json'
+    assert json.loads(body) == {'success': False, 'error': 'gameId is required'}
+
 # For local testing
 if __name__ == "__main__":
     # Test event
@@ -0,0 +1,65 @@
+"""
+Tests for PromptBuilder.build: sections dropped to fit the token budget and the reported token count
+"""
+
+from prompt_builder import DROP_ORDER, PromptBuilder, estimate_tokens
+from test_game_moves import cards
+
+HAND = cards('4:Hearts 5:Hearts 7:Hearts 9:Spades 9:Clubs 9:Diamonds King:Clubs '
+             'Queen:Diamonds 3:Spades Jack:Hearts 10:Diamonds 8:Clubs Ace:Diamonds')
+OPEN_DECK = cards('2:Spades 5:Clubs Queen:Hearts 8:Diamonds 6:Hearts')
+JOKER = {"rank": "2", "suit": "Clubs"}
+MELDS = [cards('5:Spades 6:Spades 7:Spades')]
+OPPONENT = "Opponent picked: 6S 8S; likely collecting S 6 8"
+
+
+def build(token_budget):
+    return PromptBuilder(token_budget=token_budget).build(HAND, OPEN_DECK, JOKER, MELDS, opponent=OPPONENT)
+
+
+def line(prompt, prefix):
+    return next(text for text in prompt.text.splitlines() if text.startswith(prefix))
+
+
+def test_everything_fits_without_a_budget():
+    prompt = build(0)
+    assert prompt.dropped == []
+    assert "Earlier discards: 2S 5C QH 8D" in prompt.text and OPPONENT in prompt.text
+    assert "Melds on table: 5S 6S 7S" in prompt.text
+    assert prompt.tokens == estimate_tokens(prompt.text)
+
+
+def test_sections_are_dropped_in_order():
+    full = build(0)
+    # Just too big for the full prompt: only the earlier discards go
+    prompt = build(full.tokens - 1)
+    assert prompt.dropped == ["recent_discards"] and "Earlier discards" not in prompt.text
+    assert OPPONENT in prompt.text
+    # Too big without the earlier discards as well: the opponent hint goes next
+    prompt = build(full.tokens - estimate_tokens(line(full, "Earlier discards")) - 1)
+    assert prompt.dropped == ["recent_discards", "opponent"] and OPPONENT not in prompt.text
+    for budget in range(full.tokens, 0, -1):
+        prompt = build(budget)
+        assert prompt.dropped == list(DROP_ORDER[:len(prompt.dropped)])
+        assert prompt.tokens == estimate_tokens(prompt.text)
+
+
+def test_hand_and_joker_are_never_dropped():
+    prompt = build(1)
+    assert prompt.dropped == list(DROP_ORDER)
+    assert prompt.tokens > 1 and prompt.tokens == estimate_tokens(prompt.text)
+    assert line(prompt, "Hand: ") == "Hand: 4H 5H 7H JH AD 9D TD QD 8C 9C KC 3S 9S"
+    assert line(prompt, "Top discard: ") == "Top discard: 6H"
+    assert line(prompt, "Joker: ") == "Joker: 2C, every 2 is wild"
+    # The meld cards give way to their count
+    assert line(prompt, "Melds on table: ") == "Melds on table: 1"
+
+
+def test_missing_sections_are_not_reported_dropped():
+    builder = PromptBuilder(token_budget=1)
+    prompt = builder.build(HAND, OPEN_DECK[-1:], JOKER)
+    assert prompt.dropped == ["strategy"]
+    assert prompt.tokens == estimate_tokens(prompt.text)
+    stats = builder.stats()
+    assert stats["prompts"] == 1 and stats["over_budget"] == 1 and stats["max_tokens"] == prompt.tokens
+    assert stats["dropped"] == {"recent_discards": 0, "opponent": 0, "strategy": 1, "meld_cards": 0}
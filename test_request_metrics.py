@@ -0,0 +1,143 @@
+"""
+Tests for request_metrics: RequestTimer stages, the Server-Timing header and the Prometheus text on /metrics
+"""
+
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from request_metrics import MetricsRegistry, RequestTimer, current_timer, timed_request
+from suggest_api_python import app, bedrock_service
+from test_game_moves import game
+
+SERVER_TIMING = re.compile(r"^(?:[a-z_]+;dur=\d+\.\d{2}, )*total;dur=\d+\.\d{2}$")
+SAMPLE = re.compile(r"^([a-z_]+)(\{[^}]*\})? (\S+)$")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(bedrock_service, "provider", "engine")
+    return TestClient(app)
+
+
+def server_timing(header):
+    assert SERVER_TIMING.match(header), header
+    return {name: float(duration) for name, duration in re.findall(r"([a-z_]+);dur=([\d.]+)", header)}
+
+
+def samples(text):
+    """{(name, labels): value} of every sample line, checking each line is a comment or a sample"""
+    parsed = {}
+    for line in text.splitlines():
+        if line.startswith("# "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        parsed[(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return parsed
+
+
+def test_timer_adds_up_repeated_stages(monkeypatch):
+    clock = iter([0.0, 1.0, 1.004, 2.0, 2.0015, 3.0])
+    monkeypatch.setattr("request_metrics.time.perf_counter", lambda: next(clock))
+    timer = RequestTimer()
+    with timer.stage("engine"):
+        pass
+    with timer.stage("engine"):
+        pass
+    timer.add_agent_call({"first_chunk": 0.25, "stream": 0.5, "chunks": 3, "bytes": 120})
+    timer.add_agent_call({"first_chunk": 0.25, "chunks": 2, "bytes": 80})
+    assert timer.stages_ms() == {"engine": 5.5, "first_chunk": 500.0, "stream": 500.0}
+    assert timer.server_timing() == "engine;dur=5.50, first_chunk;dur=500.00, stream;dur=500.00, total;dur=3000.00"
+    assert (timer.chunks, timer.bytes) == (5, 200)
+
+
+def test_current_timer_outside_a_request_records_nothing():
+    current_timer().record("engine", 1.0)
+    assert current_timer().stages == {}
+    timer = RequestTimer()
+    with timed_request(timer):
+        with current_timer().stage("store"):
+            pass
+        current_timer().label(provider="rule-engine")
+    assert list(timer.stages) == ["store"] and timer.labels == {"provider": "rule-engine"}
+    assert current_timer() is not timer
+
+
+def test_render_format():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs done")
+    registry.gauge("workers", "Worker processes")
+    registry.histogram("job_seconds", "Job time", buckets=(0.1, 1.0))
+    registry.inc("jobs_total", status="ok")
+    registry.inc("jobs_total", 2, status="ok")
+    registry.inc("jobs_total", reason='say "hi"\n')
+    registry.set("workers", 4)
+    for value in (0.05, 0.1, 0.5, 7.0):
+        registry.observe("job_seconds", value, job="draw")
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs done",
+        "# TYPE jobs_total counter",
+        'jobs_total{status="ok"} 3',
+        'jobs_total{reason="say \\"hi\\"\\n"} 1',
+        "# HELP workers Worker processes",
+        "# TYPE workers gauge",
+        "workers 4",
+        "# HELP job_seconds Job time",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{job="draw",le="0.1"} 2',
+        'job_seconds_bucket{job="draw",le="1"} 3',
+        'job_seconds_bucket{job="draw",le="+Inf"} 4',
+        'job_seconds_sum{job="draw"} 7.65',
+        'job_seconds_count{job="draw"} 4',
+    ]
+
+
+def test_server_timing_header(client):
+    assert client.post("/test/add-game", json=game("metrics_timing", "4:Hearts 5:Hearts 9:Spades")).status_code == 200
+    response = client.get("/suggest/metrics_timing")
+    assert response.status_code == 200
+    stages = server_timing(response.headers["Server-Timing"])
+    assert {"store", "engine", "total"} <= set(stages)
+    assert stages["total"] >= stages["store"] + stages["engine"] - 0.02
+
+    missing = client.get("/suggest/metrics_missing")
+    assert missing.status_code == 404
+    assert set(server_timing(missing.headers["Server-Timing"])) == {"store", "total"}
+    # The scrape itself is not timed
+    assert "Server-Timing" not in client.get("/metrics").headers
+
+
+def test_metrics_text(client):
+    assert client.post("/test/add-game", json=game("metrics_text", "4:Hearts 5:Hearts 9:Spades")).status_code == 200
+    requests = ('botorial_requests_total',
+                '{cache="bypass",endpoint="get_suggestion",provider="rule-engine",status="200"}')
+
+    client.get("/suggest/metrics_text")
+    scrape = client.get("/metrics")
+    assert scrape.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = scrape.text
+    for name, kind in (("botorial_requests_total", "counter"), ("botorial_request_seconds", "histogram"),
+                       ("botorial_stage_seconds", "histogram"), ("botorial_analysis_pool_workers", "gauge")):
+        assert f"# TYPE {name} {kind}" in text
+        help_line = text.index(f"# HELP {name} ")
+        assert text.index(f"# TYPE {name} ") > help_line
+    before = samples(text)
+
+    # Buckets are cumulative and the +Inf bucket equals the count
+    labels = '{endpoint="get_suggestion",stage="engine"'
+    buckets = [value for (name, key), value in before.items()
+               if name == "botorial_stage_seconds_bucket" and key.startswith(labels)]
+    assert len(buckets) == 16 and buckets == sorted(buckets)
+    assert buckets[-1] == before[("botorial_stage_seconds_count", labels + "}")] >= 1
+    assert before[("botorial_stage_seconds_sum", labels + "}")] > 0
+
+    client.get("/suggest/metrics_text")
+    client.get("/suggest/metrics_text")
+    after = samples(client.get("/metrics").text)
+    assert after[requests] == before[requests] + 2
+    # Counters and histogram series never go down between scrapes
+    for key, value in before.items():
+        if key[0].endswith(("_total", "_bucket", "_count")):
+            assert after[key] >= value, key
@@ -0,0 +1,96 @@
+"""
+Tests for resilient agent calls: retry budget, circuit breaker, retries and deadlines
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from resilience import (CircuitBreaker, CircuitOpenError, DeadlineExceededError, ResilientInvoker, RetryBudget,
+                        failure_reason, is_throttling_error)
+
+
+class ThrottlingException(Exception):
+    response = {"Error": {"Code": "ThrottlingException"}}
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=False)
+
+
+def test_retry_budget_runs_dry_and_refills():
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=2)
+    assert budget.try_spend() and budget.try_spend() and not budget.try_spend()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+    assert budget.spent == 3 and budget.denied == 1
+
+
+def test_breaker_opens_then_lets_one_probe_through(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow_request()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert breaker.allow_request() and not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.rejected == 2
+
+
+def test_failure_reasons():
+    assert is_throttling_error(ThrottlingException()) and failure_reason(ThrottlingException()) == "throttled"
+    assert failure_reason(CircuitOpenError()) == "circuit_open"
+    assert failure_reason(DeadlineExceededError()) == "deadline"
+    assert failure_reason(RuntimeError("AccessDeniedException: no")) == "access_denied"
+
+
+@pytest.mark.asyncio
+async def test_throttling_is_retried_within_the_budget(executor):
+    invoker = ResilientInvoker(executor, max_attempts=3, backoff_base=0.001, backoff_cap=0.001)
+    calls = []
+
+    def attempt(cancel):
+        calls.append(1)
+        if len(calls) < 3:
+            raise ThrottlingException()
+        return "answer"
+
+    assert await invoker.invoke(attempt, timeout=5) == "answer"
+    assert invoker.retries == 2 and invoker.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_other_errors_are_not_retried_and_open_the_breaker(executor):
+    invoker = ResilientInvoker(executor, breaker=CircuitBreaker(failure_threshold=1))
+
+    def attempt(cancel):
+        raise RuntimeError("ValidationException")
+
+    with pytest.raises(RuntimeError):
+        await invoker.invoke(attempt, timeout=5)
+    assert invoker.retries == 0
+    with pytest.raises(CircuitOpenError):
+        await invoker.invoke(attempt, timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_the_attempt(executor):
+    invoker = ResilientInvoker(executor)
+    cancelled = []
+
+    def attempt(cancel):
+        cancelled.append(cancel.wait(2))
+        return "late"
+
+    with pytest.raises(DeadlineExceededError):
+        await invoker.invoke(attempt, timeout=0.05)
+    executor.shutdown(wait=True)
+    assert cancelled == [True] and invoker.deadline_exceeded == 1
@@ -0,0 +1,109 @@
+"""
+Tests for the rule-based suggestion engine's meld search
+"""
+
+import random
+
+from rummy_engine import PURE_SEQUENCE, SEQUENCE, SET, HandAnalysis, format_suggestion, suggest_move
+
+RANKS = ['Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King']
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+
+
+def cards(spec):
+    """'5:Hearts 6:Hearts Joker:' -> card dicts"""
+    return [{"rank": rank, "suit": suit} for rank, suit in (token.split(':') for token in spec.split())]
+
+
+def melds_of(analysis, kind):
+    return [meld["cards"] for meld in analysis.describe_melds() if meld["type"] == kind]
+
+
+def test_pure_sequence_and_set():
+    analysis = HandAnalysis(cards('4:Hearts 5:Hearts 6:Hearts 9:Spades 9:Clubs 9:Diamonds King:Clubs'))
+    assert analysis.has_pure_sequence
+    assert melds_of(analysis, PURE_SEQUENCE) == [['4 of Hearts', '5 of Hearts', '6 of Hearts']]
+    assert melds_of(analysis, SET) == [['9 of Spades', '9 of Clubs', '9 of Diamonds']]
+    assert analysis.deadwood_points == 10
+
+
+def test_ace_sits_above_the_king():
+    analysis = HandAnalysis(cards('Queen:Spades King:Spades Ace:Spades 4:Clubs'))
+    assert melds_of(analysis, PURE_SEQUENCE) == [['Queen of Spades', 'King of Spades', 'Ace of Spades']]
+    assert analysis.deadwood_points == 4
+
+
+def test_printed_joker_fills_the_gap_it_stands_for():
+    analysis = HandAnalysis(cards('5:Hearts 7:Hearts Joker: 2:Clubs 3:Clubs 4:Clubs'))
+    assert melds_of(analysis, SEQUENCE) == [['5 of Hearts', 'Joker of ', '7 of Hearts']]
+    assert analysis.deadwood_points == 0
+    assert analysis.spare_jokers == 0
+
+
+def test_joker_rank_card_completes_a_pure_sequence_as_itself():
+    # 6 of Hearts is wild (joker 6 of Clubs) but also the natural 6 between 5 and 7
+    hand = cards('5:Hearts 6:Hearts 7:Hearts 2:Spades 9:Clubs King:Diamonds 4:Spades '
+                 'Jack:Clubs 8:Spades 3:Diamonds Queen:Hearts 10:Spades 9:Diamonds')
+    joker = {"rank": "6", "suit": "Clubs"}
+    analysis = HandAnalysis(hand, joker)
+    assert analysis.has_pure_sequence
+    assert melds_of(analysis, PURE_SEQUENCE) == [['5 of Hearts', '6 of Hearts', '7 of Hearts']]
+    assert "no pure sequence yet" not in format_suggestion(suggest_move(hand, [], joker))
+
+
+def test_joker_rank_card_is_still_wild_elsewhere():
+    analysis = HandAnalysis(cards('5:Hearts 7:Hearts 6:Clubs 2:Spades 3:Spades 4:Spades'), {"rank": "6", "suit": "Diamonds"})
+    assert melds_of(analysis, SEQUENCE) == [['5 of Hearts', '6 of Clubs', '7 of Hearts']]
+    assert analysis.deadwood_points == 0
+
+
+def test_without_a_pure_sequence_the_best_arrangement_is_reported():
+    analysis = HandAnalysis(cards('9:Spades 9:Hearts 9:Diamonds King:Clubs'))
+    assert not analysis.has_pure_sequence
+    assert analysis.deadwood_points == 10
+
+
+def random_hand(rng, size):
+    deck = [{"id": f"{copy}{rank}{suit}", "rank": rank, "suit": suit}
+            for copy in range(2) for rank in RANKS for suit in rng.sample(SUITS, rng.choice([1, 2, 4]))]
+    deck += [{"id": f"joker{copy}", "rank": "Joker", "suit": ""} for copy in range(2)]
+    return rng.sample(deck, size), {"rank": rng.choice(RANKS), "suit": "Clubs"}
+
+
+def test_incremental_updates_match_a_full_search():
+    rng = random.Random(7)
+    for _ in range(300):
+        hand, joker = random_hand(rng, 14)
+        full = HandAnalysis(hand[:13], joker)
+        added = full.with_card(hand[13])
+        if added is not None:
+            assert added.key == HandAnalysis(hand, joker).key
+        for position in range(13):
+            removed = full.without(position)
+            if removed is not None:
+                assert removed.key == HandAnalysis(hand[:position] + hand[position + 1:13], joker).key
+
+
+def test_described_melds_account_for_every_melded_card():
+    rng = random.Random(11)
+    for _ in range(300):
+        hand, joker = random_hand(rng, rng.choice([13, 14]))
+        analysis = HandAnalysis(hand, joker)
+        described = analysis.describe_melds()
+        melded = sum(bin(meld.mask).count('1') + meld.jokers for meld in analysis.melds)
+        assert sum(len(meld["cards"]) for meld in described) == melded
+        assert analysis.spare_jokers >= 0
+        for meld in described:
+            if meld["type"] == PURE_SEQUENCE:
+                assert meld["jokers"] == 0
+
+
+def test_suggest_move_takes_a_discard_that_completes_a_meld():
+    hand = cards('4:Hearts 5:Hearts 9:Spades 9:Clubs 2:Diamonds King:Clubs Queen:Diamonds '
+                 '7:Spades 3:Clubs Jack:Hearts 10:Diamonds 8:Clubs Ace:Diamonds')
+    result = suggest_move(hand, cards('6:Hearts'), {"rank": "2", "suit": "Spades"})
+    assert result["draw"]["source"] == "open"
+    assert result["discard"]["card"] == 'King of Clubs'
+
+    result = suggest_move(hand + cards('6:Hearts'), [], None)
+    assert result["draw"] is None
@@ -0,0 +1,64 @@
+"""
+Tests for single-flight coalescing of identical suggestion requests
+"""
+
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "answer"
+
+    leader = asyncio.ensure_future(flight.run("key", factory))
+    await asyncio.sleep(0)
+    assert flight.running("key")
+    follower = asyncio.ensure_future(flight.run("key", factory))
+    await asyncio.sleep(0)
+    release.set()
+    assert await leader == ("answer", False)
+    assert await follower == ("answer", True)
+    assert calls == 1 and not flight.running("key")
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 1}
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def factory():
+        await release.wait()
+        return "answer"
+
+    leader = asyncio.ensure_future(flight.run("key", factory))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.run("key", factory))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+    assert await follower == ("answer", True)
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+
+    async def factory():
+        await asyncio.sleep(0)
+        raise RuntimeError("agent down")
+
+    results = await asyncio.gather(flight.run("key", factory), flight.run("key", factory), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not flight.running("key")
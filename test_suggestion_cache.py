@@ -0,0 +1,47 @@
+"""
+Tests for the suggestion cache: state fingerprints, LRU eviction and TTL expiry
+"""
+
+import time
+
+from suggestion_cache import SuggestionCache, state_fingerprint
+
+HAND = [{"id": "a", "rank": "7", "suit": "Hearts"}, {"id": "b", "rank": "King", "suit": "Spades"}]
+OPEN_DECK = [{"id": "c", "rank": "6", "suit": "Hearts"}]
+JOKER = {"id": "j", "rank": "Ace", "suit": "Clubs"}
+
+
+def test_fingerprint_ignores_hand_order_but_not_the_position():
+    fingerprint = state_fingerprint(HAND, OPEN_DECK, JOKER)
+    assert state_fingerprint(HAND[::-1], OPEN_DECK, JOKER) == fingerprint
+    assert state_fingerprint(HAND, [], JOKER) != fingerprint
+    assert state_fingerprint(HAND, OPEN_DECK, JOKER, [[HAND[0]]]) != fingerprint
+    assert state_fingerprint(HAND, OPEN_DECK, JOKER, closed_deck_count=40) != state_fingerprint(HAND, OPEN_DECK, JOKER, closed_deck_count=39)
+    assert state_fingerprint(HAND, OPEN_DECK, JOKER, version=1) != fingerprint
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SuggestionCache(max_size=2)
+    cache.put("a", {"message": "a"})
+    cache.put("b", {"message": "b"})
+    assert cache.get("a") == {"message": "a"}
+    cache.put("c", {"message": "c"})
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_miss(monkeypatch):
+    cache = SuggestionCache(ttl_seconds=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.put("a", {"message": "a"})
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["size"] == 0 and stats["misses"] == 1
+
+
+def test_zero_size_disables_the_cache():
+    cache = SuggestionCache(max_size=0)
+    cache.put("a", {"message": "a"})
+    assert cache.get("a") is None
@@ -0,0 +1,63 @@
+"""
+Tests for conditional polling of GET /suggest/{game_id} with ETag / If-None-Match
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from card_tracker import CardTrackerRegistry
+from suggest_api_python import app, bedrock_service, etag_matches, game_store
+from test_game_moves import game
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # The rule engine answers without AWS and its answers are repeatable
+    monkeypatch.setattr(bedrock_service, "provider", "engine")
+    return TestClient(app)
+
+
+def test_etag_matches():
+    assert etag_matches('W/"engine-abc"', 'W/"engine-abc"')
+    assert etag_matches('"other", "engine-abc"', 'W/"engine-abc"')
+    assert etag_matches('*', 'W/"engine-abc"')
+    assert not etag_matches('W/"engine-abd"', 'W/"engine-abc"')
+    assert not etag_matches(None, 'W/"engine-abc"')
+
+
+def poll(client, game_id, etag=None):
+    return client.get(f"/suggest/{game_id}", headers={"If-None-Match": etag} if etag else {})
+
+
+def test_unchanged_position_is_not_modified(client):
+    assert client.post("/test/add-game", json=game("etag_same", "4:Hearts 5:Hearts 9:Spades")).status_code == 200
+    first = poll(client, "etag_same")
+    assert first.status_code == 200 and first.headers["ETag"].startswith('W/"engine-')
+    second = poll(client, "etag_same", first.headers["ETag"])
+    assert second.status_code == 304 and second.headers["ETag"] == first.headers["ETag"] and not second.content
+
+
+def test_opponent_moves_change_the_etag(client):
+    assert client.post("/test/add-game", json=game("etag_moves", "4:Hearts 5:Hearts 9:Spades")).status_code == 200
+    etag = poll(client, "etag_moves").headers["ETag"]
+    # A closed draw leaves hand and top discard alone but not the deck
+    assert client.post("/games/etag_moves/moves", json={"type": "opponent_draw_closed"}).status_code == 200
+    after_draw = poll(client, "etag_moves", etag)
+    assert after_draw.status_code == 200 and after_draw.headers["ETag"] != etag
+    # Picking up the top discard and throwing it back restores the position but not what is known
+    etag = after_draw.headers["ETag"]
+    top = {"id": "discard_1", "rank": "6", "suit": "Hearts", "value": 6}
+    assert client.post("/games/etag_moves/moves", json={"type": "opponent_draw_open"}).status_code == 200
+    assert client.post("/games/etag_moves/moves", json={"type": "opponent_discard", "card": top}).status_code == 200
+    after_return = poll(client, "etag_moves", etag)
+    assert after_return.status_code == 200 and after_return.headers["ETag"] != etag
+
+
+def test_etag_comes_from_the_stored_state(client, monkeypatch):
+    assert client.post("/test/add-game", json=game("etag_stored", "4:Hearts 5:Hearts 9:Spades")).status_code == 200
+    assert client.post("/games/etag_stored/moves", json={"type": "opponent_draw_closed"}).status_code == 200
+    etag = poll(client, "etag_stored").headers["ETag"]
+    assert game_store.get("etag_stored").version == 1
+    # Another worker (or a restart) has no card tracker for the game yet
+    monkeypatch.setattr(bedrock_service, "card_trackers", CardTrackerRegistry())
+    assert poll(client, "etag_stored", etag).status_code == 304
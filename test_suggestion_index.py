@@ -0,0 +1,88 @@
+"""
+Tests for the precomputed suggestion index: canonical keys, file format and lookups
+"""
+
+import struct
+
+import pytest
+
+from rummy_engine import suggest_move
+from suggestion_index import (HEADER, KEY_BYTES, MAGIC, RECORD, SuggestionIndex, build_index,
+                              canonical_position, synthetic_game_states)
+
+SWAP_SUITS = {"Hearts": "Spades", "Spades": "Hearts", "Diamonds": "Clubs", "Clubs": "Diamonds"}
+
+
+def cards(spec):
+    return [{"rank": rank, "suit": suit} for rank, suit in (token.split(':') for token in spec.split())]
+
+
+def relabel(hand):
+    return [{**card, "suit": SWAP_SUITS.get(card["suit"], card["suit"])} for card in hand]
+
+
+HAND = cards('5:Hearts 6:Hearts 7:Hearts 2:Spades 9:Clubs King:Diamonds 4:Spades '
+             'Jack:Clubs 8:Spades 3:Diamonds Queen:Hearts 10:Spades 9:Diamonds')
+JOKER = {"rank": "6", "suit": "Clubs"}
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    states = list(synthetic_game_states(200, seed=3))
+    states.append({"playerHand": HAND, "openDeck": cards('6:Spades'), "jokerCard": JOKER})
+    path = str(tmp_path / "suggestions.bin")
+    build_index(path, states)
+    return path, states
+
+
+def test_key_is_shared_by_suit_relabelings():
+    position = canonical_position(HAND, cards('8:Hearts'), JOKER)
+    swapped = canonical_position(relabel(HAND), relabel(cards('8:Hearts')), relabel([JOKER])[0])
+    assert position.key == swapped.key
+    assert len(position.key) == KEY_BYTES
+
+
+def test_joker_rank_cards_keep_their_suit():
+    # 6 of Hearts completes 5-6-7 of Hearts as itself; 6 of Spades does not
+    other = [card if card["rank"] != "6" else {"rank": "6", "suit": "Spades"} for card in HAND]
+    assert canonical_position(HAND, [], JOKER).key != canonical_position(other, [], JOKER).key
+
+
+def test_unreadable_hands_have_no_key():
+    assert canonical_position(cards('Eleven:Hearts'), [], JOKER) is None
+
+
+def test_file_is_sorted_fixed_size_records(index_path):
+    path, _ = index_path
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    magic, _, entries = HEADER.unpack_from(data, 0)
+    assert magic == MAGIC
+    keys = [RECORD.unpack_from(data, HEADER.size + i * RECORD.size)[0] for i in range(entries)]
+    assert keys == sorted(keys) and len(set(keys)) == entries
+
+
+def test_lookup_matches_the_engine(index_path):
+    path, states = index_path
+    index = SuggestionIndex(path)
+    try:
+        assert index.warm() > 0
+        for state in states:
+            indexed = index.lookup(state["playerHand"], state["openDeck"], state["jokerCard"])
+            direct = suggest_move(state["playerHand"], state["openDeck"], state["jokerCard"])
+            assert indexed["deadwood_points"] == direct["deadwood_points"]
+            assert indexed["has_pure_sequence"] == direct["has_pure_sequence"]
+        result = index.lookup(HAND, cards('6:Spades'), JOKER)
+        assert ['5 of Hearts', '6 of Hearts', '7 of Hearts'] in [meld["cards"] for meld in result["melds"]]
+        assert index.lookup(cards('2:Hearts 9:Clubs King:Spades'), [], JOKER) is None
+        assert index.stats()["misses"] == 1
+    finally:
+        index.close()
+
+
+def test_other_versions_are_rejected(index_path):
+    path, _ = index_path
+    with open(path, 'r+b') as handle:
+        handle.write(struct.pack(">4sH", MAGIC, 1))
+    with pytest.raises(ValueError):
+        SuggestionIndex(path)
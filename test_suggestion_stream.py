@@ -0,0 +1,80 @@
+"""
+Tests for GET /suggest/{game_id}/stream: Server-Sent Events framing against the fake agent runtime
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fake_bedrock import SUGGESTION_TEXT, FakeAgentRuntime
+from suggest_api_python import app
+from test_batch_suggestions import use_fake_agent
+from test_game_moves import game
+from test_lambda_local import FailingMidStreamRuntime
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def events(response):
+    """(event, data) pairs of an SSE body, checking every message is one event and one data line"""
+    assert response.text.endswith("\n\n")
+    parsed = []
+    for message in response.text[:-2].split("\n\n"):
+        event_line, data_line = message.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        parsed.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return parsed
+
+
+def stream(client, game_id):
+    assert client.post("/test/add-game", json=game(game_id, "4:Hearts 5:Hearts 9:Spades")).status_code == 200
+    response = client.get(f"/suggest/{game_id}/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    return events(response)
+
+
+def test_chunks_arrive_in_order_then_done(client, monkeypatch):
+    runtime = use_fake_agent(monkeypatch, FakeAgentRuntime(first_chunk_ms=1, first_chunk_sigma=0, chunk_interval_ms=1,
+                                                           response_chars=100, chunk_chars=30))
+    received = stream(client, "stream_ok")
+    assert [name for name, _ in received] == ["chunk"] * 4 + ["done"]
+    # Chunks are forwarded in the order the agent sent them
+    assert [data["text"] for _, data in received[:-1]] == [SUGGESTION_TEXT[:100][i:i + 30] for i in range(0, 100, 30)]
+    done = received[-1][1]
+    assert done["success"] and done["source"] == "bedrock-agent" and done["cached"] is False
+    assert done["prompt_tokens"] > 0 and done["timing"]["chunks"] == 4
+    assert runtime.invocations == 1
+
+    # The finished answer is cached and replayed as one chunk
+    received = events(client.get("/suggest/stream_ok/stream"))
+    assert [name for name, _ in received] == ["chunk", "done"]
+    assert received[0][1]["text"] == SUGGESTION_TEXT[:100] and received[1][1]["cached"] is True
+    assert runtime.invocations == 1
+
+
+def test_agent_failure_before_the_first_chunk_falls_back(client, monkeypatch):
+    use_fake_agent(monkeypatch, FakeAgentRuntime(first_chunk_ms=1, first_chunk_sigma=0, error_rate=1.0))
+    received = stream(client, "stream_fallback")
+    assert [name for name, _ in received] == ["chunk", "done"]
+    assert received[1][1]["source"] != "bedrock-agent" and received[1][1]["cached"] is False
+
+
+def test_agent_failure_mid_stream_ends_with_an_error_event(client, monkeypatch):
+    use_fake_agent(monkeypatch, FailingMidStreamRuntime(first_chunk_ms=1, first_chunk_sigma=0,
+                                                        response_chars=100, chunk_chars=30))
+    received = stream(client, "stream_error")
+    assert [name for name, _ in received] == ["chunk", "error"]
+    assert received[0][1]["text"] == SUGGESTION_TEXT[:30]
+    assert received[1][1]["success"] is False and received[1][1]["error"] == "Suggestion stream interrupted"
+    # A partial answer is never cached
+    assert [name for name, _ in events(client.get("/suggest/stream_error/stream"))] == ["chunk", "error"]
+
+
+def test_unknown_game(client):
+    assert client.get("/suggest/stream_missing/stream").status_code == 404